@@ -2,11 +2,31 @@ locals {
   api_routes = {
     post = {
       method         = "POST"
+      path           = "/quotes"
       throttle_burst = 5 # Low burst for submissions
       throttle_rate  = 2 # 2 req/sec max for submitting quotes
     }
+    post_batch = {
+      method         = "POST"
+      path           = "/quotes/batch"
+      throttle_burst = 2 # Each request carries up to 100 quotes
+      throttle_rate  = 1 # Bulk imports only
+    }
+    get = {
+      method         = "GET"
+      path           = "/quotes"
+      throttle_burst = 20 # Readers poll with If-None-Match
+      throttle_rate  = 10 # 304s are cheap, but still invoke the Lambda
+    }
+    get_stats = {
+      method         = "GET"
+      path           = "/quotes/stats"
+      throttle_burst = 20 # One GetItem per request
+      throttle_rate  = 10
+    }
     options = {
       method         = "OPTIONS"
+      path           = "/quotes"
       throttle_burst = 50 # CORS preflight requests
       throttle_rate  = 20 # Allow browsers to make preflight checks
     }
@@ -19,9 +39,9 @@ resource "aws_apigatewayv2_api" "http_api" {
 
   cors_configuration {
     allow_origins  = [var.allow_origin] # e.g., https://shitbrucesays.co.uk (prod) or * (dev)
-    allow_methods  = ["POST", "OPTIONS"]
-    allow_headers  = ["content-type"]
-    expose_headers = ["content-type"]
+    allow_methods  = ["GET", "POST", "OPTIONS"]
+    allow_headers  = ["content-type", "if-none-match", "idempotency-key"]
+    expose_headers = ["content-type", "etag"]
     max_age        = 3600
   }
 }
@@ -34,7 +54,7 @@ resource "aws_apigatewayv2_stage" "default" {
   dynamic "route_settings" {
     for_each = local.api_routes
     content {
-      route_key              = "${route_settings.value.method} /quotes"
+      route_key              = "${route_settings.value.method} ${route_settings.value.path}"
       throttling_burst_limit = route_settings.value.throttle_burst
       throttling_rate_limit  = route_settings.value.throttle_rate
     }
@@ -52,7 +72,7 @@ resource "aws_apigatewayv2_integration" "lambda_integration" {
 resource "aws_apigatewayv2_route" "quotes" {
   for_each  = local.api_routes
   api_id    = aws_apigatewayv2_api.http_api.id
-  route_key = "${each.value.method} /quotes"
+  route_key = "${each.value.method} ${each.value.path}"
   target    = "integrations/${aws_apigatewayv2_integration.lambda_integration.id}"
 }
 
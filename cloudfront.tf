@@ -30,17 +30,48 @@ resource "aws_cloudfront_function" "www_redirect" {
         };
       }
 
+      // Publisher state lives in the site bucket but is not part of the site.
+      if (request.uri.startsWith('/.publish')) {
+        return { statusCode: 404, statusDescription: 'Not Found' };
+      }
+
       if (request.uri.endsWith('/')) {
         request.uri = request.uri + 'index.html';
       } else if (!request.uri.includes('.')) {
         request.uri = request.uri + '/index.html';
       }
 
+      %{ if var.serve_precompressed ~}
+      // The publisher uploads a gzip variant next to every generated page and sitemap.
+      var acceptEncoding = request.headers['accept-encoding'];
+      if (/\.(html|xml)$/.test(request.uri) && acceptEncoding && /\bgzip\b/.test(acceptEncoding.value)) {
+        request.uri = request.uri + '.gz';
+      }
+      %{ endif ~}
+
       return request;
     }
   EOT
 }
 
+resource "aws_cloudfront_function" "precompressed_vary" {
+  name    = "${local.name}-precompressed-vary"
+  runtime = "cloudfront-js-2.0"
+  comment = "Mark generated pages as varying on Accept-Encoding"
+  publish = true
+  code    = <<-EOT
+    function handler(event) {
+      var response = event.response;
+
+      if (/\.(html|xml)(\.gz)?$/.test(event.request.uri)) {
+        response.headers['vary'] = { value: 'Accept-Encoding' };
+      }
+
+      return response;
+    }
+  EOT
+}
+
 resource "aws_cloudfront_origin_access_control" "site" {
   name                              = "${local.name}-oac"
   origin_access_control_origin_type = "s3"
@@ -79,6 +110,11 @@ resource "aws_cloudfront_distribution" "site" {
       event_type   = "viewer-request"
       function_arn = aws_cloudfront_function.www_redirect.arn
     }
+
+    function_association {
+      event_type   = "viewer-response"
+      function_arn = aws_cloudfront_function.precompressed_vary.arn
+    }
   }
 
   aliases = [
@@ -127,6 +163,19 @@ data "aws_iam_policy_document" "site_allow_cf" {
       values   = [aws_cloudfront_distribution.site.arn]
     }
   }
+
+  # The publisher's manifest and snapshot (lambda/page_generator.py PUBLISH_STATE_PREFIX)
+  # are never served, even if the viewer-request function is bypassed.
+  statement {
+    effect    = "Deny"
+    actions   = ["s3:GetObject"]
+    resources = ["${aws_s3_bucket.site.arn}/.publish*"]
+
+    principals {
+      type        = "Service"
+      identifiers = ["cloudfront.amazonaws.com"]
+    }
+  }
 }
 
 resource "aws_s3_bucket_policy" "site_cf" {
@@ -4,6 +4,10 @@ resource "aws_dynamodb_table" "quotes" {
   hash_key     = "PK"
   range_key    = "SK"
 
+  # Feeds the page generator when publish_trigger = "stream".
+  stream_enabled   = true
+  stream_view_type = "NEW_IMAGE"
+
   attribute {
     name = "PK"
     type = "S"
@@ -13,6 +17,13 @@ resource "aws_dynamodb_table" "quotes" {
     name = "SK"
     type = "S"
   }
+
+  # Idempotency records expire on their own.
+  ttl {
+    attribute_name = "expiresAt"
+    enabled        = true
+  }
+
   point_in_time_recovery {
     enabled = true
   }
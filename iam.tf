@@ -22,6 +22,12 @@ resource "aws_iam_policy" "ddb_access" {
         Effect = "Allow"
         Action = [
           "dynamodb:PutItem",
+          "dynamodb:BatchWriteItem",
+          "dynamodb:BatchGetItem",
+          "dynamodb:Query",
+          "dynamodb:GetItem",
+          "dynamodb:UpdateItem",
+          "dynamodb:DeleteItem",
         ]
         Resource = aws_dynamodb_table.quotes.arn
       },
@@ -32,6 +38,14 @@ resource "aws_iam_policy" "ddb_access" {
         ]
         Resource = aws_lambda_function.page_generator.arn
       },
+      {
+        # Profiles from PROFILE_HANDLER or a {"profile": true} invoke.
+        Effect = "Allow"
+        Action = [
+          "s3:PutObject",
+        ]
+        Resource = "${aws_s3_bucket.lambda_artifacts.arn}/profiles/*"
+      },
     ]
   })
 }
@@ -71,16 +85,46 @@ resource "aws_iam_policy" "page_generator_access" {
       {
         Effect = "Allow"
         Action = [
+          "dynamodb:GetItem",
           "dynamodb:Query",
+          "dynamodb:UpdateItem",
         ]
         Resource = aws_dynamodb_table.quotes.arn
       },
       {
         Effect = "Allow"
         Action = [
+          "s3:GetObject",
           "s3:PutObject",
+          "s3:AbortMultipartUpload",
         ]
         Resource = "${aws_s3_bucket.site.arn}/*"
+      },
+      {
+        Effect = "Allow"
+        Action = [
+          "dynamodb:DescribeStream",
+          "dynamodb:GetRecords",
+          "dynamodb:GetShardIterator",
+          "dynamodb:ListStreams",
+        ]
+        Resource = "${aws_dynamodb_table.quotes.arn}/stream/*"
+      },
+      {
+        # Profiles from PROFILE_HANDLER or a {"profile": true} invoke.
+        Effect = "Allow"
+        Action = [
+          "s3:PutObject",
+        ]
+        Resource = "${aws_s3_bucket.lambda_artifacts.arn}/profiles/*"
+      },
+      {
+        # Lets a missing publish manifest surface as 404 instead of 403.
+        Effect = "Allow"
+        Action = [
+          "s3:ListBucket",
+        ]
+        Resource = aws_s3_bucket.site.arn
       }
     ]
   })
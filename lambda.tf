@@ -24,7 +24,11 @@ resource "aws_lambda_function" "api" {
     variables = {
       TABLE_NAME                   = aws_dynamodb_table.quotes.name
       ALLOW_ORIGIN                 = var.allow_origin
-      PAGE_GENERATOR_FUNCTION_NAME = aws_lambda_function.page_generator.function_name
+      PAGE_GENERATOR_FUNCTION_NAME = var.publish_trigger == "invoke" ? aws_lambda_function.page_generator.function_name : ""
+      QUOTE_SHARDS                 = var.quote_shards
+      EMIT_METRICS                 = tostring(var.emit_metrics)
+      PROFILE_HANDLER              = tostring(var.profile_handlers)
+      PROFILE_S3_URI               = "s3://${aws_s3_bucket.lambda_artifacts.bucket}/profiles/"
     }
   }
 }
@@ -56,6 +60,43 @@ resource "aws_lambda_function" "page_generator" {
       DOMAIN       = var.domain_name
       TABLE_NAME   = aws_dynamodb_table.quotes.name
       API_BASE_URL = "https://${aws_apigatewayv2_domain_name.api.domain_name}"
+      PRECOMPRESS  = "gzip" # brotli is not in the Lambda runtime; matches the CloudFront rewrite
+
+      PUBLISH_COORDINATION = "true"
+      QUOTE_SHARDS         = var.quote_shards
+      EMIT_METRICS         = tostring(var.emit_metrics)
+      PROFILE_HANDLER      = tostring(var.profile_handlers)
+      PROFILE_S3_URI       = "s3://${aws_s3_bucket.lambda_artifacts.bucket}/profiles/"
+    }
+  }
+}
+
+# Publishes from the table's stream, so the API only writes to DynamoDB. Failed
+# batches are retried, unlike a failed async invoke from the API.
+resource "aws_lambda_event_source_mapping" "quote_stream" {
+  count = var.publish_trigger == "stream" ? 1 : 0
+
+  event_source_arn                   = aws_dynamodb_table.quotes.stream_arn
+  function_name                      = aws_lambda_function.page_generator.arn
+  starting_position                  = "LATEST"
+  batch_size                         = 100
+  maximum_batching_window_in_seconds = 1
+  maximum_retry_attempts             = 5
+
+  # Only quote writes; hash markers, stats and idempotency records have no "quote".
+  # Copies written by tools/migrate_quote_shards.py carry "movedFrom" and change no page.
+  filter_criteria {
+    filter {
+      pattern = jsonencode({
+        eventName = ["INSERT"]
+        dynamodb  = { NewImage = { quote = { S = [{ exists = true }] }, movedFrom = [{ exists = false }] } }
+      })
+    }
+    filter {
+      pattern = jsonencode({
+        eventName = ["MODIFY"]
+        dynamodb  = { NewImage = { quote = { S = [{ exists = true }] } } }
+      })
     }
   }
 }
@@ -1,16 +1,41 @@
+import base64
 import os
 import json
 import re
+import threading
 import time
+import unicodedata
+import zlib
+from contextlib import AbstractContextManager, nullcontext
 from datetime import datetime, timezone
-from typing import Any, Optional
+from typing import Any, Callable, Optional, Union
 
-import boto3
+# boto3 is imported inside the client getters: it dominates cold-start import
+# time, and OPTIONS and 404 responses never touch AWS.
 
 class Config:
     """Application configuration constants."""
     MAX_INPUT_LENGTH = 300
     MIN_INPUT_LENGTH = 5
+    MAX_QUOTE_SHARDS = 64
+    MAX_BATCH_QUOTES = 100
+    BATCH_WRITE_CHUNK = 25  # BatchWriteItem limit
+    BATCH_GET_CHUNK = 100  # BatchGetItem limit
+    BATCH_ATTEMPTS = 5
+    BATCH_BACKOFF_SECONDS = 0.05
+    DEFAULT_LIST_LIMIT = 20
+    MAX_LIST_LIMIT = 100
+    LATEST_MAX_AGE_SECONDS = 5  # first page of GET /quotes
+    PAGE_MAX_AGE_SECONDS = 3600  # cursor pages; quotes are append-only
+    STATS_RECENT_QUOTES = 10
+    IDEMPOTENCY_TTL_SECONDS = 24 * 60 * 60
+    # Longer than the API Gateway integration timeout (30s) and the function's
+    # own timeout, so a claim this old belongs to a request that is gone.
+    IDEMPOTENCY_PENDING_SECONDS = 30
+    DEFAULT_METRICS_NAMESPACE = "ShitBruceSays"
+    PROFILE_LOCAL_DIR = ".profiles"
+    PROFILE_TOP_FUNCTIONS = 40
+    PROFILE_TOP_ALLOCATIONS = 25
     REGION = os.getenv("AWS_REGION", "us-east-2")
     TABLE_NAME = os.getenv("TABLE_NAME", "bruce-quotes")
 
@@ -27,17 +52,82 @@ def get_cors_origin() -> str:
     """
     return os.getenv("ALLOW_ORIGIN", "*")  # '*' for local, Terraform sets this in prod
 
-SQLISH = re.compile(
-    r"""
-    (?:--|;|/\*|\*/|\#)                    # SQL comments / separators (note the escaped \#)
-    | \b(?:SELECT|INSERT|UPDATE|DELETE)\b  # DML verbs in ALL CAPS
-      .*? \bFROM\b                         # ...followed somewhere by FROM (ALL CAPS)
-    | \bUNION\s+SELECT\b                   # UNION SELECT in ALL CAPS
-    | \b(?:DROP|EXEC|EXECUTE|SLEEP|WAITFOR|XP_)\b  # dangerous verbs (ALL CAPS)
-    | \bOR\s+1\s*=\s*1\b                   # classic tautology (ALL CAPS)
-    """,
-    re.X,
-)
+def get_quote_shards() -> int:
+    """
+    Get the number of partitions quotes are spread across.
+
+    Must not exceed the page generator's QUOTE_SHARDS, or it will not read
+    every partition. Invalid values fall back to a single partition.
+
+    Returns:
+        int: Shard count between 1 and Config.MAX_QUOTE_SHARDS
+    """
+    try:
+        shards = int(os.getenv("QUOTE_SHARDS") or 1)
+    except ValueError:
+        return 1
+    return min(max(1, shards), Config.MAX_QUOTE_SHARDS)
+
+# SQL-looking input is rejected by scanning word tokens once, left to right.
+# Keywords only count as whole words in ALL CAPS:
+#   - comment and separator marks: -- ; /* */ #
+#   - SELECT, INSERT, UPDATE or DELETE followed later on the same line by FROM
+#   - UNION, whitespace, SELECT
+#   - DROP, EXEC, EXECUTE, SLEEP, WAITFOR or XP_ anywhere
+#   - OR, whitespace, 1 = 1
+# The scan is linear in the input length. The regex it replaced retried a
+# lazy ".*?" from every DML verb, which is quadratic.
+SQL_MARKS = ("--", ";", "/*", "*/", "#")
+SQL_DML_VERBS = frozenset({"SELECT", "INSERT", "UPDATE", "DELETE"})
+SQL_DANGEROUS_WORDS = frozenset({"DROP", "EXEC", "EXECUTE", "SLEEP", "WAITFOR", "XP_"})
+# Whole-word keywords only: a fixed alternation of short literals does constant
+# work per position, and the gaps between matches are checked in Python.
+_SQL_KEYWORD = re.compile(r"\b(?:SELECT|INSERT|UPDATE|DELETE|FROM|UNION|DROP|EXECUTE|EXEC|SLEEP|WAITFOR|XP_|OR|1)\b")
+
+def _looks_like_sql(text: str) -> bool:
+    """
+    Check whether text contains SQL-like content.
+
+    Every step is linear: the marks are plain substring searches, and the
+    keyword pass looks at each gap between keywords at most once. Keywords
+    that must be adjacent, like UNION SELECT, are checked through the gap
+    between them, which can only be whitespace if no other word intervenes. The DML check only
+    rescans the text since the most recent verb, and it forgets that verb
+    once a newline is found.
+
+    Args:
+        text: Normalized quote text
+
+    Returns:
+        bool: True if the text should be rejected
+    """
+    if any(mark in text for mark in SQL_MARKS):
+        return True
+
+    verb_end = -1  # end of the latest DML verb that may still pair with FROM
+    previous = before_previous = ""
+    previous_start = previous_end = before_previous_end = 0
+    for match in _SQL_KEYWORD.finditer(text):
+        word, start, end = match.group(), match.start(), match.end()
+        if word in SQL_DANGEROUS_WORDS:
+            return True
+        if word in SQL_DML_VERBS:
+            if word == "SELECT" and previous == "UNION" and text[previous_end:start].isspace():
+                return True
+            verb_end = end
+        elif word == "FROM" and verb_end >= 0:
+            if text.find("\n", verb_end, start) < 0:
+                return True
+            verb_end = -1
+        elif word == "1" and previous == "1" and before_previous == "OR":
+            if (
+                text[before_previous_end:previous_start].isspace()
+                and text[previous_end:start].strip() == "="
+            ):
+                return True
+        before_previous, before_previous_end = previous, previous_end
+        previous, previous_start, previous_end = word, start, end
+    return False
 
 def _route(event: dict[str, Any], ctx: Optional[Any] = None) -> dict[str, Any]:
     """
@@ -64,21 +154,32 @@ def _route(event: dict[str, Any], ctx: Optional[Any] = None) -> dict[str, Any]:
     if path != "/" and path.endswith("/"):
         path = path[:-1]
 
+    if path in _METRIC_ROUTES:
+        _metrics.set("route", f"{method} {path}")
     if method == "POST" and path == "/quotes":
-        return _post_quote(event, ctx)
+        return _idempotent(event, f"{method} {path}", lambda: _post_quote(event, ctx))
+    if method == "POST" and path == "/quotes/batch":
+        return _idempotent(event, f"{method} {path}", lambda: _post_quote_batch(event, ctx))
+    if method == "GET" and path == "/quotes":
+        return _list_quotes(event, ctx)
+    if method == "GET" and path == "/quotes/stats":
+        return _get_quote_stats(event, ctx)
     if method == "OPTIONS":
         return {
             "statusCode": 204,
             "headers": {
                 "access-control-allow-origin": get_cors_origin(),
                 "access-control-allow-methods": "GET,POST,OPTIONS",
-                "access-control-allow-headers": "content-type",
+                "access-control-allow-headers": "content-type,if-none-match,idempotency-key",
             },
             "body": "",
         }
 
     return _resp(404, {"error": "Not found"})
 
+# Only known paths are logged, so probes for random URLs stay out of the metrics.
+_METRIC_ROUTES = frozenset({"/quotes", "/quotes/batch", "/quotes/stats"})
+
 # lazy table getter so moto can patch boto3 before first use
 _table: Optional[Any] = None
 _lambda_client: Optional[Any] = None
@@ -100,6 +201,8 @@ def _get_table() -> Any:
     """
     global _table
     if _table is None:
+        import boto3
+
         endpoint_url = os.getenv("DYNAMODB_ENDPOINT")  # e.g., http://localhost:8000
         dynamodb = boto3.resource(
             "dynamodb",
@@ -113,6 +216,8 @@ def _get_table() -> Any:
 def _get_lambda_client() -> Any:
     global _lambda_client
     if _lambda_client is None:
+        import boto3
+
         _lambda_client = boto3.client("lambda", region_name=Config.REGION)
     return _lambda_client
 
@@ -136,13 +241,274 @@ def _resp(code: int, obj: dict[str, Any], headers: Optional[dict[str, str]] = No
         h.update(headers)
     return {"statusCode": code, "headers": h, "body": json.dumps(obj)}
 
+class _Metrics:
+    """
+    Phase timings and counters for one request, logged as one EMF line.
+
+    CloudWatch extracts the values in an Embedded Metric Format log line as
+    metrics under the FunctionName dimension, so recording them needs no
+    metrics API call. Phases entered more than once accumulate.
+
+    page_generator.InvocationMetrics is a copy; a fix to one belongs in both.
+    """
+
+    def __init__(self, namespace: str, function_name: str) -> None:
+        self.namespace = namespace
+        self.function_name = function_name
+        self.values: dict[str, float] = {}
+        self.units: dict[str, str] = {}
+        self.properties: dict[str, str] = {}
+        self._lock = threading.Lock()
+
+    def set(self, name: str, value: str) -> None:
+        """Log a value next to the metrics without making it a dimension."""
+        self.properties[name] = value
+
+    def add(self, name: str, value: float, unit: str = "Count") -> None:
+        """Add to a metric, e.g. add("quotesCreated", 3)."""
+        with self._lock:
+            self.values[name] = self.values.get(name, 0) + value
+            self.units[name] = unit
+
+    def phase(self, name: str) -> AbstractContextManager[Any]:
+        """Time the enclosed block into a Milliseconds metric."""
+        return _MetricsPhase(self, name)
+
+    def document(self) -> dict[str, Any]:
+        """
+        Build the EMF log record.
+
+        Returns:
+            dict: The "_aws" metadata plus FunctionName, properties and values
+        """
+        with self._lock:
+            values = {name: round(value, 3) for name, value in self.values.items()}
+            metrics = [{"Name": name, "Unit": self.units[name]} for name in values]
+        return {
+            "_aws": {
+                "Timestamp": int(time.time() * 1000),
+                "CloudWatchMetrics": [
+                    {"Namespace": self.namespace, "Dimensions": [["FunctionName"]], "Metrics": metrics}
+                ],
+            },
+            "FunctionName": self.function_name,
+            **self.properties,
+            **values,
+        }
+
+    def emit(self) -> None:
+        """Print the EMF record as a single log line."""
+        print(json.dumps(self.document(), separators=(",", ":")))
+
+
+class _MetricsPhase:
+    def __init__(self, metrics: _Metrics, name: str) -> None:
+        self.metrics = metrics
+        self.name = name
+        self.started = 0.0
+
+    def __enter__(self) -> None:
+        self.started = time.perf_counter()
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.metrics.add(self.name, (time.perf_counter() - self.started) * 1000, "Milliseconds")
+
+
+class _NullMetrics:
+    """Stands in while EMIT_METRICS is off; every hook is a no-op. Mirrors page_generator.NullMetrics."""
+
+    def set(self, name: str, value: str) -> None:
+        pass
+
+    def add(self, name: str, value: float, unit: str = "Count") -> None:
+        pass
+
+    def phase(self, name: str) -> AbstractContextManager[Any]:
+        return _NULL_PHASE
+
+    def emit(self) -> None:
+        pass
+
+
+_NULL_PHASE = nullcontext()
+_NULL_METRICS = _NullMetrics()
+_metrics: Union[_Metrics, _NullMetrics] = _NULL_METRICS
+
+
+def _start_metrics(ctx: Any) -> Union[_Metrics, _NullMetrics]:
+    """
+    Begin collecting metrics for one invocation.
+
+    Args:
+        ctx: Lambda context; its function_name becomes the metric dimension
+
+    Returns:
+        The collector, also stored in _metrics
+
+    Environment Variables:
+        EMIT_METRICS: "true" to log one EMF line per invocation
+        METRICS_NAMESPACE: CloudWatch namespace (default: "ShitBruceSays")
+    """
+    global _metrics
+    if os.getenv("EMIT_METRICS", "").strip().lower() not in {"1", "true", "yes", "on"}:
+        _metrics = _NULL_METRICS
+    else:
+        function_name = str(getattr(ctx, "function_name", None) or os.getenv("AWS_LAMBDA_FUNCTION_NAME", "quotes-api"))
+        namespace = os.getenv("METRICS_NAMESPACE", "").strip() or Config.DEFAULT_METRICS_NAMESPACE
+        _metrics = _Metrics(namespace, function_name)
+    return _metrics
+
+ULID_ALPHABET = "0123456789ABCDEFGHJKMNPQRSTVWXYZ"
+ULID_RANDOM_BITS = 80
+_ULID_MAX_RANDOM = (1 << ULID_RANDOM_BITS) - 1
+# Every pair of Crockford characters, indexed by the 10 bits they encode.
+_ULID_PAIRS = tuple(high + low for high in ULID_ALPHABET for low in ULID_ALPHABET)
+_ULID_TO_BASE32HEX = str.maketrans(ULID_ALPHABET, "0123456789ABCDEFGHIJKLMNOPQRSTUV")
+_ULID_PATTERN = re.compile(r"[0-9A-HJKMNP-TV-Z]{26}")
+
+
+def _ulid_time_part(timestamp_ms: int) -> str:
+    """
+    Encode the 10-character timestamp prefix of a ULID.
+
+    page_generator.ulid_time_part is a copy; a fix to one belongs in both.
+
+    Args:
+        timestamp_ms: Milliseconds since the epoch (48 bits)
+
+    Returns:
+        str: 10 Crockford base32 characters
+    """
+    pairs = _ULID_PAIRS
+    return "".join([pairs[timestamp_ms >> shift & 0x3FF] for shift in (40, 30, 20, 10, 0)])
+
+
+def _ulid_random_part(randomness: int) -> str:
+    """
+    Encode the 16-character random suffix of a ULID.
+
+    This runs once per id, so it is unrolled into eight 10-bit table lookups
+    rather than building the string one character at a time.
+
+    Args:
+        randomness: The 80-bit random component
+
+    Returns:
+        str: 16 Crockford base32 characters
+    """
+    pairs = _ULID_PAIRS
+    return "".join([
+        pairs[randomness >> 70 & 0x3FF], pairs[randomness >> 60 & 0x3FF],
+        pairs[randomness >> 50 & 0x3FF], pairs[randomness >> 40 & 0x3FF],
+        pairs[randomness >> 30 & 0x3FF], pairs[randomness >> 20 & 0x3FF],
+        pairs[randomness >> 10 & 0x3FF], pairs[randomness & 0x3FF],
+    ])
+
+
+def _encode_ulid(timestamp_ms: int, randomness: int) -> str:
+    """
+    Encode a ULID from its timestamp and random parts.
+
+    Args:
+        timestamp_ms: Milliseconds since the epoch (48 bits)
+        randomness: The 80-bit random component
+
+    Returns:
+        str: A 26-character ULID string
+    """
+    return _ulid_time_part(timestamp_ms) + _ulid_random_part(randomness)
+
+
+def _ulid_timestamp_ms(ulid: str) -> int:
+    """
+    Read the millisecond timestamp back out of a ULID.
+
+    page_generator.ulid_timestamp_ms is a copy; a fix to one belongs in both.
+
+    Args:
+        ulid: A 26-character ULID string
+
+    Returns:
+        int: Milliseconds since the epoch when the ULID was minted
+
+    Raises:
+        ValueError: If the string is not a valid ULID
+    """
+    if not _ULID_PATTERN.fullmatch(ulid):
+        raise ValueError(f"Not a ULID: {ulid!r}")
+    return int(ulid[:10].translate(_ULID_TO_BASE32HEX), 32)
+
+
+class UlidGenerator:
+    """
+    Monotonic ULID source.
+
+    A fresh random component is drawn only when the millisecond changes. Ids
+    minted within the same millisecond increment it instead, so they sort in
+    creation order, and so does the homepage, which orders purely by SK. If the
+    clock steps backwards, the last timestamp is reused, and an exhausted
+    random component carries into the next millisecond.
+    """
+
+    def __init__(self, clock: Any = time.time, random_bytes: Any = os.urandom) -> None:
+        self._clock = clock
+        self._random_bytes = random_bytes
+        self._lock = threading.Lock()
+        self._last_ms = -1
+        self._last_random = 0
+        self._time_part = ""
+
+    def _set_time(self, timestamp_ms: int) -> None:
+        self._last_ms = timestamp_ms
+        self._time_part = _ulid_time_part(timestamp_ms)
+
+    def new(self) -> str:
+        """
+        Mint one ULID.
+
+        Returns:
+            str: A ULID greater than every id this generator has returned
+        """
+        return self.batch(1)[0]
+
+    def batch(self, count: int) -> list[str]:
+        """
+        Mint several strictly increasing ULIDs at once, e.g. for bulk writes.
+
+        Args:
+            count: Number of ids to return
+
+        Returns:
+            list: ULID strings in ascending order
+        """
+        ids = []
+        with self._lock:
+            now_ms = int(self._clock() * 1000)
+            if now_ms > self._last_ms:
+                self._set_time(now_ms)
+                self._last_random = int.from_bytes(self._random_bytes(10), "big")
+            else:
+                self._last_random += 1
+            for index in range(count):
+                if index:
+                    self._last_random += 1
+                if self._last_random > _ULID_MAX_RANDOM:
+                    self._set_time(self._last_ms + 1)
+                    self._last_random = 0
+                ids.append(self._time_part + _ulid_random_part(self._last_random))
+        return ids
+
+
+_ulids = UlidGenerator()
+
+
 def _ulid() -> str:
     """
     Generate a ULID (Universally Unique Lexicographically Sortable Identifier).
 
     ULIDs are like UUIDs but sortable by creation time. They consist of:
     - 48-bit timestamp (milliseconds since epoch)
-    - 80-bit randomness
+    - 80-bit randomness, incremented within a millisecond (see UlidGenerator)
     - Encoded in Crockford's base32 (26 characters)
 
     This ensures quotes are naturally sorted by creation time in DynamoDB
@@ -151,17 +517,46 @@ def _ulid() -> str:
     Returns:
         str: A 26-character ULID string (e.g., "01ARZ3NDEKTSV4RRFFQ69G5FAV")
     """
-    ENCODING = "0123456789ABCDEFGHJKMNPQRSTVWXYZ"
-    timestamp_ms = int(time.time() * 1000)
-    randomness = int.from_bytes(os.urandom(10), 'big')
-    ulid_int = (timestamp_ms << 80) | randomness
+    return _ulids.new()
+
+def _quote_partition_key(quote_id: str, shards: int) -> str:
+    """
+    Pick the DynamoDB partition key for a quote.
+
+    A single shard keeps the original "QUOTE" key. Otherwise a CRC32 of the
+    ULID spreads writes evenly over "QUOTE#0" to "QUOTE#{shards - 1}", and the
+    key can always be recomputed from the quote id alone. Must match
+    page_generator.quote_partition_key.
+
+    Args:
+        quote_id: The quote's ULID sort key
+        shards: Number of partitions in use
+
+    Returns:
+        str: Partition key for the quote item
+    """
+    if shards <= 1:
+        return "QUOTE"
+    return f"QUOTE#{zlib.crc32(quote_id.encode('utf-8')) % shards}"
 
-    ulid_str = ""
-    for _ in range(26):
-        ulid_str = ENCODING[ulid_int & 0x1F] + ulid_str
-        ulid_int >>= 5
 
-    return ulid_str
+def _quote_partition_keys(shards: int) -> list[str]:
+    """
+    List every partition that may hold quotes.
+
+    Mirrors page_generator.quote_partition_keys: the unsharded "QUOTE"
+    partition is always included so quotes written before sharding stay
+    readable.
+
+    Args:
+        shards: The QUOTE_SHARDS setting
+
+    Returns:
+        list: Partition keys to query
+    """
+    if shards <= 1:
+        return ["QUOTE"]
+    return ["QUOTE", *(f"QUOTE#{shard}" for shard in range(shards))]
 
 def _normalize_quote(quote_text: str) -> str:
     """
@@ -194,12 +589,235 @@ def _normalize_quote(quote_text: str) -> str:
     return text
 
 
-def _invoke_page_generator() -> None:
+def _quote_hash(quote: str) -> str:
+    """
+    Hash the canonical form of a quote for duplicate detection.
+
+    The canonical form is NFKC-normalized, case-folded, with runs of
+    whitespace collapsed to single spaces, so resubmissions that differ only
+    in those respects hash the same.
+
+    Args:
+        quote: Normalized quote text
+
+    Returns:
+        str: Hex SHA-256 of the canonical text
+    """
+    canonical = " ".join(unicodedata.normalize("NFKC", quote).casefold().split())
+    return _sha256_hex(canonical)
+
+
+def _sha256_hex(text: str) -> str:
+    """
+    Hash text with SHA-256.
+
+    Args:
+        text: Text to hash, encoded as UTF-8
+
+    Returns:
+        str: Hex digest
+    """
+    import hashlib  # only POST needs it; keeps OPTIONS and 404 cold starts lean
+
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def _quote_hash_key(quote_hash: str) -> dict[str, str]:
+    """
+    Build the key of the uniqueness marker for a quote hash.
+
+    Each marker gets its own partition, so checking it never touches the
+    quote partitions the publisher reads.
+
+    Args:
+        quote_hash: Value from _quote_hash()
+
+    Returns:
+        dict: PK and SK of the marker item
+    """
+    return {"PK": f"QUOTEHASH#{quote_hash}", "SK": "QUOTEHASH"}
+
+
+STATS_KEY = {"PK": "STATS", "SK": "QUOTES"}
+
+
+def _stats_update(items: list[dict[str, str]]) -> dict[str, Any]:
+    """
+    Build the update that folds new quotes into the aggregates item.
+
+    The item holds "quoteCount", one "month#YYYY-MM" counter per month, and
+    the newest quotes in fixed slots "recent0" (newest) to "recent{N-1}".
+    DynamoDB evaluates every right-hand side against the item as it was
+    before the update, so the slots shift down in a single expression and the
+    item never grows past N quotes. Counters are top-level attributes because
+    ADD cannot create a path inside a missing map.
+
+    Args:
+        items: Quote items that were just written
+
+    Returns:
+        dict: Key and expression arguments for UpdateItem or a transaction
+    """
+    slots = Config.STATS_RECENT_QUOTES
+    newest = sorted(items, key=lambda item: item["SK"], reverse=True)[:slots]
+    names = {f"#r{slot}": f"recent{slot}" for slot in range(slots)}
+    names["#count"] = "quoteCount"
+    values: dict[str, Any] = {":total": len(items)}
+    sets = []
+    for slot, item in enumerate(newest):
+        values[f":r{slot}"] = {"quoteId": item["SK"], "quote": item["quote"], "createdAt": item["createdAt"]}
+        sets.append(f"#r{slot} = :r{slot}")
+    if len(newest) < slots:
+        values[":empty"] = {}
+        sets.extend(f"#r{slot} = if_not_exists(#r{slot - len(newest)}, :empty)" for slot in range(len(newest), slots))
+    adds = ["#count :total"]
+    months: dict[str, int] = {}
+    for item in items:
+        months[item["createdAt"][:7]] = months.get(item["createdAt"][:7], 0) + 1
+    for index, (month, count) in enumerate(sorted(months.items())):
+        names[f"#m{index}"] = f"month#{month}"
+        values[f":m{index}"] = count
+        adds.append(f"#m{index} :m{index}")
+    return {
+        "Key": STATS_KEY,
+        "UpdateExpression": f"SET {', '.join(sets)} ADD {', '.join(adds)}",
+        "ExpressionAttributeNames": names,
+        "ExpressionAttributeValues": values,
+    }
+
+
+def _update_quote_stats(items: list[dict[str, str]]) -> None:
+    """
+    Fold stored quotes into the aggregates item, best effort.
+
+    This runs after the quotes are written rather than inside their write, so
+    submissions never contend on the single aggregates item. A failure is
+    logged and the quotes stay stored; tools/repair_quote_stats.py recomputes
+    the aggregates.
+
+    Args:
+        items: Quote items that were just written
+    """
+    try:
+        _get_table().update_item(**_stats_update(items))
+    except Exception as exc:
+        print(f"Failed to update quote stats: {exc}")
+
+
+def _put_unique_quote(item: dict[str, str], quote_hash: str) -> Optional[str]:
+    """
+    Store a quote and its uniqueness marker in one transaction.
+
+    The marker put is conditional on the marker not existing yet, so an
+    exact duplicate cancels the whole transaction and no quote is written.
+    Concurrent submissions of the same text can conflict on the marker;
+    those are retried with backoff.
+
+    Args:
+        item: The quote item to store
+        quote_hash: Value from _quote_hash() for the quote text
+
+    Returns:
+        str | None: None if the quote was stored, otherwise the id of the
+        quote that already has this text
+    """
+    table = _get_table()
+    client = table.meta.client
+    transact_items = [
+        {
+            "Put": {
+                "TableName": table.name,
+                "Item": {**_quote_hash_key(quote_hash), "quoteId": item["SK"]},
+                "ConditionExpression": "attribute_not_exists(PK)",
+                "ReturnValuesOnConditionCheckFailure": "ALL_OLD",
+            }
+        },
+        {"Put": {"TableName": table.name, "Item": item}},
+    ]
+    for attempt in range(Config.BATCH_ATTEMPTS):
+        if attempt:
+            time.sleep(Config.BATCH_BACKOFF_SECONDS * 2 ** (attempt - 1))
+        try:
+            client.transact_write_items(TransactItems=transact_items)
+            return None
+        except client.exceptions.TransactionCanceledException as exc:
+            reasons = exc.response.get("CancellationReasons") or []
+            codes = [reason.get("Code") for reason in reasons]
+            if codes and codes[0] == "ConditionalCheckFailed":
+                # Cancellation reasons carry raw attribute values, even via the resource.
+                return str(reasons[0].get("Item", {}).get("quoteId", {}).get("S", ""))
+            if "TransactionConflict" not in codes or attempt == Config.BATCH_ATTEMPTS - 1:
+                raise
+    return None
+
+
+def _read_quote_stats() -> dict[str, Any]:
+    """
+    Read the aggregates item with a single GetItem.
+
+    Returns:
+        dict: {"quoteCount": int, "recent": [quotes newest first],
+        "months": {"YYYY-MM": count}}
+    """
+    item = _get_table().get_item(Key=STATS_KEY).get("Item") or {}
+    recent = []
+    for slot in range(Config.STATS_RECENT_QUOTES):
+        quote = item.get(f"recent{slot}")
+        if quote:
+            recent.append({**quote, "url": f"/quotes/{quote['quoteId']}/"})
+    months = {
+        name.removeprefix("month#"): int(count) for name, count in sorted(item.items()) if name.startswith("month#")
+    }
+    return {"quoteCount": int(item.get("quoteCount", 0)), "recent": recent, "months": months}
+
+
+def _validate_quote(raw_quote: Any) -> tuple[str, Optional[str]]:
+    """
+    Normalize a submitted quote and decide whether to accept it.
+
+    Normalizing, the length check and the SQL scan each take linear time, so
+    validation stays cheap however adversarial the input.
+
+    Args:
+        raw_quote: The "quote" value from the request body
+
+    Returns:
+        tuple: (normalized quote, error message or None if the quote is valid)
+    """
+    quote = _normalize_quote(raw_quote or "")
+    if not (Config.MIN_INPUT_LENGTH <= len(quote) <= Config.MAX_INPUT_LENGTH):
+        return quote, f"Quote length must be between {Config.MIN_INPUT_LENGTH} and {Config.MAX_INPUT_LENGTH}."
+    if _looks_like_sql(quote):
+        return quote, "Input contains SQL-like content. There is no SQL here."
+    return quote, None
+
+
+def _invoke_page_generator(items: list[dict[str, str]]) -> None:
+    """
+    Ask the page generator to publish newly stored quotes.
+
+    The payload carries the quotes themselves so the generator only has to
+    render those quotes' pages plus the homepage and sitemap, instead of
+    rebuilding every quote page. A batch submission sends all of its quotes
+    in one payload, so it costs a single publish.
+
+    When the table's stream drives the publisher, PAGE_GENERATOR_FUNCTION_NAME
+    is left unset and this does nothing, keeping the invoke off the request path.
+
+    Args:
+        items: The DynamoDB items that were just written
+    """
     function_name = os.getenv("PAGE_GENERATOR_FUNCTION_NAME", "").strip()
-    if not function_name:
+    if not function_name or not items:
         return
 
-    payload = json.dumps({"source": "quotes-api"}).encode("utf-8")
+    changed = [
+        {"quoteId": item["SK"], "quote": item["quote"], "createdAt": item["createdAt"]}
+        for item in items
+    ]
+    payload = json.dumps(
+        {"source": "quotes-api", **changed[0]} if len(changed) == 1 else {"source": "quotes-api", "quotes": changed}
+    ).encode("utf-8")
     try:
         _get_lambda_client().invoke(
             FunctionName=function_name,
@@ -209,13 +827,99 @@ def _invoke_page_generator() -> None:
     except Exception as exc:
         print(f"Failed to invoke page generator: {exc}")
 
+_IDEMPOTENCY_KEY_PATTERN = re.compile(r"[\x21-\x7e]{1,255}")
+
+
+def _idempotent(event: dict[str, Any], route: str, process: Callable[[], dict[str, Any]]) -> dict[str, Any]:
+    """
+    Run a POST handler at most once per Idempotency-Key.
+
+    The first request with a key claims it with a conditional put, runs the
+    handler and stores the response with a TTL. Repeats with the same key and
+    body get that response replayed without touching the quotes or the
+    publisher. A repeat that arrives while the first is still running gets a
+    409 and can retry. Server errors release the claim so the client's retry
+    runs for real. A request killed before it could do either leaves a claim
+    that is only honoured until "pendingUntil" (IDEMPOTENCY_PENDING_SECONDS),
+    after which the next request with the key takes it over. Requests without
+    the header run as before. Records expire after IDEMPOTENCY_TTL_SECONDS
+    through the table's "expiresAt" TTL.
+
+    Args:
+        event: API Gateway event
+        route: "METHOD /path", folded into the request fingerprint
+        process: Runs the handler and returns its response
+
+    Returns:
+        dict: The handler's response, a replayed one, or a 400/409/422 error
+    """
+    key = _header(event, "idempotency-key").strip()
+    if not key:
+        return process()
+    if not _IDEMPOTENCY_KEY_PATTERN.fullmatch(key):
+        return _resp(400, {"error": "Idempotency-Key must be 1-255 printable ASCII characters."})
+
+    table = _get_table()
+    record_key = {"PK": f"IDEMPOTENCY#{key}", "SK": "IDEMPOTENCY"}
+    fingerprint = _sha256_hex(f"{route}\n{event.get('body') or ''}")
+    now = int(time.time())
+    try:
+        # TTL deletion lags expiry, so an expired record counts as absent, and
+        # so does a pending claim whose request timed out or was killed.
+        table.put_item(
+            Item={
+                **record_key,
+                "state": "pending",
+                "fingerprint": fingerprint,
+                "pendingUntil": now + Config.IDEMPOTENCY_PENDING_SECONDS,
+                "expiresAt": now + Config.IDEMPOTENCY_TTL_SECONDS,
+            },
+            ConditionExpression=(
+                "attribute_not_exists(PK) OR expiresAt < :now OR (#state = :pending AND pendingUntil < :now)"
+            ),
+            ExpressionAttributeNames={"#state": "state"},
+            ExpressionAttributeValues={":now": now, ":pending": "pending"},
+        )
+    except table.meta.client.exceptions.ConditionalCheckFailedException:
+        record = table.get_item(Key=record_key, ConsistentRead=True).get("Item") or {}
+        if record.get("fingerprint") != fingerprint:
+            return _resp(422, {"error": "Idempotency-Key was already used for a different request."})
+        if record.get("state") != "done":
+            return _resp(
+                409,
+                {"error": "A request with this Idempotency-Key is still in progress."},
+                headers={"retry-after": "1"},
+            )
+        replayed: dict[str, Any] = json.loads(record["response"])
+        replayed["headers"] = {**replayed.get("headers", {}), "idempotent-replayed": "true"}
+        return replayed
+
+    try:
+        response = process()
+    except Exception:
+        table.delete_item(Key=record_key)
+        raise
+    if response["statusCode"] >= 500:
+        table.delete_item(Key=record_key)
+        return response
+    table.update_item(
+        Key=record_key,
+        UpdateExpression="SET #state = :done, #response = :response",
+        ExpressionAttributeNames={"#state": "state", "#response": "response"},
+        ExpressionAttributeValues={":done": "done", ":response": json.dumps(response)},
+    )
+    return response
+
+
 def _post_quote(event: dict[str, Any], _ctx: Optional[Any]) -> dict[str, Any]:
     """
     Create a new quote and store it in DynamoDB.
 
     Validates quote length, checks for SQL-like content, normalizes the quote text,
-    generates a ULID for the sort key, and stores in DynamoDB. It then kicks
-    off the static site publisher asynchronously.
+    generates a ULID for the sort key, and stores in DynamoDB alongside a
+    marker keyed by a hash of the text. It then kicks off the static site
+    publisher asynchronously. Exact duplicates are rejected by the marker's
+    condition without writing or publishing anything.
 
     Args:
         event: API Gateway event with JSON body containing a quote string
@@ -226,39 +930,471 @@ def _post_quote(event: dict[str, Any], _ctx: Optional[Any]) -> dict[str, Any]:
             - 201 Created on success with quote metadata
             - 400 Bad Request on validation errors
             - 400 Bad Request on invalid JSON
+            - 409 Conflict if the same quote was already submitted
 
     Validation:
         - Quote length must be 5-300 characters
         - Quote cannot contain SQL-like patterns
         - JSON body must be valid
     """
+    with _metrics.phase("validateMs"):
+        try:
+            body = json.loads(event.get("body") or "{}")
+        except Exception:
+            return _resp(400, {"error": "Invalid JSON"})
+
+        quote, error = _validate_quote(body.get("quote"))
+    if error:
+        return _resp(400, {"error": error})
+
+    now = datetime.now(timezone.utc).isoformat()
+    quote_id = _ulid()
+    item = {
+        "PK": _quote_partition_key(quote_id, get_quote_shards()),
+        "SK": quote_id,
+        "quote": quote,
+        "createdAt": now,
+    }
+    with _metrics.phase("writeMs"):
+        existing_id = _put_unique_quote(item, _quote_hash(quote))
+    if existing_id is not None:
+        _metrics.add("duplicates", 1)
+        return _resp(
+            409,
+            {
+                "error": "That quote has already been submitted.",
+                "quoteId": existing_id,
+                "url": f"/quotes/{existing_id}/",
+            },
+            headers={"access-control-allow-origin": get_cors_origin()},
+        )
+    _remember_newest_quote(quote_id)
+    _metrics.add("quotesCreated", 1)
+    with _metrics.phase("writeMs"):
+        _update_quote_stats([item])
+    with _metrics.phase("invokeMs"):
+        _invoke_page_generator([item])
+    return _resp(
+        201,
+        {
+            "quoteId": item["SK"],
+            "quote": quote,
+            "createdAt": now,
+            "url": f"/quotes/{item['SK']}/",
+        },
+        headers={"access-control-allow-origin": get_cors_origin()},
+    )
+
+def _existing_quote_ids(quote_hashes: list[str]) -> dict[str, str]:
+    """
+    Look up which quote hashes already have a uniqueness marker.
+
+    Args:
+        quote_hashes: Values from _quote_hash()
+
+    Returns:
+        dict: Quote id of the stored quote, keyed by hash, for hashes that exist
+    """
+    table = _get_table()
+    client = table.meta.client
+    existing: dict[str, str] = {}
+    for start in range(0, len(quote_hashes), Config.BATCH_GET_CHUNK):
+        keys = [_quote_hash_key(quote_hash) for quote_hash in quote_hashes[start:start + Config.BATCH_GET_CHUNK]]
+        for attempt in range(Config.BATCH_ATTEMPTS):
+            if attempt:
+                time.sleep(Config.BATCH_BACKOFF_SECONDS * 2 ** (attempt - 1))
+            response = client.batch_get_item(RequestItems={table.name: {"Keys": keys}})
+            for marker in response.get("Responses", {}).get(table.name, []):
+                existing[marker["PK"].removeprefix("QUOTEHASH#")] = marker["quoteId"]
+            keys = response.get("UnprocessedKeys", {}).get(table.name, {}).get("Keys", [])
+            if not keys:
+                break
+        else:
+            raise RuntimeError(f"{len(keys)} duplicate checks were still unprocessed after retries")
+    return existing
+
+
+def _batch_write_items(items: list[dict[str, str]]) -> list[dict[str, str]]:
+    """
+    Write items with BatchWriteItem, retrying unprocessed ones with backoff.
+
+    Args:
+        items: Items to put, in chunks of up to 25 per request
+
+    Returns:
+        list: Items that were still unprocessed after every attempt
+    """
+    table = _get_table()
+    client = table.meta.client
+    failed: list[dict[str, str]] = []
+    for start in range(0, len(items), Config.BATCH_WRITE_CHUNK):
+        requests = [{"PutRequest": {"Item": item}} for item in items[start:start + Config.BATCH_WRITE_CHUNK]]
+        for attempt in range(Config.BATCH_ATTEMPTS):
+            if attempt:
+                time.sleep(Config.BATCH_BACKOFF_SECONDS * 2 ** (attempt - 1))
+            response = client.batch_write_item(RequestItems={table.name: requests})
+            requests = response.get("UnprocessedItems", {}).get(table.name, [])
+            if not requests:
+                break
+        failed.extend(request["PutRequest"]["Item"] for request in requests)
+    return failed
+
+
+def _post_quote_batch(event: dict[str, Any], _ctx: Optional[Any]) -> dict[str, Any]:
+    """
+    Create several quotes at once, e.g. to import remembered quotes.
+
+    Every entry goes through the same validation and duplicate check as
+    POST /quotes. Accepted quotes are written with BatchWriteItem, then their
+    uniqueness markers, so a quote that fails to store never leaves a marker
+    behind. The whole batch triggers a single publish.
+
+    Unlike the single-quote path, the duplicate check is a read followed by an
+    unconditional write, so a concurrent submission of the same text can
+    still slip through.
+
+    Args:
+        event: API Gateway event with JSON body {"quotes": ["...", ...]}
+        _ctx: Lambda context (unused)
+
+    Returns:
+        dict: API Gateway response with:
+            - 200 OK with a result per entry, each with its own status
+              (201 created, 400 invalid, 409 duplicate, 503 not stored)
+            - 400 Bad Request on invalid JSON or a missing or oversized list
+    """
     try:
         body = json.loads(event.get("body") or "{}")
     except Exception:
         return _resp(400, {"error": "Invalid JSON"})
 
-    raw_quote = (body.get("quote") or "").strip()
-    quote = _normalize_quote(raw_quote)
+    entries = body.get("quotes") if isinstance(body, dict) else None
+    if not isinstance(entries, list) or not 1 <= len(entries) <= Config.MAX_BATCH_QUOTES:
+        return _resp(400, {"error": f"Send a \"quotes\" list of 1 to {Config.MAX_BATCH_QUOTES} quotes."})
 
-    n = len(quote)
-    if not (Config.MIN_INPUT_LENGTH <= n <= Config.MAX_INPUT_LENGTH):
-        return _resp(400, {"error": f"Quote length must be between {Config.MIN_INPUT_LENGTH} and {Config.MAX_INPUT_LENGTH}."})
-    if SQLISH.search(quote):
-        return _resp(400, {"error": "Input contains SQL-like content. There is no SQL here."})
+    _metrics.add("quotesReceived", len(entries))
+    results: list[dict[str, Any]] = [{"index": index} for index in range(len(entries))]
+    accepted: dict[str, tuple[int, str]] = {}  # hash -> (index, normalized quote)
+    with _metrics.phase("validateMs"):
+        for index, raw_quote in enumerate(entries):
+            if not isinstance(raw_quote, str):
+                results[index].update(status=400, error="Each quote must be a string.")
+                continue
+            quote, error = _validate_quote(raw_quote)
+            if error:
+                results[index].update(status=400, error=error)
+                continue
+            quote_hash = _quote_hash(quote)
+            if quote_hash in accepted:
+                results[index].update(status=409, error=f"Duplicate of entry {accepted[quote_hash][0]}.")
+                continue
+            accepted[quote_hash] = (index, quote)
+
+    with _metrics.phase("duplicateCheckMs"):
+        existing = _existing_quote_ids(list(accepted))
+    _metrics.add("duplicates", len(existing))
+    for quote_hash, quote_id in existing.items():
+        index, _ = accepted.pop(quote_hash)
+        results[index].update(
+            status=409,
+            error="That quote has already been submitted.",
+            quoteId=quote_id,
+            url=f"/quotes/{quote_id}/",
+        )
 
     now = datetime.now(timezone.utc).isoformat()
-    item = {"PK": "QUOTE", "SK": _ulid(), "quote": quote, "createdAt": now}
-    _get_table().put_item(Item=item)
-    _invoke_page_generator()
+    shards = get_quote_shards()
+    items: dict[str, dict[str, str]] = {}  # hash -> quote item
+    for (quote_hash, (_, quote)), quote_id in zip(accepted.items(), _ulids.batch(len(accepted))):
+        items[quote_hash] = {
+            "PK": _quote_partition_key(quote_id, shards),
+            "SK": quote_id,
+            "quote": quote,
+            "createdAt": now,
+        }
+
+    with _metrics.phase("writeMs"):
+        failed_ids = {item["SK"] for item in _batch_write_items(list(items.values()))}
+        stored = {quote_hash: item for quote_hash, item in items.items() if item["SK"] not in failed_ids}
+        # A marker that fails to write only weakens duplicate detection for that
+        # text; tools/backfill_quote_hashes.py restores it.
+        _batch_write_items(
+            [{**_quote_hash_key(quote_hash), "quoteId": item["SK"]} for quote_hash, item in stored.items()]
+        )
+    _metrics.add("quotesCreated", len(stored))
+
+    for quote_hash, item in items.items():
+        index, _ = accepted[quote_hash]
+        if item["SK"] in failed_ids:
+            results[index].update(status=503, error="Could not store this quote. Try again.")
+        else:
+            results[index].update(
+                status=201,
+                quoteId=item["SK"],
+                quote=item["quote"],
+                createdAt=now,
+                url=f"/quotes/{item['SK']}/",
+            )
+
+    if stored:
+        _remember_newest_quote(max(item["SK"] for item in stored.values()))
+        with _metrics.phase("writeMs"):
+            _update_quote_stats(list(stored.values()))
+    with _metrics.phase("invokeMs"):
+        _invoke_page_generator(list(stored.values()))
     return _resp(
-        201,
+        200,
+        {"created": len(stored), "results": results},
+        headers={"access-control-allow-origin": get_cors_origin()},
+    )
+
+_newest_quote_id: Optional[str] = None
+_newest_quote_seen_at = 0.0
+
+
+def _remember_newest_quote(quote_id: Optional[str]) -> None:
+    """
+    Record the newest quote id this instance knows about.
+
+    Called after this instance writes quotes and after it reads the first
+    page. Within the cache window the newer id wins, so an eventually
+    consistent read cannot roll back an id this instance just wrote.
+
+    Args:
+        quote_id: Newest quote id seen, or None for an empty table
+    """
+    global _newest_quote_id, _newest_quote_seen_at
+    fresh, known = _cached_newest_quote()
+    if fresh and known and (quote_id is None or known > quote_id):
+        quote_id = known
+    _newest_quote_id = quote_id
+    _newest_quote_seen_at = time.monotonic()
+
+
+def _cached_newest_quote() -> tuple[bool, Optional[str]]:
+    """
+    Get the cached newest quote id if it is recent enough to answer polls.
+
+    Returns:
+        tuple: (whether the cache is fresh, newest quote id or None)
+    """
+    if time.monotonic() - _newest_quote_seen_at >= Config.LATEST_MAX_AGE_SECONDS:
+        return False, None
+    return True, _newest_quote_id
+
+
+def _encode_cursor(quote_id: str) -> str:
+    """
+    Wrap the last returned key in an opaque, URL-safe cursor.
+
+    Only the sort key is kept: it is the LastEvaluatedKey's SK, and it bounds
+    the next page in every shard, whichever partition the quote lives in.
+
+    Args:
+        quote_id: SK of the last quote on the page
+
+    Returns:
+        str: Cursor for the next page
+    """
+    raw = json.dumps({"SK": quote_id}, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def _decode_cursor(cursor: str) -> Optional[str]:
+    """
+    Unwrap a cursor from _encode_cursor().
+
+    Args:
+        cursor: Cursor from a previous response
+
+    Returns:
+        str | None: The SK to continue before, or None if the cursor is invalid
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        quote_id = json.loads(raw)["SK"]
+    except Exception:
+        return None
+    if not isinstance(quote_id, str) or not _ULID_PATTERN.fullmatch(quote_id):
+        return None
+    return quote_id
+
+
+def _header(event: dict[str, Any], name: str) -> str:
+    """
+    Read a request header case-insensitively.
+
+    Args:
+        event: API Gateway event
+        name: Lower-case header name
+
+    Returns:
+        str: Header value, or "" if absent
+    """
+    for key, value in (event.get("headers") or {}).items():
+        if key.lower() == name:
+            return str(value or "")
+    return ""
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    """
+    Check an If-None-Match header against an entity tag.
+
+    Uses the weak comparison RFC 9110 prescribes for If-None-Match.
+
+    Args:
+        if_none_match: Raw If-None-Match header value
+        etag: Current strong entity tag, including quotes
+
+    Returns:
+        bool: True if the client's copy is current
+    """
+    tags = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+    return "*" in tags or etag in tags
+
+
+def _query_quote_page(limit: int, before: Optional[str]) -> tuple[list[dict[str, Any]], bool]:
+    """
+    Read one page of quotes, newest first, from every quote partition.
+
+    Each partition is queried backwards with the same Limit and the results
+    are merged by SK, so a page costs at most one capped query per shard.
+
+    Args:
+        limit: Page size
+        before: Only return quotes with an SK below this one
+
+    Returns:
+        tuple: (quotes on the page, whether older quotes may remain)
+    """
+    table = _get_table()
+
+    def query(partition_key: str) -> tuple[list[dict[str, Any]], bool]:
+        query_args: dict[str, Any] = {
+            "KeyConditionExpression": "PK = :pk" + (" AND SK < :before" if before else ""),
+            "ExpressionAttributeValues": {":pk": partition_key, **({":before": before} if before else {})},
+            "ProjectionExpression": "SK, #text, createdAt",
+            "ExpressionAttributeNames": {"#text": "quote"},
+            "ScanIndexForward": False,
+            "Limit": limit,
+        }
+        response = table.query(**query_args)
+        return response.get("Items", []), "LastEvaluatedKey" in response
+
+    partition_keys = _quote_partition_keys(get_quote_shards())
+    if len(partition_keys) == 1:
+        results = [query(partition_keys[0])]
+    else:
+        from concurrent.futures import ThreadPoolExecutor
+
+        with ThreadPoolExecutor(max_workers=min(len(partition_keys), 16)) as pool:
+            results = list(pool.map(query, partition_keys))
+
+    items = sorted((item for page, _ in results for item in page), key=lambda item: item["SK"], reverse=True)
+    more = len(items) > limit or any(truncated for _, truncated in results)
+    return items[:limit], more
+
+
+def _list_quotes(event: dict[str, Any], _ctx: Optional[Any]) -> dict[str, Any]:
+    """
+    Return a page of quotes, newest first.
+
+    The first page's ETag is derived from the newest quote id, which this
+    instance caches for LATEST_MAX_AGE_SECONDS (its own writes update it
+    immediately), so polls with a matching If-None-Match get a 304 without a
+    table read. Later pages are fixed by their cursor because quotes are
+    append-only, so they revalidate without a read at all and may be cached
+    for longer.
+
+    Args:
+        event: API Gateway event with optional "limit" and "cursor" query
+            parameters and an optional If-None-Match header
+        _ctx: Lambda context (unused)
+
+    Returns:
+        dict: API Gateway response with:
+            - 200 OK with {"quotes": [...], "nextCursor": str | None}
+            - 304 Not Modified if If-None-Match matches the current ETag
+            - 400 Bad Request on an invalid limit or cursor
+
+    Query Parameters:
+        limit: Page size, 1-100 (default 20; larger values are capped)
+        cursor: nextCursor from the previous page
+    """
+    params = event.get("queryStringParameters") or {}
+    try:
+        limit = int(params.get("limit") or Config.DEFAULT_LIST_LIMIT)
+    except ValueError:
+        return _resp(400, {"error": "limit must be a number."})
+    limit = min(max(1, limit), Config.MAX_LIST_LIMIT)
+
+    before = None
+    if params.get("cursor"):
+        before = _decode_cursor(params["cursor"])
+        if before is None:
+            return _resp(400, {"error": "Invalid cursor."})
+
+    if_none_match = _header(event, "if-none-match")
+    if before:
+        etag = f'"before.{before}.{limit}"'
+        max_age = Config.PAGE_MAX_AGE_SECONDS
+    else:
+        fresh, newest = _cached_newest_quote()
+        etag = f'"latest.{newest or "empty"}.{limit}"' if fresh else ""
+        max_age = Config.LATEST_MAX_AGE_SECONDS
+    cache_headers = {
+        "access-control-allow-origin": get_cors_origin(),
+        "cache-control": f"public, max-age={max_age}, stale-while-revalidate={max_age}",
+    }
+    if etag and if_none_match and _etag_matches(if_none_match, etag):
+        _metrics.add("notModified", 1)
+        return {"statusCode": 304, "headers": {**cache_headers, "etag": etag}, "body": ""}
+
+    with _metrics.phase("queryMs"):
+        items, more = _query_quote_page(limit, before)
+    if not before:
+        _remember_newest_quote(items[0]["SK"] if items else None)
+        _, newest = _cached_newest_quote()
+        etag = f'"latest.{newest or "empty"}.{limit}"'
+        if if_none_match and _etag_matches(if_none_match, etag):
+            _metrics.add("notModified", 1)
+            return {"statusCode": 304, "headers": {**cache_headers, "etag": etag}, "body": ""}
+
+    _metrics.add("quotesReturned", len(items))
+    quotes = [
         {
             "quoteId": item["SK"],
-            "quote": quote,
-            "createdAt": now,
+            "quote": item["quote"],
+            "createdAt": item["createdAt"],
             "url": f"/quotes/{item['SK']}/",
+        }
+        for item in items
+    ]
+    next_cursor = _encode_cursor(items[-1]["SK"]) if more and items else None
+    return _resp(200, {"quotes": quotes, "nextCursor": next_cursor}, headers={**cache_headers, "etag": etag})
+
+def _get_quote_stats(_event: dict[str, Any], _ctx: Optional[Any]) -> dict[str, Any]:
+    """
+    Return the quote count, newest quotes and per-month counts.
+
+    Served from the aggregates item, so it costs one GetItem however many
+    quotes exist.
+
+    Args:
+        _event: API Gateway event (unused)
+        _ctx: Lambda context (unused)
+
+    Returns:
+        dict: API Gateway response with the aggregates from _read_quote_stats()
+    """
+    return _resp(
+        200,
+        _read_quote_stats(),
+        headers={
+            "access-control-allow-origin": get_cors_origin(),
+            "cache-control": f"public, max-age={Config.LATEST_MAX_AGE_SECONDS}",
         },
-        headers={"access-control-allow-origin": get_cors_origin()},
     )
 
 def handler(event: dict[str, Any], ctx: Any) -> dict[str, Any]:
@@ -266,7 +1402,7 @@ def handler(event: dict[str, Any], ctx: Any) -> dict[str, Any]:
     Lambda function entry point for the quotes API.
 
     Handles API Gateway requests and routes them to appropriate handlers.
-    This Lambda only accepts quote submissions and CORS preflight requests.
+    This Lambda accepts quote submissions, quote listings and CORS preflight requests.
 
     Args:
         event: API Gateway event payload (HTTP API v2 or REST API format)
@@ -277,6 +1413,183 @@ def handler(event: dict[str, Any], ctx: Any) -> dict[str, Any]:
 
     Supported Routes:
         - POST /quotes: Create a new quote
+        - POST /quotes/batch: Create up to 100 quotes with one publish
+        - GET /quotes: List quotes newest first, with cursor pagination
+        - GET /quotes/stats: Quote count, newest quotes and monthly counts
         - OPTIONS /quotes: CORS preflight
+
+    With EMIT_METRICS set, every invocation also logs one EMF line with its
+    phase timings and counts, even when the request fails. PROFILE_HANDLER
+    (or "profile": true in a direct invoke) profiles the invocation.
+    """
+    if _profiling_requested(event):
+        return _profile_invocation(lambda: _measured_route(event, ctx), ctx)
+    return _measured_route(event, ctx)
+
+def _measured_route(event: dict[str, Any], ctx: Any) -> dict[str, Any]:
+    """
+    Route the request and log its metrics line when EMIT_METRICS is set.
+
+    Args:
+        event: API Gateway event payload
+        ctx: Lambda context object
+
+    Returns:
+        dict: The response from _route()
+    """
+    metrics = _start_metrics(ctx)
+    try:
+        with metrics.phase("requestMs"):
+            response = _route(event, ctx)
+        metrics.add(f"status{response['statusCode'] // 100}xx", 1)
+        return response
+    finally:
+        metrics.emit()
+
+def _profiling_requested(event: dict[str, Any]) -> bool:
     """
-    return _route(event, ctx)
+    Decide whether to profile this invocation.
+
+    API Gateway puts the client's payload under "body", so a top-level
+    "profile" key can only come from someone allowed to invoke the function.
+
+    Args:
+        event: Lambda event payload
+
+    Returns:
+        bool: True for {"profile": true} or when PROFILE_HANDLER is set
+    """
+    if isinstance(event, dict) and event.get("profile") is True:
+        return True
+    return os.getenv("PROFILE_HANDLER", "").strip().lower() in {"1", "true", "yes", "on"}
+
+def _profile_invocation(call: Callable[[], dict[str, Any]], ctx: Any) -> dict[str, Any]:
+    """
+    Run the invocation under cProfile and tracemalloc, then save the results.
+
+    The profiling modules are imported here, so unprofiled invocations never
+    load them. A failure to save the profile is logged, not raised.
+
+    page_generator.profile_invocation, profile_report and save_profile copy
+    this and the two helpers below; a fix to one belongs in both.
+
+    Args:
+        call: The invocation to profile
+        ctx: Lambda context, used to name the profile
+
+    Returns:
+        dict: The invocation's response
+    """
+    import cProfile
+    import tracemalloc
+
+    started_tracing = not tracemalloc.is_tracing()
+    if started_tracing:
+        tracemalloc.start()
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        return call()
+    finally:
+        profiler.disable()
+        snapshot = tracemalloc.take_snapshot()
+        if started_tracing:
+            tracemalloc.stop()
+        try:
+            _save_profile(profiler, snapshot, ctx)
+        except Exception as exc:
+            print(f"Failed to save profile: {exc}")
+
+def _profile_report(profiler: Any, snapshot: Any) -> str:
+    """
+    Summarise a profile as text.
+
+    Args:
+        profiler: A disabled cProfile.Profile
+        snapshot: tracemalloc snapshot taken when the invocation finished
+
+    Returns:
+        str: Slowest functions by cumulative time, then the largest allocation sites
+    """
+    import io
+    import pstats
+
+    report = io.StringIO()
+    pstats.Stats(profiler, stream=report).sort_stats("cumulative").print_stats(Config.PROFILE_TOP_FUNCTIONS)
+    report.write(f"Top {Config.PROFILE_TOP_ALLOCATIONS} allocation sites still held at the end of the invocation:\n")
+    for stat in snapshot.statistics("lineno")[:Config.PROFILE_TOP_ALLOCATIONS]:
+        report.write(f"{stat}\n")
+    return report.getvalue()
+
+def _save_profile(profiler: Any, snapshot: Any, ctx: Any) -> None:
+    """
+    Write <function>/<time>-<request id>.pstats and .txt for a profiled invocation.
+
+    The .pstats file loads with pstats or snakeviz. With no destination
+    configured, the text summary is logged instead.
+
+    Args:
+        profiler: A disabled cProfile.Profile
+        snapshot: tracemalloc snapshot taken when the invocation finished
+        ctx: Lambda context object
+
+    Environment Variables:
+        LOCAL_SITE_DIR: Write under <dir>/.profiles/ (local development)
+        PROFILE_S3_URI: Otherwise upload under this s3://bucket/prefix/
+    """
+    import marshal
+
+    profiler.create_stats()
+    function_name = getattr(ctx, "function_name", None) or os.getenv("AWS_LAMBDA_FUNCTION_NAME", "quotes-api")
+    request_id = getattr(ctx, "aws_request_id", None) or _ulid()
+    name = f"{function_name}/{datetime.now(timezone.utc):%Y%m%dT%H%M%SZ}-{request_id}"
+    artifacts = {
+        f"{name}.pstats": marshal.dumps(profiler.stats),
+        f"{name}.txt": _profile_report(profiler, snapshot).encode("utf-8"),
+    }
+
+    local_site_dir = os.getenv("LOCAL_SITE_DIR", "").strip()
+    s3_uri = os.getenv("PROFILE_S3_URI", "").strip()
+    if local_site_dir:
+        for key, body in artifacts.items():
+            path = os.path.join(local_site_dir, Config.PROFILE_LOCAL_DIR, key)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "wb") as output:
+                output.write(body)
+        print(f"Wrote profile to {os.path.join(local_site_dir, Config.PROFILE_LOCAL_DIR, name)}.*")
+    elif s3_uri.startswith("s3://"):
+        import boto3
+
+        bucket, _, prefix = s3_uri.removeprefix("s3://").partition("/")
+        s3 = boto3.client("s3", region_name=Config.REGION)
+        for key, body in artifacts.items():
+            s3.put_object(Bucket=bucket, Key=f"{prefix}{key}", Body=body)
+        print(f"Wrote profile to s3://{bucket}/{prefix}{name}.*")
+    else:
+        print(artifacts[f"{name}.txt"].decode("utf-8"))
+
+def _prewarm_clients() -> None:
+    """
+    Build the AWS clients during the Lambda init phase when that is free.
+
+    Provisioned-concurrency and SnapStart environments initialise ahead of
+    traffic, so importing boto3 and constructing clients there adds no request
+    latency. On-demand cold starts leave it to the first POST /quotes, so
+    OPTIONS and 404 responses never wait for boto3.
+
+    Environment Variables:
+        PREWARM_CLIENTS: "true" or "false" to override the detection
+        AWS_LAMBDA_INITIALIZATION_TYPE: Set by Lambda (e.g. "on-demand")
+    """
+    setting = os.getenv("PREWARM_CLIENTS", "").strip().lower()
+    if setting:
+        enabled = setting in {"1", "true", "yes", "on"}
+    else:
+        enabled = os.getenv("AWS_LAMBDA_INITIALIZATION_TYPE") in {"provisioned-concurrency", "snap-start"}
+    if not enabled:
+        return
+    _get_table()
+    if os.getenv("PAGE_GENERATOR_FUNCTION_NAME", "").strip():
+        _get_lambda_client()
+
+_prewarm_clients()
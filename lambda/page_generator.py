@@ -1,13 +1,35 @@
+import gzip
+import hashlib
 import html
 import json
 import os
+import re
 import shutil
-from datetime import datetime, timezone
+import tempfile
+import threading
+import time
+import uuid
+import zlib
+from collections.abc import Callable, Iterable, Iterator
+from contextlib import AbstractContextManager, nullcontext
+from dataclasses import dataclass
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from heapq import merge
+from datetime import datetime, timedelta, timezone
+from itertools import chain
 from pathlib import Path
-from typing import Any
+from typing import IO, Any
 
 import boto3
-from boto3.dynamodb.conditions import Key
+from boto3.dynamodb.types import TypeDeserializer
+from boto3.s3.transfer import TransferConfig
+from botocore.config import Config as BotoConfig
+from botocore.exceptions import ClientError
+
+try:
+    import brotli  # Not in the Lambda runtime; enables PRECOMPRESS=br where installed.
+except ImportError:  # pragma: no cover - depends on the environment
+    brotli = None
 
 
 GA_MEASUREMENT_ID = "G-RR8X5VGSWX"
@@ -17,11 +39,76 @@ SITE_DESCRIPTION = (
     "Share your favorite Bruce quotes and discover what others remember him saying."
 )
 MAX_STRUCTURED_QUOTES = 50
+QUOTES_PER_PAGE = 50
 HTML_CACHE_CONTROL = "public, max-age=5"
 SITEMAP_CACHE_CONTROL = "public, max-age=60"
+SITEMAP_SHARD_CACHE_CONTROL = "public, max-age=604800"
+SITEMAP_SHARD_SIZE = 10_000
+SITEMAP_INDEX_KEYS = ("sitemap-index.xml", "sitemap.xml")
+SITEMAP_PAGES_KEY = "sitemaps/pages.xml"
+HTML_CONTENT_TYPE = "text/html; charset=utf-8"
+XML_CONTENT_TYPE = "application/xml"
+# Publisher state shares the site bucket; CloudFront answers 404 for this prefix.
+PUBLISH_STATE_PREFIX = ".publish/"
+MANIFEST_KEY = f"{PUBLISH_STATE_PREFIX}manifest.json"
+MANIFEST_GROUP_PREFIX = f"{PUBLISH_STATE_PREFIX}manifest/"
+MANIFEST_VERSION = 2
+# Quote page digests are grouped by the first characters of the quote's ULID.
+# Four cover 2^30 ms (about 12 days), so only the newest group changes when a
+# quote arrives. Archive pages are grouped in runs of MANIFEST_PAGES_PER_GROUP.
+MANIFEST_QUOTE_PREFIX_CHARS = 4
+MANIFEST_PAGES_PER_GROUP = 500
+DEFAULT_PUBLISH_CONCURRENCY = 16
+ENCODING_SUFFIXES = {"gzip": ".gz", "br": ".br"}
+STREAM_BLOCK_BYTES = 64 * 1024
+SPOOL_MAX_BYTES = 1024 * 1024
+MULTIPART_THRESHOLD_BYTES = 8 * 1024 * 1024
+# Uploads already run on the SiteWriter pool, so each transfer stays on its thread.
+TRANSFER_CONFIG = TransferConfig(
+    multipart_threshold=MULTIPART_THRESHOLD_BYTES,
+    multipart_chunksize=MULTIPART_THRESHOLD_BYTES,
+    use_threads=False,
+)
+SNAPSHOT_KEY = f"{PUBLISH_STATE_PREFIX}snapshot.json.gz"
+SNAPSHOT_VERSION = 1
+# ULIDs are minted by the API before the write lands, so a slow request can
+# commit a key just below the newest one already seen. Re-read this much of
+# the tail on every incremental load to pick those up.
+SNAPSHOT_LOOKBACK_MS = 5 * 60 * 1000
+DEFAULT_SNAPSHOT_REVALIDATE_SECONDS = 24 * 60 * 60
+CROCKFORD_ALPHABET = "0123456789ABCDEFGHJKMNPQRSTVWXYZ"
+# Every pair of Crockford characters, indexed by the 10 bits they encode.
+CROCKFORD_PAIRS = tuple(high + low for high in CROCKFORD_ALPHABET for low in CROCKFORD_ALPHABET)
+CROCKFORD_TO_BASE32HEX = str.maketrans(CROCKFORD_ALPHABET, "0123456789ABCDEFGHIJKLMNOPQRSTUV")
+ULID_PATTERN = re.compile(r"[0-9A-HJKMNP-TV-Z]{26}")
+ULID_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+ULID_MAX_TIMESTAMP_MS = (1 << 48) - 1
+QUOTE_PARTITION = "QUOTE"
+MAX_QUOTE_SHARDS = 64
+COORDINATION_KEY = {"PK": "PUBLISH", "SK": "STATE"}
+DEFAULT_COALESCE_SECONDS = 1.0
+# lambda.tf's timeout; bounds the lease when there is no Lambda context.
+DEFAULT_INVOCATION_SECONDS = 60
+COALESCED_POLL_SECONDS = 1.0
+# A waiting invocation gives up this long before it would be killed, so it
+# fails cleanly and its trigger is retried.
+COALESCED_GIVE_UP_SECONDS = 5.0
+MAX_PUBLISH_PASSES = 5
+# Past this many ids the coordination item (400 KB at most) asks for a full
+# publish instead of tracking more.
+MAX_PENDING_IDS = 1000
+# Set by tools/migrate_quote_shards.py on the copy it writes; the move does not
+# change any page, so its INSERT is not a publish trigger.
+MOVED_FROM_ATTRIBUTE = "movedFrom"
+DEFAULT_METRICS_NAMESPACE = "ShitBruceSays"
+PROFILE_LOCAL_DIR = ".profiles"
+PROFILE_TOP_FUNCTIONS = 40
+PROFILE_TOP_ALLOCATIONS = 25
 
 _s3_client: Any | None = None
 _dynamodb_resource: Any | None = None
+_dynamodb_client: Any | None = None
+_deserializer = TypeDeserializer()
 
 
 def get_bucket_name() -> str:
@@ -58,28 +145,213 @@ def get_local_site_dir() -> Path | None:
     return Path(local_site_dir)
 
 
+def get_publish_concurrency() -> int:
+    try:
+        return max(1, int(os.environ.get("PUBLISH_CONCURRENCY", DEFAULT_PUBLISH_CONCURRENCY)))
+    except ValueError:
+        return DEFAULT_PUBLISH_CONCURRENCY
+
+
+def get_precompress_encodings() -> tuple[str, ...]:
+    requested = [
+        encoding.strip().lower()
+        for encoding in os.environ.get("PRECOMPRESS", "").split(",")
+        if encoding.strip()
+    ]
+    encodings = []
+    for encoding in requested:
+        if encoding not in ENCODING_SUFFIXES:
+            print(f"Ignoring unknown PRECOMPRESS encoding {encoding!r}")
+        elif encoding == "br" and brotli is None:
+            print("Ignoring PRECOMPRESS=br because the brotli module is not installed")
+        elif encoding not in encodings:
+            encodings.append(encoding)
+    return tuple(encodings)
+
+
+def get_quote_shards() -> int:
+    raw = os.environ.get("QUOTE_SHARDS", "")
+    try:
+        shards = int(raw) if raw else 1
+    except ValueError:
+        return 1
+    return min(max(1, shards), MAX_QUOTE_SHARDS)
+
+
+def get_fast_query_decode() -> bool:
+    return os.environ.get("FAST_QUERY_DECODE", "true").strip().lower() not in {"0", "false", "no", "off"}
+
+
+def get_snapshot_revalidate_seconds() -> float:
+    raw = os.environ.get("SNAPSHOT_REVALIDATE_SECONDS", "")
+    try:
+        return max(0.0, float(raw)) if raw else DEFAULT_SNAPSHOT_REVALIDATE_SECONDS
+    except ValueError:
+        return DEFAULT_SNAPSHOT_REVALIDATE_SECONDS
+
+
+def get_metrics_enabled() -> bool:
+    return os.environ.get("EMIT_METRICS", "").strip().lower() in {"1", "true", "yes", "on"}
+
+
+def get_metrics_namespace() -> str:
+    return os.environ.get("METRICS_NAMESPACE", "").strip() or DEFAULT_METRICS_NAMESPACE
+
+
+def get_profiling_enabled() -> bool:
+    return os.environ.get("PROFILE_HANDLER", "").strip().lower() in {"1", "true", "yes", "on"}
+
+
+def get_profile_s3_uri() -> str:
+    return os.environ.get("PROFILE_S3_URI", "").strip()
+
+
 def get_s3_client() -> Any:
     global _s3_client
     if _s3_client is None:
-        _s3_client = boto3.client("s3", region_name=get_region())
+        # One pooled connection per upload worker, plus headroom for the manifest.
+        _s3_client = boto3.client(
+            "s3",
+            region_name=get_region(),
+            config=BotoConfig(
+                max_pool_connections=get_publish_concurrency() + 2,
+                retries={"max_attempts": 5, "mode": "standard"},
+            ),
+        )
     return _s3_client
 
 
 def get_dynamodb_resource() -> Any:
     global _dynamodb_resource
     if _dynamodb_resource is None:
+        # Sharded reads query every partition at once on the shared client.
         _dynamodb_resource = boto3.resource(
             "dynamodb",
             region_name=get_region(),
             endpoint_url=os.environ.get("DYNAMODB_ENDPOINT"),
+            config=BotoConfig(max_pool_connections=max(10, get_quote_shards() + 2)),
         )
     return _dynamodb_resource
 
 
+def get_dynamodb_client() -> Any:
+    # A plain client returns raw attribute values, skipping the resource's
+    # generic (de)serialization, which decode_quote_item does for our schema.
+    global _dynamodb_client
+    if _dynamodb_client is None:
+        _dynamodb_client = boto3.client(
+            "dynamodb",
+            region_name=get_region(),
+            endpoint_url=os.environ.get("DYNAMODB_ENDPOINT"),
+            config=BotoConfig(max_pool_connections=max(10, get_quote_shards() + 2)),
+        )
+    return _dynamodb_client
+
+
 def get_table() -> Any:
     return get_dynamodb_resource().Table(get_table_name())
 
 
+class InvocationMetrics:
+    """Phase timings and counters for one invocation, logged as one EMF line.
+
+    An EMF line becomes CloudWatch metrics as it is ingested from the logs,
+    so recording costs no API calls. Uploads add to the totals from worker
+    threads, hence the lock. Copy of app._Metrics; a fix to one belongs in both.
+    """
+
+    def __init__(self, namespace: str, function_name: str) -> None:
+        self.namespace = namespace
+        self.function_name = function_name
+        self.values: dict[str, float] = {}
+        self.units: dict[str, str] = {}
+        self.properties: dict[str, str] = {}
+        self._lock = threading.Lock()
+
+    def set(self, name: str, value: str) -> None:
+        # Logged alongside the metrics for Logs Insights, but not a dimension.
+        self.properties[name] = value
+
+    def add(self, name: str, value: float, unit: str = "Count") -> None:
+        with self._lock:
+            self.values[name] = self.values.get(name, 0) + value
+            self.units[name] = unit
+
+    def phase(self, name: str) -> AbstractContextManager[Any]:
+        # Phases entered more than once (or on several threads) accumulate.
+        return MetricsPhase(self, name)
+
+    def document(self) -> dict[str, Any]:
+        with self._lock:
+            values = {name: round(value, 3) for name, value in self.values.items()}
+            metrics = [{"Name": name, "Unit": self.units[name]} for name in values]
+        return {
+            "_aws": {
+                "Timestamp": int(time.time() * 1000),
+                "CloudWatchMetrics": [
+                    {"Namespace": self.namespace, "Dimensions": [["FunctionName"]], "Metrics": metrics}
+                ],
+            },
+            "FunctionName": self.function_name,
+            **self.properties,
+            **values,
+        }
+
+    def emit(self) -> None:
+        print(json.dumps(self.document(), separators=(",", ":")))
+
+
+class MetricsPhase:
+    def __init__(self, metrics: InvocationMetrics, name: str) -> None:
+        self.metrics = metrics
+        self.name = name
+        self.started = 0.0
+
+    def __enter__(self) -> None:
+        self.started = time.perf_counter()
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.metrics.add(self.name, (time.perf_counter() - self.started) * 1000, "Milliseconds")
+
+
+class NullMetrics:
+    # Used while EMIT_METRICS is off: every hook is a no-op on a shared object.
+    # Mirrors app._NullMetrics.
+
+    def set(self, name: str, value: str) -> None:
+        pass
+
+    def add(self, name: str, value: float, unit: str = "Count") -> None:
+        pass
+
+    def phase(self, name: str) -> AbstractContextManager[Any]:
+        return NULL_PHASE
+
+    def emit(self) -> None:
+        pass
+
+
+NULL_PHASE = nullcontext()
+NULL_METRICS = NullMetrics()
+_metrics: InvocationMetrics | NullMetrics = NULL_METRICS
+
+
+def get_metrics() -> InvocationMetrics | NullMetrics:
+    return _metrics
+
+
+def start_metrics(context: Any) -> InvocationMetrics | NullMetrics:
+    global _metrics
+    if not get_metrics_enabled():
+        _metrics = NULL_METRICS
+    else:
+        function_name = getattr(context, "function_name", None) or os.environ.get(
+            "AWS_LAMBDA_FUNCTION_NAME", "page-generator"
+        )
+        _metrics = InvocationMetrics(get_metrics_namespace(), function_name)
+    return _metrics
+
+
 def escape_html(text: str) -> str:
     return html.escape(text, quote=True)
 
@@ -98,12 +370,31 @@ def format_date(iso_string: str) -> str:
         return iso_string
 
 
-def quote_url(quote_id: str) -> str:
-    return f"{get_site_base_url()}/quotes/{quote_id}/"
+@dataclass(frozen=True, slots=True)
+class Quote:
+    """A published quote with the values every page renders worked out once."""
 
+    id: str
+    text: str
+    created_at: str
+    escaped_text: str
+    display_date: str
 
-def root_url() -> str:
-    return f"{get_site_base_url()}/"
+    @classmethod
+    def create(cls, quote_id: str, text: str, created_at: str) -> "Quote":
+        return cls(quote_id, text, created_at, escape_html(text), format_date(created_at))
+
+    @classmethod
+    def from_item(cls, item: dict[str, Any]) -> "Quote":
+        return cls.create(str(item["SK"]), str(item["quote"]), str(item["createdAt"]))
+
+    @property
+    def lastmod(self) -> str:
+        return self.created_at[:10]
+
+
+def archive_page_path(page_number: int) -> str:
+    return f"page/{page_number}/"
 
 
 def analytics_script() -> str:
@@ -120,8 +411,7 @@ def render_json_ld(data: Any) -> str:
     return json.dumps(data, ensure_ascii=True, separators=(",", ":"))
 
 
-def render_share_buttons(quote_id: str, quote_text: str) -> str:
-    escaped_text = escape_html(quote_text)
+def render_share_buttons(quote_id: str, escaped_text: str) -> str:
     return f"""
         <div class="share-buttons">
           <button class="share-btn" data-quote-id="{quote_id}" data-quote-text="{escaped_text}" data-platform="linkedin" title="Share on LinkedIn" type="button">
@@ -136,125 +426,271 @@ def render_share_buttons(quote_id: str, quote_text: str) -> str:
         </div>"""
 
 
-def render_quote_card(quote: dict[str, str]) -> str:
-    quote_id = quote["SK"]
-    permalink = quote_url(quote_id)
-    quote_text = escape_html(quote["quote"])
-    display_date = format_date(quote["createdAt"])
-    share_buttons = render_share_buttons(quote_id, quote["quote"])
+def archive_page_count(total: int) -> int:
+    # Archive pages are numbered from the oldest quote, so page N always holds
+    # the same QUOTES_PER_PAGE quotes. Only full pages are published, and the
+    # newest full page stays on the homepage until another full page of quotes
+    # has arrived, so the homepage always shows at least QUOTES_PER_PAGE.
+    return max(0, total // QUOTES_PER_PAGE - 1)
+
+
+def homepage_quote_count(total: int) -> int:
+    # Everything newer than the newest archive page: QUOTES_PER_PAGE to
+    # 2 * QUOTES_PER_PAGE - 1 quotes, so the "Older quotes" link never repeats one.
+    return total - archive_page_count(total) * QUOTES_PER_PAGE
+
+
+def archive_page_quotes(quotes: list[Quote], page_number: int) -> list[Quote]:
+    total = len(quotes)
+    newest_ordinal = page_number * QUOTES_PER_PAGE
+    return quotes[total - newest_ordinal : total - newest_ordinal + QUOTES_PER_PAGE]
+
+
+def render_pagination(newer_url: str | None, older_url: str | None) -> str:
+    if not newer_url and not older_url:
+        return ""
+    links = []
+    if newer_url:
+        links.append(f'<a rel="prev" href="{escape_html(newer_url)}">Newer quotes</a>')
+    if older_url:
+        links.append(f'<a rel="next" href="{escape_html(older_url)}">Older quotes</a>')
     return f"""
-        <article class="quote" id="{quote_id}">
-          <h3 class="visually-hidden">Quote from {display_date}</h3>
-          <blockquote cite="{permalink}">
-            <p>"{quote_text}"</p>
-            <footer>
-              <cite>— Bruce</cite>
-            </footer>
-          </blockquote>
-          <div class="quote-meta">
-            <time class="timestamp" datetime="{quote["createdAt"]}">
-              <a href="{permalink}" aria-label="Permalink to this quote">{display_date}</a>
-            </time>
-            {share_buttons}
-          </div>
-        </article>"""
+      <nav class="pagination" aria-label="Quote pages">
+        {" ".join(links)}
+      </nav>"""
 
 
-def render_head(
-    *,
-    title: str,
-    description: str,
-    canonical_url: str,
-    og_type: str,
-    structured_data: Any,
-) -> str:
-    escaped_title = escape_html(title)
-    escaped_description = escape_html(description)
-    escaped_canonical = escape_html(canonical_url)
-    api_base_url = escape_html(get_api_base_url())
-    image_url = escape_html(f"{get_site_base_url()}/favicon.svg")
-    return f"""<head>
+def sitemap_shard_count(total: int) -> int:
+    return -(-total // SITEMAP_SHARD_SIZE)
+
+
+def sitemap_shard_key(shard_number: int) -> str:
+    return f"sitemaps/quotes-{shard_number}.xml"
+
+
+def sitemap_shard_quotes(quotes: list[Quote], shard_number: int) -> list[Quote]:
+    # Like archive pages, shards are numbered from the oldest quote so a full
+    # shard always lists the same URLs.
+    total = len(quotes)
+    oldest_index = total - (shard_number - 1) * SITEMAP_SHARD_SIZE
+    return quotes[max(0, oldest_index - SITEMAP_SHARD_SIZE) : oldest_index]
+
+
+def sitemap_shard_cache_control(shard_quotes: list[Quote]) -> str:
+    if len(shard_quotes) >= SITEMAP_SHARD_SIZE:
+        return SITEMAP_SHARD_CACHE_CONTROL
+    return SITEMAP_CACHE_CONTROL
+
+
+def render_sitemap_url(loc: str, lastmod: str, changefreq: str, priority: str) -> str:
+    return f"""
+    <url>
+        <loc>{escape_html(loc)}</loc>
+        <lastmod>{lastmod}</lastmod>
+        <changefreq>{changefreq}</changefreq>
+        <priority>{priority}</priority>
+    </url>"""
+
+
+def iter_urlset(urls: Iterable[str]) -> Iterator[str]:
+    yield '<?xml version="1.0" encoding="UTF-8"?>\n<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">'
+    yield from urls
+    yield "\n</urlset>\n"
+
+
+def render_urlset(urls: list[str]) -> str:
+    return "".join(iter_urlset(urls))
+
+
+class SiteTemplate:
+    """Page templates with the site-wide values resolved once.
+
+    Build one per publish with from_env(). Everything that is the same on
+    every page (base URLs, analytics, static meta tags, page chrome) is
+    rendered in the constructor, so each page only splices in its own parts.
+    """
+
+    def __init__(self, site_base_url: str, api_base_url: str) -> None:
+        self.site_base_url = site_base_url
+        self.root_url = f"{site_base_url}/"
+        self._quote_url_prefix = f"{site_base_url}/quotes/"
+        self._head_start = f"""<head>
   {analytics_script()}
   <meta charset="UTF-8">
   <meta name="viewport" content="width=device-width, initial-scale=1.0">
-  <meta name="api-base" content="{api_base_url}">
+  <meta name="api-base" content="{escape_html(api_base_url)}">"""
+        image_url = escape_html(f"{site_base_url}/favicon.svg")
+        self._og_image = f"""  <meta property="og:site_name" content="{SITE_NAME}">
+  <meta property="og:image" content="{image_url}">
+  <meta property="og:image:width" content="512">
+  <meta property="og:image:height" content="512">
+  <meta property="og:image:type" content="image/svg+xml">
+  <meta property="og:locale" content="en_US">
+  <meta property="twitter:card" content="summary">"""
+        self._twitter_image = f"""  <meta property="twitter:image" content="{image_url}">"""
+        self._head_assets = """  <link rel="icon" type="image/svg+xml" href="/favicon.svg">
+  <link rel="stylesheet" href="/styles.css">
+  <link rel="stylesheet" href="https://cdnjs.cloudflare.com/ajax/libs/font-awesome/6.4.0/css/all.min.css">"""
+        self._quote_page_body_start = f"""
+<body>
+  <div id="wrapper">
+    <header>
+      <h1><a href="/" style="color: inherit; text-decoration: none;">{SITE_NAME}</a></h1>
+      <p class="tagline">A collection of memorable quotes and sayings from Bruce</p>
+    </header>
+
+    <main>
+      <p class="page-intro"><a href="/">Back to all quotes</a></p>
+      <section class="quotes" id="quotes" aria-label="Bruce quote">
+        """
+        self._quote_page_body_end = """
+      </section>
+    </main>
+  </div>
+</body>
+</html>"""
+        self._website = {
+            "@type": "WebSite",
+            "name": SITE_NAME,
+            "url": self.root_url,
+        }
+
+    @classmethod
+    def from_env(cls) -> "SiteTemplate":
+        return cls(get_site_base_url(), get_api_base_url())
+
+    def quote_url(self, quote_id: str) -> str:
+        return f"{self._quote_url_prefix}{quote_id}/"
+
+    def archive_page_url(self, page_number: int) -> str:
+        return f"{self.site_base_url}/{archive_page_path(page_number)}"
+
+    def newer_page_url(self, page_number: int, page_count: int) -> str:
+        if page_number < page_count:
+            return self.archive_page_url(page_number + 1)
+        return self.root_url
+
+    def render_head(
+        self,
+        *,
+        title: str,
+        description: str,
+        canonical_url: str,
+        og_type: str,
+        structured_data: Any,
+        prev_url: str | None = None,
+        next_url: str | None = None,
+    ) -> str:
+        pagination_links = "".join(
+            f'\n  <link rel="{rel}" href="{escape_html(url)}">'
+            for rel, url in (("prev", prev_url), ("next", next_url))
+            if url
+        )
+        escaped_title = escape_html(title)
+        escaped_description = escape_html(description)
+        escaped_canonical = escape_html(canonical_url)
+        return f"""{self._head_start}
   <meta name="description" content="{escaped_description}">
   <meta name="author" content="{SITE_NAME}">
   <meta property="og:type" content="{escape_html(og_type)}">
   <meta property="og:url" content="{escaped_canonical}">
   <meta property="og:title" content="{escaped_title}">
   <meta property="og:description" content="{escaped_description}">
-  <meta property="og:site_name" content="{SITE_NAME}">
-  <meta property="og:image" content="{image_url}">
-  <meta property="og:image:width" content="512">
-  <meta property="og:image:height" content="512">
-  <meta property="og:image:type" content="image/svg+xml">
-  <meta property="og:locale" content="en_US">
-  <meta property="twitter:card" content="summary">
+{self._og_image}
   <meta property="twitter:url" content="{escaped_canonical}">
   <meta property="twitter:title" content="{escaped_title}">
   <meta property="twitter:description" content="{escaped_description}">
-  <meta property="twitter:image" content="{image_url}">
-  <link rel="canonical" href="{escaped_canonical}">
-  <link rel="icon" type="image/svg+xml" href="/favicon.svg">
-  <link rel="stylesheet" href="/styles.css">
-  <link rel="stylesheet" href="https://cdnjs.cloudflare.com/ajax/libs/font-awesome/6.4.0/css/all.min.css">
+{self._twitter_image}
+  <link rel="canonical" href="{escaped_canonical}">{pagination_links}
+{self._head_assets}
   <script type="application/ld+json">{render_json_ld(structured_data)}</script>
   <script src="/app.js" defer></script>
   <title>{escaped_title}</title>
 </head>"""
 
+    def render_quote_card(self, quote: Quote) -> str:
+        quote_id = quote.id
+        permalink = self.quote_url(quote_id)
+        quote_text = quote.escaped_text
+        display_date = quote.display_date
+        share_buttons = render_share_buttons(quote_id, quote_text)
+        return f"""
+        <article class="quote" id="{quote_id}">
+          <h3 class="visually-hidden">Quote from {display_date}</h3>
+          <blockquote cite="{permalink}">
+            <p>"{quote_text}"</p>
+            <footer>
+              <cite>— Bruce</cite>
+            </footer>
+          </blockquote>
+          <div class="quote-meta">
+            <time class="timestamp" datetime="{quote.created_at}">
+              <a href="{permalink}" aria-label="Permalink to this quote">{display_date}</a>
+            </time>
+            {share_buttons}
+          </div>
+        </article>"""
 
-def render_homepage(quotes: list[dict[str, str]]) -> str:
-    featured_quote = quotes[0] if quotes else None
-    featured_description = (
-        f'"{truncate(featured_quote["quote"], 140)}" and many more memorable quotes from Bruce.'
-        if featured_quote
-        else SITE_DESCRIPTION
-    )
-    item_list = [
-        {
-            "@type": "ListItem",
-            "position": index + 1,
-            "url": quote_url(quote["SK"]),
-            "name": truncate(quote["quote"], 120),
+    def render_item_list(self, quotes: list[Quote], total: int, first_ordinal: int) -> dict[str, Any]:
+        # Positions count up from the oldest quote so a quote keeps the same
+        # position on every page that lists it, however many quotes come later.
+        return {
+            "@type": "ItemList",
+            "itemListOrder": "https://schema.org/ItemListOrderDescending",
+            "numberOfItems": total,
+            "itemListElement": [
+                {
+                    "@type": "ListItem",
+                    "position": first_ordinal - index,
+                    "url": self.quote_url(quote.id),
+                    "name": truncate(quote.text, 120),
+                }
+                for index, quote in enumerate(quotes[:MAX_STRUCTURED_QUOTES])
+            ],
         }
-        for index, quote in enumerate(quotes[:MAX_STRUCTURED_QUOTES])
-    ]
-    structured_data = {
-        "@context": "https://schema.org",
-        "@graph": [
-            {
-                "@type": "WebSite",
-                "name": SITE_NAME,
-                "url": root_url(),
-                "description": SITE_DESCRIPTION,
-            },
-            {
-                "@type": "CollectionPage",
-                "name": SITE_NAME,
-                "url": root_url(),
-                "description": featured_description,
-                "mainEntity": {
-                    "@type": "ItemList",
-                    "numberOfItems": len(quotes),
-                    "itemListElement": item_list,
+
+    def iter_quote_cards(self, quotes: list[Quote]) -> Iterator[str]:
+        for index, quote in enumerate(quotes):
+            if index:
+                yield "\n"
+            yield self.render_quote_card(quote)
+
+    def render_homepage(self, quotes: list[Quote]) -> str:
+        return "".join(self.iter_homepage(quotes))
+
+    def iter_homepage(self, quotes: list[Quote]) -> Iterator[str]:
+        featured_quote = quotes[0] if quotes else None
+        featured_description = (
+            f'"{truncate(featured_quote.text, 140)}" and many more memorable quotes from Bruce.'
+            if featured_quote
+            else SITE_DESCRIPTION
+        )
+        head_quotes = quotes[:homepage_quote_count(len(quotes))]
+        page_count = archive_page_count(len(quotes))
+        older_url = self.archive_page_url(page_count) if page_count else None
+        structured_data = {
+            "@context": "https://schema.org",
+            "@graph": [
+                {**self._website, "description": SITE_DESCRIPTION},
+                {
+                    "@type": "CollectionPage",
+                    "name": SITE_NAME,
+                    "url": self.root_url,
+                    "description": featured_description,
+                    "mainEntity": self.render_item_list(head_quotes, len(quotes), len(quotes)),
                 },
-            },
-        ],
-    }
-    quote_markup = "\n".join(render_quote_card(quote) for quote in quotes)
-    if not quote_markup:
-        quote_markup = '<p class="empty-state">No quotes yet. Be the first to add one.</p>'
+            ],
+        }
 
-    return f"""<!DOCTYPE html>
+        yield f"""<!DOCTYPE html>
 <html lang="en">
-{render_head(
+{self.render_head(
     title=SITE_NAME,
     description=featured_description,
-    canonical_url=root_url(),
+    canonical_url=self.root_url,
     og_type="website",
     structured_data=structured_data,
+    next_url=older_url,
 )}
 <body>
   <div id="wrapper">
@@ -279,44 +715,52 @@ def render_homepage(quotes: list[dict[str, str]]) -> str:
 
       <section class="quotes" id="quotes" aria-label="Bruce quotes" role="feed">
         <h2 class="visually-hidden">All Quotes</h2>
-        {quote_markup}
-      </section>
+        """
+        if head_quotes:
+            yield from self.iter_quote_cards(head_quotes)
+        else:
+            yield '<p class="empty-state">No quotes yet. Be the first to add one.</p>'
+        yield f"""
+      </section>{render_pagination(None, older_url)}
     </main>
   </div>
 </body>
 </html>"""
 
+    def render_archive_page(self, page_number: int, page_quotes: list[Quote], page_count: int) -> str:
+        return "".join(self.iter_archive_page(page_number, page_quotes, page_count))
+
+    def iter_archive_page(
+        self,
+        page_number: int,
+        page_quotes: list[Quote],
+        page_count: int,
+    ) -> Iterator[str]:
+        canonical = self.archive_page_url(page_number)
+        newer_url = self.newer_page_url(page_number, page_count)
+        older_url = self.archive_page_url(page_number - 1) if page_number > 1 else None
+        title = f"Older quotes, page {page_number} | {SITE_NAME}"
+        description = f"Page {page_number} of the archive of memorable quotes from Bruce."
+        structured_data = {
+            "@context": "https://schema.org",
+            "@type": "CollectionPage",
+            "name": title,
+            "url": canonical,
+            "description": description,
+            "isPartOf": self._website,
+            "mainEntity": self.render_item_list(page_quotes, len(page_quotes), page_number * QUOTES_PER_PAGE),
+        }
 
-def render_quote_page(quote: dict[str, str]) -> str:
-    quote_id = quote["SK"]
-    canonical = quote_url(quote_id)
-    title = f'"{truncate(quote["quote"], 120)}" — Bruce | {SITE_NAME}'
-    description = f'"{truncate(quote["quote"], 150)}" — Bruce, said on {format_date(quote["createdAt"])}'
-    structured_data = {
-        "@context": "https://schema.org",
-        "@type": "Quotation",
-        "text": quote["quote"],
-        "creator": {
-            "@type": "Person",
-            "name": "Bruce",
-        },
-        "dateCreated": quote["createdAt"],
-        "url": canonical,
-        "isPartOf": {
-            "@type": "WebSite",
-            "name": SITE_NAME,
-            "url": root_url(),
-        },
-    }
-
-    return f"""<!DOCTYPE html>
+        yield f"""<!DOCTYPE html>
 <html lang="en">
-{render_head(
+{self.render_head(
     title=title,
     description=description,
     canonical_url=canonical,
-    og_type="article",
+    og_type="website",
     structured_data=structured_data,
+    prev_url=newer_url,
+    next_url=older_url,
 )}
 <body>
   <div id="wrapper">
@@ -326,122 +770,1338 @@ def render_quote_page(quote: dict[str, str]) -> str:
     </header>
 
     <main>
-      <p class="page-intro"><a href="/">Back to all quotes</a></p>
-      <section class="quotes" id="quotes" aria-label="Bruce quote">
-        {render_quote_card(quote)}
-      </section>
+      <p class="page-intro"><a href="/">Back to the latest quotes</a></p>
+      <section class="quotes" id="quotes" aria-label="Bruce quotes, page {page_number}" role="feed">
+        <h2 class="visually-hidden">Older Quotes, Page {page_number}</h2>
+        """
+        yield from self.iter_quote_cards(page_quotes)
+        yield f"""
+      </section>{render_pagination(newer_url, older_url)}
     </main>
   </div>
 </body>
 </html>"""
 
+    def render_quote_page(self, quote: Quote) -> str:
+        canonical = self.quote_url(quote.id)
+        title = f'"{truncate(quote.text, 120)}" — Bruce | {SITE_NAME}'
+        description = f'"{truncate(quote.text, 150)}" — Bruce, said on {quote.display_date}'
+        structured_data = {
+            "@context": "https://schema.org",
+            "@type": "Quotation",
+            "text": quote.text,
+            "creator": {
+                "@type": "Person",
+                "name": "Bruce",
+            },
+            "dateCreated": quote.created_at,
+            "url": canonical,
+            "isPartOf": self._website,
+        }
+        head = self.render_head(
+            title=title,
+            description=description,
+            canonical_url=canonical,
+            og_type="article",
+            structured_data=structured_data,
+        )
+        return "".join(
+            (
+                '<!DOCTYPE html>\n<html lang="en">\n',
+                head,
+                self._quote_page_body_start,
+                self.render_quote_card(quote),
+                self._quote_page_body_end,
+            )
+        )
 
-def render_sitemap(quotes: list[dict[str, str]]) -> str:
-    current_date = datetime.now(timezone.utc).strftime("%Y-%m-%d")
-    quote_urls = []
-    for quote in quotes:
-        quote_date = quote["createdAt"][:10]
-        quote_urls.append(
-            f"""
-    <url>
-        <loc>{quote_url(quote["SK"])}</loc>
-        <lastmod>{quote_date}</lastmod>
-        <changefreq>monthly</changefreq>
-        <priority>0.7</priority>
-    </url>"""
+    def render_pages_sitemap(self, quotes: list[Quote], page_count: int) -> str:
+        return "".join(self.iter_pages_sitemap(quotes, page_count))
+
+    def iter_pages_sitemap(self, quotes: list[Quote], page_count: int) -> Iterator[str]:
+        # The homepage only changes when a quote is added, so date it by the newest
+        # quote rather than today; that keeps this file stable between publishes.
+        latest_date = quotes[0].lastmod if quotes else datetime.now(timezone.utc).strftime("%Y-%m-%d")
+        urls = chain(
+            [render_sitemap_url(self.root_url, latest_date, "daily", "1.0")],
+            (
+                render_sitemap_url(
+                    self.archive_page_url(page_number),
+                    archive_page_quotes(quotes, page_number)[0].lastmod,
+                    "yearly",
+                    "0.3",
+                )
+                for page_number in range(page_count, 0, -1)
+            ),
         )
+        return iter_urlset(urls)
 
-    return f"""<?xml version="1.0" encoding="UTF-8"?>
-<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">
-    <url>
-        <loc>{root_url()}</loc>
-        <lastmod>{current_date}</lastmod>
-        <changefreq>daily</changefreq>
-        <priority>1.0</priority>
-    </url>{''.join(quote_urls)}
-</urlset>
+    def render_sitemap_shard(self, shard_quotes: list[Quote]) -> str:
+        return "".join(self.iter_sitemap_shard(shard_quotes))
+
+    def iter_sitemap_shard(self, shard_quotes: list[Quote]) -> Iterator[str]:
+        return iter_urlset(
+            render_sitemap_url(self.quote_url(quote.id), quote.lastmod, "monthly", "0.7")
+            for quote in shard_quotes
+        )
+
+    def render_sitemap_index(self, quotes: list[Quote]) -> str:
+        latest_date = quotes[0].lastmod if quotes else datetime.now(timezone.utc).strftime("%Y-%m-%d")
+        entries = [(SITEMAP_PAGES_KEY, latest_date)]
+        for shard_number in range(sitemap_shard_count(len(quotes)), 0, -1):
+            newest_in_shard = sitemap_shard_quotes(quotes, shard_number)[0]
+            entries.append((sitemap_shard_key(shard_number), newest_in_shard.lastmod))
+
+        sitemaps = "".join(
+            f"""
+    <sitemap>
+        <loc>{escape_html(f"{self.site_base_url}/{key}")}</loc>
+        <lastmod>{lastmod}</lastmod>
+    </sitemap>"""
+            for key, lastmod in entries
+        )
+        return f"""<?xml version="1.0" encoding="UTF-8"?>
+<sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">{sitemaps}
+</sitemapindex>
 """
 
 
+def quote_url(quote_id: str) -> str:
+    return SiteTemplate.from_env().quote_url(quote_id)
+
+
+def root_url() -> str:
+    return f"{get_site_base_url()}/"
+
+
+def render_homepage(quotes: list[Quote]) -> str:
+    return SiteTemplate.from_env().render_homepage(quotes)
+
+
+def render_archive_page(page_number: int, page_quotes: list[Quote], page_count: int) -> str:
+    return SiteTemplate.from_env().render_archive_page(page_number, page_quotes, page_count)
+
+
+def render_quote_page(quote: Quote) -> str:
+    return SiteTemplate.from_env().render_quote_page(quote)
+
+
+def render_pages_sitemap(quotes: list[Quote], page_count: int) -> str:
+    return SiteTemplate.from_env().render_pages_sitemap(quotes, page_count)
+
+
+def render_sitemap_shard(shard_quotes: list[Quote]) -> str:
+    return SiteTemplate.from_env().render_sitemap_shard(shard_quotes)
+
+
+def render_sitemap_index(quotes: list[Quote]) -> str:
+    return SiteTemplate.from_env().render_sitemap_index(quotes)
+
+
+def write_object(
+    key: str,
+    body: bytes | IO[bytes],
+    content_type: str,
+    cache_control: str,
+    content_encoding: str | None = None,
+) -> None:
+    # Each call is one PUT (or one multipart upload); uploadMs sums across workers.
+    metrics = get_metrics()
+    metrics.add("objectPuts", 1)
+    with metrics.phase("uploadMs"):
+        local_site_dir = get_local_site_dir()
+        if local_site_dir is not None:
+            output_path = local_site_dir / key
+            output_path.parent.mkdir(parents=True, exist_ok=True)
+            if isinstance(body, bytes):
+                output_path.write_bytes(body)
+            else:
+                body.seek(0)
+                with output_path.open("wb") as output:
+                    shutil.copyfileobj(body, output, STREAM_BLOCK_BYTES)
+            return
+
+        extra_args = {"ContentEncoding": content_encoding} if content_encoding else {}
+        if isinstance(body, bytes):
+            get_s3_client().put_object(
+                Bucket=get_bucket_name(),
+                Key=key,
+                Body=body,
+                ContentType=content_type,
+                CacheControl=cache_control,
+                **extra_args,
+            )
+            return
+
+        # Spooled bodies go through the transfer manager, which switches to a
+        # multipart upload past MULTIPART_THRESHOLD_BYTES. It leaves the file open;
+        # the caller owns it (write_and_release closes it).
+        body.seek(0)
+        get_s3_client().upload_fileobj(
+            body,
+            get_bucket_name(),
+            key,
+            ExtraArgs={"ContentType": content_type, "CacheControl": cache_control, **extra_args},
+            Config=TRANSFER_CONFIG,
+        )
+
+
+def encode_chunks(chunks: Iterable[str]) -> Iterator[bytes]:
+    # Renderers yield many small strings; coalesce them into fixed-size blocks
+    # so hashing and spooling are not called once per quote card.
+    pending: list[str] = []
+    pending_size = 0
+    for chunk in chunks:
+        pending.append(chunk)
+        pending_size += len(chunk)
+        if pending_size >= STREAM_BLOCK_BYTES:
+            yield "".join(pending).encode("utf-8")
+            pending.clear()
+            pending_size = 0
+    if pending:
+        yield "".join(pending).encode("utf-8")
+
+
+def spool_blocks(blocks: Iterable[bytes], digest: Any) -> bytes | IO[bytes]:
+    # Small bodies stay in memory; past SPOOL_MAX_BYTES the body moves to a
+    # temporary file so only one block of it is held at a time.
+    buffer = bytearray()
+    spool: IO[bytes] | None = None
+    for block in blocks:
+        digest.update(block)
+        if spool is not None:
+            spool.write(block)
+            continue
+        buffer += block
+        if len(buffer) > SPOOL_MAX_BYTES:
+            spool = tempfile.TemporaryFile()
+            spool.write(buffer)
+            buffer = bytearray()
+    if spool is None:
+        return bytes(buffer)
+    return spool
+
+
+def compress(data: bytes, encoding: str) -> bytes:
+    if encoding == "gzip":
+        # mtime=0 keeps the output byte-stable for identical input.
+        return gzip.compress(data, compresslevel=9, mtime=0)
+    if encoding == "br" and brotli is not None:
+        compressed: bytes = brotli.compress(data, quality=11)
+        return compressed
+    raise ValueError(f"Unsupported content encoding: {encoding}")
+
+
+def compress_file(source: IO[bytes], encoding: str) -> IO[bytes]:
+    source.seek(0)
+    target = tempfile.TemporaryFile()
+    if encoding == "gzip":
+        with gzip.GzipFile(fileobj=target, mode="wb", compresslevel=9, mtime=0) as gzip_file:
+            shutil.copyfileobj(source, gzip_file, STREAM_BLOCK_BYTES)
+    elif encoding == "br" and brotli is not None:
+        compressor = brotli.Compressor(quality=11)
+        while block := source.read(STREAM_BLOCK_BYTES):
+            target.write(compressor.process(block))
+        target.write(compressor.finish())
+    else:
+        target.close()
+        raise ValueError(f"Unsupported content encoding: {encoding}")
+    return target
+
+
+def body_size(body: bytes | IO[bytes]) -> int:
+    if isinstance(body, bytes):
+        return len(body)
+    return body.seek(0, os.SEEK_END)
+
+
+def write_with_encodings(
+    key: str,
+    body: bytes | IO[bytes],
+    content_type: str,
+    cache_control: str,
+    encodings: tuple[str, ...],
+) -> dict[str, int]:
+    # Precompressed variants sit next to the identity object as key.gz/key.br.
+    # The CloudFront viewer-request function picks one from Accept-Encoding.
+    sizes = {"identity": body_size(body)}
+    for encoding in encodings:
+        with get_metrics().phase("compressMs"):
+            encoded = compress(body, encoding) if isinstance(body, bytes) else compress_file(body, encoding)
+        sizes[encoding] = body_size(encoded)
+        try:
+            write_object(f"{key}{ENCODING_SUFFIXES[encoding]}", encoded, content_type, cache_control, encoding)
+        finally:
+            if not isinstance(encoded, bytes):
+                encoded.close()
+    write_object(key, body, content_type, cache_control)
+    return sizes
+
+
+def write_and_release(
+    key: str,
+    body: bytes | IO[bytes],
+    content_type: str,
+    cache_control: str,
+    encodings: tuple[str, ...],
+) -> dict[str, int]:
+    try:
+        return write_with_encodings(key, body, content_type, cache_control, encodings)
+    finally:
+        if not isinstance(body, bytes):
+            body.close()
+
+
 def put_html(key: str, body: str, cache_control: str = HTML_CACHE_CONTROL) -> None:
-    local_site_dir = get_local_site_dir()
-    if local_site_dir is not None:
-        output_path = local_site_dir / key
-        output_path.parent.mkdir(parents=True, exist_ok=True)
-        output_path.write_text(body, encoding="utf-8")
-        return
-
-    get_s3_client().put_object(
-        Bucket=get_bucket_name(),
-        Key=key,
-        Body=body.encode("utf-8"),
-        ContentType="text/html; charset=utf-8",
-        CacheControl=cache_control,
-    )
+    write_object(key, body.encode("utf-8"), HTML_CONTENT_TYPE, cache_control)
+
+
+def put_xml(key: str, body: str, cache_control: str = SITEMAP_CACHE_CONTROL) -> None:
+    write_object(key, body.encode("utf-8"), XML_CONTENT_TYPE, cache_control)
+
+
+def new_digest(content_type: str, cache_control: str, encodings: tuple[str, ...] = ()) -> Any:
+    # Headers and encodings are part of the digest so a cache policy change or
+    # newly enabled compression still re-uploads.
+    digest = hashlib.sha256()
+    digest.update(f"{content_type}\n{cache_control}\n{','.join(encodings)}\n".encode("utf-8"))
+    return digest
 
 
-def put_xml(key: str, body: str) -> None:
+def content_digest(
+    data: bytes,
+    content_type: str,
+    cache_control: str,
+    encodings: tuple[str, ...] = (),
+) -> str:
+    digest = new_digest(content_type, cache_control, encodings)
+    digest.update(data)
+    return str(digest.hexdigest())
+
+
+def read_object(key: str) -> bytes | None:
     local_site_dir = get_local_site_dir()
     if local_site_dir is not None:
-        output_path = local_site_dir / key
-        output_path.parent.mkdir(parents=True, exist_ok=True)
-        output_path.write_text(body, encoding="utf-8")
-        return
-
-    get_s3_client().put_object(
-        Bucket=get_bucket_name(),
-        Key=key,
-        Body=body.encode("utf-8"),
-        ContentType="application/xml",
-        CacheControl=SITEMAP_CACHE_CONTROL,
-    )
+        try:
+            return (local_site_dir / key).read_bytes()
+        except FileNotFoundError:
+            return None
 
+    try:
+        response = get_s3_client().get_object(Bucket=get_bucket_name(), Key=key)
+    except ClientError as error:
+        code = error.response.get("Error", {}).get("Code", "")
+        if code in {"404", "NoSuchKey", "NotFound"}:
+            return None
+        raise
+    body: bytes = response["Body"].read()
+    return body
+
+
+def manifest_group(key: str) -> str | None:
+    # None keeps a key in the root manifest, alongside the pages that change on
+    # most publishes (homepage, sitemap index and shards, pages.xml).
+    parts = key.split("/")
+    if len(parts) == 3 and parts[0] == "quotes":
+        return f"quotes-{parts[1][:MANIFEST_QUOTE_PREFIX_CHARS]}"
+    if len(parts) == 3 and parts[0] == "page" and parts[1].isdigit():
+        return f"page-{int(parts[1]) // MANIFEST_PAGES_PER_GROUP}"
+    return None
+
+
+def manifest_group_key(group: str) -> str:
+    return f"{MANIFEST_GROUP_PREFIX}{group}.json"
+
+
+def read_manifest_object(key: str) -> dict[str, Any] | None:
+    raw = read_object(key)
+    if raw is None:
+        return None
+    try:
+        document = json.loads(raw)
+        if document.get("version") != MANIFEST_VERSION or not isinstance(document.get("digests"), dict):
+            return None
+    except (ValueError, AttributeError):
+        print(f"Ignoring unreadable publish manifest {key}")
+        return None
+    return dict(document)
+
+
+def write_manifest_object(key: str, document: dict[str, Any]) -> None:
+    body = json.dumps({"version": MANIFEST_VERSION, **document}, separators=(",", ":"))
+    write_object(key, body.encode("utf-8"), "application/json", "no-store")
+
+
+def manifest_digests(document: dict[str, Any] | None) -> dict[str, str]:
+    if document is None:
+        return {}
+    return {str(key): str(value) for key, value in document["digests"].items()}
+
+
+class PublishManifest:
+    """Digests of published keys, split into small objects by manifest_group().
+
+    The root object holds the ungrouped keys and the names of the groups.
+    A group is read the first time one of its keys is looked up, and only
+    groups that changed are written back. An incremental publish therefore
+    reads and rewrites the root and the newest quote group, not a digest for
+    every quote in the corpus.
+    """
+
+    def __init__(self, digests: dict[str, str] | None = None, group_names: Iterable[str] = ()) -> None:
+        self.root = dict(digests or {})
+        self.group_names = set(group_names)
+        self.groups: dict[str, dict[str, str]] = {}
+        self.dirty: set[str | None] = set()
+
+    def get(self, key: str) -> str | None:
+        return self._digests(key)[1].get(key)
+
+    def put(self, key: str, digest: str) -> None:
+        group, digests = self._digests(key)
+        if digests.get(key) != digest:
+            digests[key] = digest
+            self.dirty.add(group)
+
+    def discard(self, key: str) -> None:
+        group, digests = self._digests(key)
+        if digests.pop(key, None) is not None:
+            self.dirty.add(group)
+
+    def prune(self, live_keys: set[str]) -> None:
+        # A full run looks up every live key, so a group it never loaded holds
+        # only stale keys.
+        for group, digests in [(None, self.root), *self.groups.items()]:
+            stale = [key for key in digests if key not in live_keys]
+            for key in stale:
+                del digests[key]
+            if stale:
+                self.dirty.add(group)
+        for group in self.group_names - set(self.groups):
+            self.groups[group] = {}
+            self.dirty.add(group)
+
+    def save(self) -> None:
+        if not self.dirty:
+            return
+        for group in sorted(group for group in self.dirty if group is not None):
+            digests = self.groups[group]
+            write_manifest_object(manifest_group_key(group), {"digests": dict(sorted(digests.items()))})
+            if digests:
+                self.group_names.add(group)
+            else:
+                self.group_names.discard(group)
+        write_manifest_object(
+            MANIFEST_KEY,
+            {"groups": sorted(self.group_names), "digests": dict(sorted(self.root.items()))},
+        )
+        self.dirty.clear()
+
+    def _digests(self, key: str) -> tuple[str | None, dict[str, str]]:
+        group = manifest_group(key)
+        if group is None:
+            return None, self.root
+        if group not in self.groups:
+            document = read_manifest_object(manifest_group_key(group)) if group in self.group_names else None
+            self.groups[group] = manifest_digests(document)
+        return group, self.groups[group]
+
+
+def load_manifest() -> PublishManifest:
+    document = read_manifest_object(MANIFEST_KEY)
+    groups = document.get("groups", []) if document is not None else []
+    return PublishManifest(manifest_digests(document), [str(group) for group in groups])
+
+
+class SiteWriter:
+    """Writes rendered objects, skipping any whose bytes match the manifest.
+
+    Against S3 the uploads run on a bounded thread pool; with the local
+    directory sink they run inline. Failures are collected per key and
+    reported by close() rather than aborting the rest of the run.
+    """
+
+    def __init__(
+        self,
+        manifest: PublishManifest,
+        *,
+        prune: bool = False,
+        concurrency: int | None = None,
+    ) -> None:
+        self.manifest = manifest
+        self.prune = prune
+        self.seen: set[str] = set()
+        self.written = 0
+        self.skipped = 0
+        self.failures: dict[str, str] = {}
+        self.encodings = get_precompress_encodings()
+        self.bytes_by_encoding = dict.fromkeys(("identity", *self.encodings), 0)
+        if concurrency is None:
+            concurrency = 1 if get_local_site_dir() is not None else get_publish_concurrency()
+        self.concurrency = max(1, concurrency)
+        self._executor = (
+            ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="publish")
+            if self.concurrency > 1
+            else None
+        )
+        self._pending: dict[Future[dict[str, int]], tuple[str, str]] = {}
+
+    def put(self, key: str, data: bytes | Iterable[bytes], content_type: str, cache_control: str) -> bool:
+        digest = new_digest(content_type, cache_control, self.encodings)
+        # Renderer iterators are consumed here, so this is most of the render time.
+        with get_metrics().phase("renderMs"):
+            if isinstance(data, bytes):
+                digest.update(data)
+                body: bytes | IO[bytes] = data
+            else:
+                body = spool_blocks(data, digest)
+        hexdigest = str(digest.hexdigest())
+        self.seen.add(key)
+        if self.manifest.get(key) == hexdigest and self._still_present(key):
+            if not isinstance(body, bytes):
+                body.close()
+            self.skipped += 1
+            return False
+
+        if self._executor is None:
+            try:
+                sizes = write_and_release(key, body, content_type, cache_control, self.encodings)
+            except Exception as exc:
+                self._record_failure(key, exc)
+            else:
+                self._record_success(key, hexdigest, sizes)
+            return True
+
+        # Keep at most two uploads queued per worker so rendered bodies do not pile up.
+        if len(self._pending) >= self.concurrency * 2:
+            self._collect(wait(self._pending, return_when=FIRST_COMPLETED).done)
+        future = self._executor.submit(
+            write_and_release, key, body, content_type, cache_control, self.encodings
+        )
+        self._pending[future] = (key, hexdigest)
+        return True
+
+    def put_html(self, key: str, body: str | Iterable[str], cache_control: str = HTML_CACHE_CONTROL) -> bool:
+        return self.put(key, self._encode(body), HTML_CONTENT_TYPE, cache_control)
+
+    def put_xml(self, key: str, body: str | Iterable[str], cache_control: str = SITEMAP_CACHE_CONTROL) -> bool:
+        return self.put(key, self._encode(body), XML_CONTENT_TYPE, cache_control)
+
+    def _encode(self, body: str | Iterable[str]) -> bytes | Iterable[bytes]:
+        # Whole strings (quote pages) are small; renderer iterators are streamed.
+        if isinstance(body, str):
+            return body.encode("utf-8")
+        return encode_chunks(body)
+
+    def flush(self) -> None:
+        if self._pending:
+            self._collect(wait(self._pending).done)
+
+    def close(self, *, save: bool = True) -> dict[str, Any]:
+        # save=False drops this run's digests; the next run rewrites its keys.
+        self.flush()
+        if self._executor is not None:
+            self._executor.shutdown()
+        if self.prune:
+            # A full run touches every live key, so anything else is stale.
+            self.manifest.prune(self.seen)
+        if save:
+            self.manifest.save()
+        return {
+            "objectsWritten": self.written,
+            "objectsSkipped": self.skipped,
+            "objectsFailed": len(self.failures),
+            "failedKeys": sorted(self.failures),
+            "bytesWritten": dict(self.bytes_by_encoding),
+        }
 
-def fetch_all_quotes() -> list[dict[str, str]]:
-    response = get_table().query(
-        KeyConditionExpression=Key("PK").eq("QUOTE"),
+    def _collect(self, done: set[Future[dict[str, int]]]) -> None:
+        for future in done:
+            key, digest = self._pending.pop(future)
+            exc = future.exception()
+            if exc is None:
+                self._record_success(key, digest, future.result())
+            else:
+                self._record_failure(key, exc)
+
+    def _record_success(self, key: str, digest: str, sizes: dict[str, int]) -> None:
+        self.manifest.put(key, digest)
+        self.written += 1
+        for encoding, size in sizes.items():
+            self.bytes_by_encoding[encoding] += size
+
+    def _record_failure(self, key: str, exc: BaseException) -> None:
+        # Leave the manifest alone so the next run retries this key.
+        self.manifest.discard(key)
+        self.failures[key] = str(exc)
+        print(f"Failed to publish {key}: {exc}")
+
+    def _still_present(self, key: str) -> bool:
+        local_site_dir = get_local_site_dir()
+        return local_site_dir is None or (local_site_dir / key).exists()
+
+
+def prune_local_pages(local_site_dir: Path, quote_ids: set[str], page_count: int) -> None:
+    quotes_dir = local_site_dir / "quotes"
+    if quotes_dir.is_dir():
+        for quote_dir in quotes_dir.iterdir():
+            if quote_dir.name not in quote_ids:
+                shutil.rmtree(quote_dir, ignore_errors=True)
+    pages_dir = local_site_dir / "page"
+    if pages_dir.is_dir():
+        live_pages = {str(page_number) for page_number in range(1, page_count + 1)}
+        for page_dir in pages_dir.iterdir():
+            if page_dir.name not in live_pages:
+                shutil.rmtree(page_dir, ignore_errors=True)
+    sitemaps_dir = local_site_dir / "sitemaps"
+    if sitemaps_dir.is_dir():
+        live_sitemaps = {Path(SITEMAP_PAGES_KEY).name} | {
+            Path(sitemap_shard_key(shard_number)).name
+            for shard_number in range(1, sitemap_shard_count(len(quote_ids)) + 1)
+        }
+        for sitemap_path in sitemaps_dir.iterdir():
+            if sitemap_path.name not in live_sitemaps:
+                sitemap_path.unlink()
+    shutil.rmtree(local_site_dir / "quote", ignore_errors=True)
+    legacy_seo = local_site_dir / "seo.html"
+    if legacy_seo.exists():
+        legacy_seo.unlink()
+
+
+def quote_partition_key(quote_id: str, shards: int) -> str:
+    # Must match app._quote_partition_key. One shard keeps the original key.
+    if shards <= 1:
+        return QUOTE_PARTITION
+    return f"{QUOTE_PARTITION}#{zlib.crc32(quote_id.encode('utf-8')) % shards}"
+
+
+def quote_partition_keys(shards: int) -> list[str]:
+    # The unsharded partition is always read so quotes written before sharding
+    # was enabled (or not yet migrated) are still published.
+    if shards <= 1:
+        return [QUOTE_PARTITION]
+    return [QUOTE_PARTITION, *(f"{QUOTE_PARTITION}#{shard}" for shard in range(shards))]
+
+
+def decode_quote_item(item: dict[str, Any]) -> Quote:
+    # Quote attributes are always strings; anything else (a hand-edited item,
+    # say) goes through the generic deserializer.
+    try:
+        return Quote.create(item["SK"]["S"], item["quote"]["S"], item["createdAt"]["S"])
+    except (KeyError, TypeError):
+        return Quote.from_item({name: _deserializer.deserialize(value) for name, value in item.items()})
+
+
+def query_partition(
+    client: Any,
+    partition_key: str,
+    consistent_read: bool = False,
+    since: str | None = None,
+    fast_decode: bool = False,
+) -> list[Quote]:
+    # With fast_decode the client is a plain one and values are raw attribute
+    # maps; otherwise it is the resource's client, which (de)serializes for us.
+    def value(text: str) -> Any:
+        return {"S": text} if fast_decode else text
+
+    key_condition = "PK = :pk"
+    values = {":pk": value(partition_key)}
+    if since is not None:
+        key_condition += " AND SK >= :since"
+        values[":since"] = value(since)
+    pages = client.get_paginator("query").paginate(
+        TableName=get_table_name(),
+        KeyConditionExpression=key_condition,
+        ProjectionExpression="SK, #text, createdAt",
+        ExpressionAttributeNames={"#text": "quote"},
+        ExpressionAttributeValues=values,
         ScanIndexForward=False,
+        ConsistentRead=consistent_read,
     )
-    quotes = list(response.get("Items", []))
-
-    while "LastEvaluatedKey" in response:
-        response = get_table().query(
-            KeyConditionExpression=Key("PK").eq("QUOTE"),
-            ScanIndexForward=False,
-            ExclusiveStartKey=response["LastEvaluatedKey"],
+    decode = decode_quote_item if fast_decode else Quote.from_item
+    return [decode(item) for page in pages for item in page.get("Items", [])]
+
+
+def query_quotes(consistent_read: bool = False, since: str | None = None) -> list[Quote]:
+    # Scatter one query per partition and merge the newest-first results by
+    # ULID. Clients are thread-safe; Table resources are not.
+    fast_decode = get_fast_query_decode()
+    client = get_dynamodb_client() if fast_decode else get_dynamodb_resource().meta.client
+    partitions = quote_partition_keys(get_quote_shards())
+    if len(partitions) == 1:
+        return query_partition(client, partitions[0], consistent_read, since, fast_decode)
+
+    with ThreadPoolExecutor(max_workers=len(partitions), thread_name_prefix="query") as executor:
+        results = list(
+            executor.map(
+                lambda partition_key: query_partition(client, partition_key, consistent_read, since, fast_decode),
+                partitions,
+            )
         )
-        quotes.extend(response.get("Items", []))
 
+    quotes: list[Quote] = []
+    # A migration copies a quote before deleting the original, so the same SK
+    # can briefly exist in two partitions; duplicates sort next to each other.
+    for quote in merge(*results, key=lambda quote: quote.id, reverse=True):
+        if not quotes or quotes[-1].id != quote.id:
+            quotes.append(quote)
     return quotes
 
 
-def publish_site() -> dict[str, Any]:
-    quotes = fetch_all_quotes()
+def fetch_all_quotes(consistent_read: bool = False) -> list[Quote]:
+    return query_quotes(consistent_read)
+
+
+def ulid_time_part(timestamp_ms: int) -> str:
+    # Same fixed-width encoder as app._ulid_time_part; a fix to one belongs in both.
+    pairs = CROCKFORD_PAIRS
+    return "".join([pairs[timestamp_ms >> shift & 0x3FF] for shift in (40, 30, 20, 10, 0)])
+
+
+def ulid_timestamp_ms(ulid: str) -> int:
+    # Copy of app._ulid_timestamp_ms; a fix to one belongs in both.
+    if not ULID_PATTERN.fullmatch(ulid):
+        raise ValueError(f"Not a ULID: {ulid!r}")
+    return int(ulid[:10].translate(CROCKFORD_TO_BASE32HEX), 32)
+
+
+def ulid_datetime(ulid: str) -> datetime:
+    return ULID_EPOCH + timedelta(milliseconds=ulid_timestamp_ms(ulid))
+
+
+def ulid_bounds(start: datetime, end: datetime | None = None) -> tuple[str, str]:
+    # The inclusive SK range of quotes created in [start, end), for a BETWEEN
+    # or >= key condition: the smallest ULID minted at start and the largest
+    # minted a millisecond before end. Without end the range is open-ended.
+    # Times are taken to the millisecond with timedelta arithmetic, which is
+    # exact where float timestamps are not.
+    start_ms = min(max(0, (start - ULID_EPOCH) // timedelta(milliseconds=1)), ULID_MAX_TIMESTAMP_MS)
+    end_ms = ULID_MAX_TIMESTAMP_MS if end is None else (end - ULID_EPOCH) // timedelta(milliseconds=1) - 1
+    end_ms = min(max(start_ms, end_ms), ULID_MAX_TIMESTAMP_MS)
+    return ulid_time_part(start_ms) + "0" * 16, ulid_time_part(end_ms) + "Z" * 16
+
+
+def ulid_time_floor(ulid: str, lookback_ms: int) -> str:
+    # The lowest key minted lookback_ms before ulid was.
+    return ulid_bounds(ulid_datetime(ulid) - timedelta(milliseconds=lookback_ms))[0]
+
+
+def load_snapshot() -> dict[str, Any] | None:
+    raw = read_object(SNAPSHOT_KEY)
+    if raw is None:
+        return None
+    try:
+        snapshot = json.loads(gzip.decompress(raw))
+        if snapshot.get("version") != SNAPSHOT_VERSION:
+            return None
+        quotes = [Quote.create(quote_id, text, created_at) for quote_id, text, created_at in snapshot["quotes"]]
+        return {"validatedAt": float(snapshot["validatedAt"]), "quotes": quotes}
+    except (OSError, ValueError, KeyError, TypeError, AttributeError):
+        print(f"Ignoring unreadable quote snapshot {SNAPSHOT_KEY}")
+        return None
+
+
+def save_snapshot(quotes: list[Quote], validated_at: float) -> None:
+    # Rows rather than objects keep the snapshot compact; quotes are newest first.
+    body = json.dumps(
+        {
+            "version": SNAPSHOT_VERSION,
+            "watermark": quotes[0].id if quotes else None,
+            "validatedAt": validated_at,
+            "quotes": [[quote.id, quote.text, quote.created_at] for quote in quotes],
+        },
+        ensure_ascii=False,
+        separators=(",", ":"),
+    )
+    write_object(SNAPSHOT_KEY, gzip.compress(body.encode("utf-8"), mtime=0), "application/gzip", "no-store")
+
+
+def load_quotes(
+    consistent_read: bool = False,
+    *,
+    revalidate: bool = False,
+) -> tuple[list[Quote], dict[str, Any]]:
+    # Quotes are append-only, so a snapshot plus a query for keys at or after
+    # its newest ULID (less SNAPSHOT_LOOKBACK_MS) sees everything new. Full
+    # rebuilds and snapshots older than SNAPSHOT_REVALIDATE_SECONDS re-read the
+    # whole partition to pick up edits and deletes made outside the API.
+    now = time.time()
+    snapshot = None if revalidate else load_snapshot()
+    if snapshot is not None and now - snapshot["validatedAt"] >= get_snapshot_revalidate_seconds():
+        snapshot = None
+
+    since = None
+    if snapshot is not None and snapshot["quotes"]:
+        try:
+            since = ulid_time_floor(snapshot["quotes"][0].id, SNAPSHOT_LOOKBACK_MS)
+        except ValueError:
+            since = None
+
+    if snapshot is None or since is None:
+        quotes = fetch_all_quotes(consistent_read)
+        save_snapshot(quotes, now)
+        return quotes, {"quoteSource": "query", "quotesRead": len(quotes)}
+
+    # Keep snapshot entries the tail query did not return; a just-written quote
+    # can be missing from an eventually consistent read. Both runs are already
+    # newest first, so the sort is a cheap merge.
+    recent = query_quotes(consistent_read, since)
+    recent_ids = {quote.id for quote in recent}
+    known = [quote for quote in snapshot["quotes"] if quote.id not in recent_ids]
+    quotes = sorted([*recent, *known], key=lambda quote: quote.id, reverse=True)
+    if quotes != snapshot["quotes"]:
+        save_snapshot(quotes, snapshot["validatedAt"])
+    return quotes, {"quoteSource": "snapshot", "quotesRead": len(recent)}
+
+
+def changed_quote_from_payload(payload: dict[str, Any]) -> dict[str, str] | None:
+    quote_id = str(payload.get("quoteId") or "").strip()
+    if not quote_id:
+        return None
+
+    changed: dict[str, str] = {"SK": quote_id}
+    if payload.get("quote") and payload.get("createdAt"):
+        changed["quote"] = str(payload["quote"])
+        changed["createdAt"] = str(payload["createdAt"])
+    return changed
+
+
+def changed_quotes_from_event(event: dict[str, Any]) -> list[dict[str, str]] | None:
+    # Batch submissions send {"quotes": [...]}; single ones inline the quote.
+    batch = event.get("quotes")
+    payloads: list[Any] = batch if isinstance(batch, list) else [event]
+    changed = [
+        quote
+        for quote in (changed_quote_from_payload(payload) for payload in payloads if isinstance(payload, dict))
+        if quote is not None
+    ]
+    return changed or None
+
+
+def is_quote_partition_key(partition_key: str) -> bool:
+    return partition_key == QUOTE_PARTITION or partition_key.startswith(f"{QUOTE_PARTITION}#")
+
+
+def is_stream_event(event: dict[str, Any]) -> bool:
+    records = event.get("Records")
+    if not isinstance(records, list) or not records:
+        return False
+    return all(isinstance(record, dict) and record.get("eventSource") == "aws:dynamodb" for record in records)
+
+
+def changed_quotes_from_stream(records: list[dict[str, Any]]) -> list[dict[str, str]]:
+    # Stream batches also carry hash markers, stats and idempotency records
+    # unless the event source mapping filters them out; only quote writes count.
+    changed: dict[str, dict[str, str]] = {}
+    for record in records:
+        if record.get("eventName") not in {"INSERT", "MODIFY"}:
+            continue
+        image = (record.get("dynamodb") or {}).get("NewImage") or {}
+        if "quote" not in image or not is_quote_partition_key(image.get("PK", {}).get("S", "")):
+            continue
+        if record["eventName"] == "INSERT" and MOVED_FROM_ATTRIBUTE in image:
+            continue
+        quote = decode_quote_item(image)
+        changed[quote.id] = {"SK": quote.id, "quote": quote.text, "createdAt": quote.created_at}
+    return list(changed.values())
+
+
+def merge_changed_quotes(
+    quotes: list[Quote],
+    changed_quotes: list[dict[str, str]],
+) -> list[Quote]:
+    # The query is eventually consistent, so a quote that was just written may
+    # not be visible yet. Fold in any changed quote that carried its own body.
+    known_ids = {quote.id for quote in quotes}
+    missing = [
+        Quote.from_item(quote)
+        for quote in changed_quotes
+        if quote["SK"] not in known_ids and "quote" in quote and "createdAt" in quote
+    ]
+    if not missing:
+        return quotes
+    return sorted([*quotes, *missing], key=lambda quote: quote.id, reverse=True)
+
+
+def oldest_changed_ordinal(quotes: list[Quote], changed_ids: set[str]) -> int:
+    # Ordinals count from the oldest quote, matching archive page and sitemap
+    # shard numbering. Changed quotes are nearly always the newest ones.
+    total = len(quotes)
+    oldest = total
+    for index, quote in enumerate(quotes):
+        if quote.id in changed_ids:
+            oldest = total - 1 - index
+    return oldest
+
+
+def publish_site(
+    changed_quotes: list[dict[str, str]] | None = None,
+    *,
+    fence: Callable[[], bool] | None = None,
+    consistent_read: bool = False,
+) -> dict[str, Any]:
+    metrics = get_metrics()
+    with metrics.phase("loadQuotesMs"):
+        quotes, read_stats = load_quotes(consistent_read, revalidate=changed_quotes is None)
     local_site_dir = get_local_site_dir()
 
-    if local_site_dir is not None:
-        shutil.rmtree(local_site_dir / "quotes", ignore_errors=True)
-        shutil.rmtree(local_site_dir / "quote", ignore_errors=True)
-        legacy_seo = local_site_dir / "seo.html"
-        if legacy_seo.exists():
-            legacy_seo.unlink()
+    if changed_quotes is not None:
+        quotes = merge_changed_quotes(quotes, changed_quotes)
+    page_count = archive_page_count(len(quotes))
+    shard_count = sitemap_shard_count(len(quotes))
+
+    if changed_quotes is None:
+        pages_to_render = quotes
+        archive_pages = range(1, page_count + 1)
+        sitemap_shards = range(1, shard_count + 1)
+    else:
+        changed_ids = {quote["SK"] for quote in changed_quotes}
+        pages_to_render = [quote for quote in quotes if quote.id in changed_ids]
+        oldest_changed = oldest_changed_ordinal(quotes, changed_ids)
+        # A changed quote can complete another full page past the homepage's
+        # QUOTES_PER_PAGE, moving the oldest of them onto a new archive page;
+        # the page before that one then gains a "newer" link.
+        archive_pages = range(max(1, oldest_changed // QUOTES_PER_PAGE - 1), page_count + 1)
+        sitemap_shards = range(oldest_changed // SITEMAP_SHARD_SIZE + 1, shard_count + 1)
+
+    site = SiteTemplate.from_env()
+    writer = SiteWriter(load_manifest(), prune=changed_quotes is None)
+    for quote in pages_to_render:
+        with metrics.phase("renderMs"):
+            page = site.render_quote_page(quote)
+        writer.put_html(f"quotes/{quote.id}/index.html", page)
+
+    # Quote pages are keyed by quote, so a stale run writing them is harmless.
+    # Everything below is built from the whole quote list: the newest archive
+    # pages and sitemap shard change as quotes arrive. It is only written while
+    # this run still holds its fence, so an older snapshot never overwrites a
+    # newer one, and a fenced run leaves the manifest to the run that won.
+    fenced = fence is not None and not fence()
+    if not fenced:
+        if changed_quotes is None and local_site_dir is not None:
+            prune_local_pages(local_site_dir, {quote.id for quote in quotes}, page_count)
+        for page_number in archive_pages:
+            writer.put_html(
+                f"{archive_page_path(page_number)}index.html",
+                site.iter_archive_page(page_number, archive_page_quotes(quotes, page_number), page_count),
+            )
+        for shard_number in sitemap_shards:
+            shard_quotes = sitemap_shard_quotes(quotes, shard_number)
+            writer.put_xml(
+                sitemap_shard_key(shard_number),
+                site.iter_sitemap_shard(shard_quotes),
+                sitemap_shard_cache_control(shard_quotes),
+            )
+        writer.put_xml(SITEMAP_PAGES_KEY, site.iter_pages_sitemap(quotes, page_count))
+        sitemap_index = site.render_sitemap_index(quotes)
+        for key in SITEMAP_INDEX_KEYS:
+            writer.put_xml(key, sitemap_index)
+        writer.put_html("index.html", site.iter_homepage(quotes))
+    with metrics.phase("flushMs"):
+        stats = writer.close(save=not fenced)
+
+    metrics.set("mode", "full" if changed_quotes is None else "incremental")
+    metrics.add("quotesRead", read_stats["quotesRead"])
+    metrics.add("quotePagesWritten", len(pages_to_render))
+    metrics.add("objectsWritten", stats["objectsWritten"])
+    metrics.add("objectsSkipped", stats["objectsSkipped"])
+    metrics.add("objectsFailed", stats["objectsFailed"])
+    metrics.add("bytesWritten", sum(stats["bytesWritten"].values()), "Bytes")
+
+    return {
+        "quoteCount": len(quotes),
+        "mode": "full" if changed_quotes is None else "incremental",
+        "fenced": fenced,
+        "quotePagesWritten": len(pages_to_render),
+        "archivePageCount": page_count,
+        "sitemapShardCount": shard_count,
+        **read_stats,
+        **stats,
+    }
+
 
-    put_html("index.html", render_homepage(quotes))
-    for quote in quotes:
-        put_html(f"quotes/{quote['SK']}/index.html", render_quote_page(quote))
-    put_xml("sitemap.xml", render_sitemap(quotes))
+def get_coordination_enabled() -> bool:
+    return os.environ.get("PUBLISH_COORDINATION", "").strip().lower() in {"1", "true", "yes", "on"}
 
-    return {"quoteCount": len(quotes)}
 
+def get_coalesce_window_seconds() -> float:
+    try:
+        return max(0.0, float(os.environ.get("PUBLISH_COALESCE_SECONDS", DEFAULT_COALESCE_SECONDS)))
+    except ValueError:
+        return DEFAULT_COALESCE_SECONDS
+
+
+def is_condition_failure(error: ClientError) -> bool:
+    return error.response.get("Error", {}).get("Code") == "ConditionalCheckFailedException"
+
+
+def register_trigger(changed_quotes: list[dict[str, str]] | None) -> int:
+    update = "ADD requested :one, triggersReceived :one"
+    values: dict[str, Any] = {":one": 1}
+    condition: dict[str, str] = {}
+    if changed_quotes is None:
+        # Operands see the item before the update, so this is the new generation.
+        update += " SET fullRequestedAt = if_not_exists(requested, :zero) + :one"
+        values[":zero"] = 0
+    else:
+        update += ", pendingIds :ids"
+        values[":ids"] = {quote["SK"] for quote in changed_quotes}
+        values[":cap"] = MAX_PENDING_IDS
+        condition["ConditionExpression"] = "attribute_not_exists(pendingIds) OR size(pendingIds) < :cap"
+    try:
+        response = get_table().update_item(
+            Key=COORDINATION_KEY,
+            UpdateExpression=update,
+            ExpressionAttributeValues=values,
+            ReturnValues="UPDATED_NEW",
+            **condition,
+        )
+    except ClientError as error:
+        if changed_quotes is None or not is_condition_failure(error):
+            raise
+        # Too many ids pending already; a full publish covers them all.
+        return register_trigger(None)
+    return int(response["Attributes"]["requested"])
+
+
+def count_coordination_event(counter: str) -> None:
+    get_table().update_item(
+        Key=COORDINATION_KEY,
+        UpdateExpression="ADD #counter :one",
+        ExpressionAttributeNames={"#counter": counter},
+        ExpressionAttributeValues={":one": 1},
+    )
+
+
+def invocation_deadline(context: Any) -> float:
+    # The lease ends when the holder would be killed, so a holder that dies at
+    # the Lambda timeout stops blocking everyone else straight away.
+    remaining_ms = getattr(context, "get_remaining_time_in_millis", None)
+    if remaining_ms is None:
+        return time.time() + DEFAULT_INVOCATION_SECONDS
+    return time.time() + float(remaining_ms()) / 1000
+
+
+def acquire_lease(owner: str, deadline: float) -> bool:
+    now = int(time.time())
+    try:
+        get_table().update_item(
+            Key=COORDINATION_KEY,
+            UpdateExpression="SET #owner = :owner, leaseUntil = :until",
+            ConditionExpression="attribute_not_exists(#owner) OR leaseUntil < :now",
+            ExpressionAttributeNames={"#owner": "owner"},
+            ExpressionAttributeValues={":owner": owner, ":until": int(deadline) + 1, ":now": now},
+        )
+    except ClientError as error:
+        if is_condition_failure(error):
+            return False
+        raise
+    return True
 
-def handler(_event: dict[str, Any], _context: Any) -> dict[str, Any]:
-    result = publish_site()
+
+def renew_lease(owner: str, generation: int, deadline: float) -> bool:
+    # Fails when the lease expired and another run took over, or when a run
+    # with a newer snapshot has already published.
+    try:
+        get_table().update_item(
+            Key=COORDINATION_KEY,
+            UpdateExpression="SET leaseUntil = :until",
+            ConditionExpression="#owner = :owner AND (attribute_not_exists(built) OR built < :generation)",
+            ExpressionAttributeNames={"#owner": "owner"},
+            ExpressionAttributeValues={
+                ":owner": owner,
+                ":until": int(deadline) + 1,
+                ":generation": generation,
+            },
+        )
+    except ClientError as error:
+        if is_condition_failure(error):
+            return False
+        raise
+    return True
+
+
+def mark_built(owner: str, generation: int, published_ids: set[str]) -> None:
+    update = "SET built = :generation"
+    values: dict[str, Any] = {":owner": owner, ":generation": generation}
+    if published_ids:
+        update += " DELETE pendingIds :ids"
+        values[":ids"] = published_ids
+    get_table().update_item(
+        Key=COORDINATION_KEY,
+        UpdateExpression=update,
+        ConditionExpression="#owner = :owner",
+        ExpressionAttributeNames={"#owner": "owner"},
+        ExpressionAttributeValues=values,
+    )
+
+
+def release_if_idle(owner: str, generation: int) -> bool:
+    # Only lets go if nothing was requested while the last pass ran; otherwise
+    # the holder keeps the lease and publishes again.
+    try:
+        get_table().update_item(
+            Key=COORDINATION_KEY,
+            UpdateExpression="REMOVE #owner, leaseUntil",
+            ConditionExpression="#owner = :owner AND requested = :generation",
+            ExpressionAttributeNames={"#owner": "owner"},
+            ExpressionAttributeValues={":owner": owner, ":generation": generation},
+        )
+    except ClientError as error:
+        if is_condition_failure(error):
+            return False
+        raise
+    return True
+
+
+def release_lease(owner: str) -> None:
+    try:
+        get_table().update_item(
+            Key=COORDINATION_KEY,
+            UpdateExpression="REMOVE #owner, leaseUntil",
+            ConditionExpression="#owner = :owner",
+            ExpressionAttributeNames={"#owner": "owner"},
+            ExpressionAttributeValues={":owner": owner},
+        )
+    except ClientError as error:
+        if not is_condition_failure(error):
+            raise
+
+
+def wait_for_lease(owner: str, requested: int, deadline: float) -> bool:
+    # True once this invocation holds the lease; False once another run has
+    # built this trigger's generation. A holder can be killed without
+    # releasing the lease, so a trigger is only reported as coalesced after it
+    # is built. If time runs out first, raise so the trigger is retried.
+    while not acquire_lease(owner, deadline):
+        state = get_table().get_item(Key=COORDINATION_KEY, ConsistentRead=True)["Item"]
+        if int(state.get("built", 0)) >= requested:
+            return False
+        if time.time() + COALESCED_POLL_SECONDS > deadline - COALESCED_GIVE_UP_SECONDS:
+            raise RuntimeError(
+                f"Trigger {requested} still unpublished; lease held by {state.get('owner')} "
+                f"until {state.get('leaseUntil')}"
+            )
+        time.sleep(COALESCED_POLL_SECONDS)
+    return True
+
+
+def publish_coordinated(
+    changed_quotes: list[dict[str, str]] | None,
+    owner: str,
+    deadline: float,
+) -> dict[str, Any]:
+    """Publish with at most one run in flight across all invocations.
+
+    Every invocation records its trigger on the coordination item. After a
+    short window, one invocation takes the lease and publishes everything
+    requested so far; the others wait until that run has built their trigger,
+    taking over if the lease ends first (see wait_for_lease). The holder
+    keeps publishing until no new triggers arrived during its last pass, and
+    stops without touching the shared pages if it loses the lease. If triggers
+    are still arriving after MAX_PUBLISH_PASSES, it raises so the invocation
+    is retried.
+    """
+    requested = register_trigger(changed_quotes)
+    window = get_coalesce_window_seconds()
+    if window:
+        time.sleep(window)
+
+    if not wait_for_lease(owner, requested, deadline):
+        count_coordination_event("triggersCoalesced")
+        return {"mode": "coalesced", "objectsFailed": 0}
+
+    result: dict[str, Any] = {"mode": "coalesced", "objectsFailed": 0}
+    try:
+        for _ in range(MAX_PUBLISH_PASSES):
+            state = get_table().get_item(Key=COORDINATION_KEY, ConsistentRead=True)["Item"]
+            generation = int(state.get("requested", 0))
+            built = int(state.get("built", 0))
+            if generation <= built:
+                # An earlier holder already published this trigger.
+                count_coordination_event("triggersCoalesced")
+                release_lease(owner)
+                return result
+
+            pending_ids = set(state.get("pendingIds", set()))
+            if int(state.get("fullRequestedAt", 0)) > built:
+                pass_changes = None
+            else:
+                # Our own trigger carries the quote body in case the read
+                # below cannot see it yet; other ids resolve from the table.
+                carried = {quote["SK"]: quote for quote in changed_quotes or []}
+                pass_changes = [carried.get(quote_id, {"SK": quote_id}) for quote_id in sorted(pending_ids)]
+            result = publish_site(
+                pass_changes,
+                fence=lambda: renew_lease(owner, generation, deadline),
+                consistent_read=True,
+            )
+            result["generation"] = generation
+            if result["fenced"]:
+                count_coordination_event("runsFenced")
+                return result
+            if result["objectsFailed"]:
+                release_lease(owner)
+                return result
+            mark_built(owner, generation, pending_ids)
+            if release_if_idle(owner, generation):
+                return result
+    except Exception:
+        release_lease(owner)
+        raise
+
+    # Still busy after MAX_PUBLISH_PASSES. Fail rather than leave the pending
+    # triggers waiting for the next write: the stream retries the batch and an
+    # async invoke is retried by Lambda, and either retry publishes the rest.
+    release_lease(owner)
+    raise RuntimeError(f"Triggers still pending after {MAX_PUBLISH_PASSES} publish passes")
+
+
+# The profiling helpers below copy app._profile_invocation, _profile_report and
+# _save_profile; a fix to one belongs in both.
+def profiling_requested(event: dict[str, Any]) -> bool:
+    # A top-level "profile" key only comes from a direct invoke; stream and
+    # API-triggered events never carry one.
+    return event.get("profile") is True or get_profiling_enabled()
+
+
+def profile_report(profiler: Any, snapshot: Any) -> str:
+    import io
+    import pstats
+
+    report = io.StringIO()
+    stats = pstats.Stats(profiler, stream=report)
+    stats.sort_stats("cumulative").print_stats(PROFILE_TOP_FUNCTIONS)
+    report.write(f"Top {PROFILE_TOP_ALLOCATIONS} allocation sites still held at the end of the invocation:\n")
+    for stat in snapshot.statistics("lineno")[:PROFILE_TOP_ALLOCATIONS]:
+        report.write(f"{stat}\n")
+    return report.getvalue()
+
+
+def save_profile(profiler: Any, snapshot: Any, context: Any) -> None:
+    # The .pstats file loads with pstats or snakeviz; the .txt is the summary.
+    import marshal
+
+    profiler.create_stats()
+    function_name = getattr(context, "function_name", None) or os.environ.get(
+        "AWS_LAMBDA_FUNCTION_NAME", "page-generator"
+    )
+    request_id = getattr(context, "aws_request_id", None) or uuid.uuid4().hex
+    name = f"{function_name}/{datetime.now(timezone.utc):%Y%m%dT%H%M%SZ}-{request_id}"
+    artifacts = {
+        f"{name}.pstats": marshal.dumps(profiler.stats),
+        f"{name}.txt": profile_report(profiler, snapshot).encode("utf-8"),
+    }
+
+    local_site_dir = get_local_site_dir()
+    s3_uri = get_profile_s3_uri()
+    if local_site_dir is not None:
+        for key, body in artifacts.items():
+            path = local_site_dir / PROFILE_LOCAL_DIR / key
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_bytes(body)
+        print(f"Wrote profile to {local_site_dir / PROFILE_LOCAL_DIR / name}.*")
+    elif s3_uri.startswith("s3://"):
+        bucket, _, prefix = s3_uri.removeprefix("s3://").partition("/")
+        for key, body in artifacts.items():
+            get_s3_client().put_object(Bucket=bucket, Key=f"{prefix}{key}", Body=body)
+        print(f"Wrote profile to s3://{bucket}/{prefix}{name}.*")
+    else:
+        # No destination configured; the site bucket is public, so log it instead.
+        print(artifacts[f"{name}.txt"].decode("utf-8"))
+
+
+def profile_invocation(call: Callable[[], dict[str, Any]], context: Any) -> dict[str, Any]:
+    # cProfile and tracemalloc are only imported when profiling is requested.
+    import cProfile
+    import tracemalloc
+
+    started_tracing = not tracemalloc.is_tracing()
+    if started_tracing:
+        tracemalloc.start()
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        return call()
+    finally:
+        profiler.disable()
+        snapshot = tracemalloc.take_snapshot()
+        if started_tracing:
+            tracemalloc.stop()
+        try:
+            save_profile(profiler, snapshot, context)
+        except Exception as exc:
+            # Losing the profile must not fail the publish it measured.
+            print(f"Failed to save profile: {exc}")
+
+
+def handler(event: dict[str, Any], context: Any) -> dict[str, Any]:
+    event = event or {}
+    if profiling_requested(event):
+        return profile_invocation(lambda: measured_handler(event, context), context)
+    return measured_handler(event, context)
+
+
+def measured_handler(event: dict[str, Any], context: Any) -> dict[str, Any]:
+    # With EMIT_METRICS on, each invocation logs one EMF line, even when it fails.
+    metrics = start_metrics(context)
+    try:
+        with metrics.phase("invocationMs"):
+            return handle_event(event, context)
+    finally:
+        metrics.emit()
+
+
+def handle_event(event: dict[str, Any], context: Any) -> dict[str, Any]:
+    from_stream = is_stream_event(event)
+    if from_stream:
+        changed_quotes: list[dict[str, str]] | None = changed_quotes_from_stream(event["Records"])
+        if not changed_quotes:
+            return {
+                "statusCode": 200,
+                "body": json.dumps({"message": "No quote changes in stream batch", "records": len(event["Records"])}),
+            }
+    else:
+        changed_quotes = changed_quotes_from_event(event)
+    if get_coordination_enabled():
+        owner = getattr(context, "aws_request_id", None) or str(uuid.uuid4())
+        result = publish_coordinated(changed_quotes, owner, invocation_deadline(context))
+    else:
+        result = publish_site(changed_quotes)
+    if result["objectsFailed"] and from_stream:
+        # Raising makes the event source mapping retry the batch, so a failed
+        # publish is not lost the way a failed async invoke would be.
+        raise RuntimeError(f"Failed to publish {result['objectsFailed']} object(s)")
+    if result["objectsFailed"]:
+        return {
+            "statusCode": 500,
+            "body": json.dumps(
+                {
+                    "message": f"Failed to publish {result['objectsFailed']} object(s)",
+                    **result,
+                }
+            ),
+        }
     return {
         "statusCode": 200,
         "body": json.dumps(
             {
                 "message": "Static site published successfully",
-                "quoteCount": result["quoteCount"],
+                **result,
             }
         ),
     }
+
+
+def prewarm_clients() -> None:
+    # Every publish needs these, so build them during the Lambda init phase,
+    # which runs before the first event instead of inside it.
+    get_s3_client()
+    if get_fast_query_decode():
+        get_dynamodb_client()
+    if get_coordination_enabled() or not get_fast_query_decode():
+        get_dynamodb_resource()
+
+
+if os.environ.get("AWS_LAMBDA_FUNCTION_NAME"):
+    prewarm_clients()
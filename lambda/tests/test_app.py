@@ -1,6 +1,13 @@
 import json
 import os
+import pstats
+import random
+import re
+import subprocess
 import sys
+import threading
+import time
+from datetime import datetime, timezone
 from unittest.mock import Mock
 
 import boto3
@@ -35,10 +42,20 @@ def env_vars():
     os.environ["TABLE_NAME"] = "bruce-quotes"
     os.environ.pop("ALLOW_ORIGIN", None)
     os.environ.pop("PAGE_GENERATOR_FUNCTION_NAME", None)
+    os.environ.pop("QUOTE_SHARDS", None)
+    os.environ.pop("PREWARM_CLIENTS", None)
+    os.environ.pop("AWS_LAMBDA_INITIALIZATION_TYPE", None)
+    os.environ.pop("EMIT_METRICS", None)
+    os.environ.pop("METRICS_NAMESPACE", None)
+    os.environ.pop("PROFILE_HANDLER", None)
+    os.environ.pop("PROFILE_S3_URI", None)
+    os.environ.pop("LOCAL_SITE_DIR", None)
     if hasattr(app, "_table"):
         app._table = None
     if hasattr(app, "_lambda_client"):
         app._lambda_client = None
+    app._newest_quote_id = None
+    app._newest_quote_seen_at = 0.0
     yield
 
 
@@ -72,6 +89,10 @@ def test_post_quote_returns_metadata_and_invokes_publisher():
     invoke_kwargs = lambda_client.invoke.call_args.kwargs
     assert invoke_kwargs["FunctionName"] == "bruce-page-generator"
     assert invoke_kwargs["InvocationType"] == "Event"
+    payload = json.loads(invoke_kwargs["Payload"])
+    assert payload["quoteId"] == body["quoteId"]
+    assert payload["quote"] == "Cowabunga, Bruce!"
+    assert payload["createdAt"] == body["createdAt"]
 
 
 @mock_aws
@@ -89,6 +110,556 @@ def test_post_quote_succeeds_when_publisher_is_not_configured():
     assert body["quote"] == "Cowabunga, Bruce!"
 
 
+@mock_aws
+def test_post_quote_writes_to_a_hashed_shard():
+    table = _mk_table()
+    os.environ["QUOTE_SHARDS"] = "8"
+
+    post_event = {
+        "requestContext": {"http": {"method": "POST", "path": "/quotes"}},
+        "body": json.dumps({"quote": "Cowabunga, Bruce!"}),
+    }
+    response = app.handler(post_event, None)
+
+    quote_id = json.loads(response["body"])["quoteId"]
+    partition_key = app._quote_partition_key(quote_id, 8)
+    assert partition_key.startswith("QUOTE#")
+    assert 0 <= int(partition_key.removeprefix("QUOTE#")) < 8
+    assert table.get_item(Key={"PK": partition_key, "SK": quote_id})["Item"]["quote"] == "Cowabunga, Bruce!"
+    assert app._quote_partition_key(quote_id, 1) == "QUOTE"
+
+
+@mock_aws
+def test_duplicate_quote_is_rejected_without_writing_or_publishing():
+    table = _mk_table()
+    os.environ["PAGE_GENERATOR_FUNCTION_NAME"] = "bruce-page-generator"
+    lambda_client = Mock()
+    app._lambda_client = lambda_client
+
+    first = app.handler(
+        {
+            "requestContext": {"http": {"method": "POST", "path": "/quotes"}},
+            "body": json.dumps({"quote": "Cowabunga,   Bruce!"}),
+        },
+        None,
+    )
+    duplicate = app.handler(
+        {
+            "requestContext": {"http": {"method": "POST", "path": "/quotes"}},
+            "body": json.dumps({"quote": '"cowabunga, BRUCE!"'}),
+        },
+        None,
+    )
+
+    assert first["statusCode"] == 201
+    assert duplicate["statusCode"] == 409
+    quote_id = json.loads(first["body"])["quoteId"]
+    assert json.loads(duplicate["body"])["quoteId"] == quote_id
+    assert duplicate["headers"]["access-control-allow-origin"] == "*"
+    lambda_client.invoke.assert_called_once()
+
+    items = table.scan()["Items"]
+    assert len(items) == 3  # quote, hash marker, stats
+    marker = table.get_item(Key=app._quote_hash_key(app._quote_hash("Cowabunga, Bruce!")))["Item"]
+    assert marker["quoteId"] == quote_id
+
+
+@mock_aws
+def test_batch_post_reports_each_entry_and_publishes_once():
+    table = _mk_table()
+    os.environ["PAGE_GENERATOR_FUNCTION_NAME"] = "bruce-page-generator"
+    lambda_client = Mock()
+    app._lambda_client = lambda_client
+    existing = app.handler(
+        {
+            "requestContext": {"http": {"method": "POST", "path": "/quotes"}},
+            "body": json.dumps({"quote": "Bruce already said this"}),
+        },
+        None,
+    )
+    existing_id = json.loads(existing["body"])["quoteId"]
+    lambda_client.reset_mock()
+
+    quotes = ['"First batch quote"', "hey", "Second batch quote", "first  BATCH quote", 42, "bruce already said this"]
+    response = app.handler(
+        {
+            "requestContext": {"http": {"method": "POST", "path": "/quotes/batch"}},
+            "body": json.dumps({"quotes": quotes}),
+        },
+        None,
+    )
+
+    assert response["statusCode"] == 200
+    body = json.loads(response["body"])
+    assert body["created"] == 2
+    assert [result["status"] for result in body["results"]] == [201, 400, 201, 409, 400, 409]
+    assert [result["index"] for result in body["results"]] == list(range(6))
+    first, second = body["results"][0], body["results"][2]
+    assert first["quote"] == "First batch quote"
+    assert first["quoteId"] < second["quoteId"]
+    assert body["results"][3]["error"] == "Duplicate of entry 0."
+    assert body["results"][5]["quoteId"] == existing_id
+
+    assert table.get_item(Key={"PK": "QUOTE", "SK": second["quoteId"]})["Item"]["quote"] == "Second batch quote"
+    marker = table.get_item(Key=app._quote_hash_key(app._quote_hash("Second batch quote")))["Item"]
+    assert marker["quoteId"] == second["quoteId"]
+    assert table.scan()["Count"] == 7  # three quotes, their markers, stats
+
+    lambda_client.invoke.assert_called_once()
+    payload = json.loads(lambda_client.invoke.call_args.kwargs["Payload"])
+    assert [quote["quoteId"] for quote in payload["quotes"]] == [first["quoteId"], second["quoteId"]]
+
+
+@mock_aws
+def test_batch_post_writes_in_chunks_and_retries_unprocessed_items(monkeypatch):
+    table = _mk_table()
+    client = app._get_table().meta.client
+    real_batch_write = client.batch_write_item
+    chunk_sizes = []
+    sleeps = []
+
+    def flaky_batch_write(RequestItems):
+        requests = RequestItems[os.environ["TABLE_NAME"]]
+        chunk_sizes.append(len(requests))
+        if len(chunk_sizes) == 1:
+            real_batch_write(RequestItems={os.environ["TABLE_NAME"]: requests[:-3]})
+            return {"UnprocessedItems": {os.environ["TABLE_NAME"]: requests[-3:]}}
+        return real_batch_write(RequestItems=RequestItems)
+
+    monkeypatch.setattr(client, "batch_write_item", flaky_batch_write)
+    monkeypatch.setattr(app.time, "sleep", sleeps.append)
+
+    response = app.handler(
+        {
+            "requestContext": {"http": {"method": "POST", "path": "/quotes/batch"}},
+            "body": json.dumps({"quotes": [f"Bruce remembers number {index}" for index in range(30)]}),
+        },
+        None,
+    )
+
+    body = json.loads(response["body"])
+    assert body["created"] == 30
+    assert {result["status"] for result in body["results"]} == {201}
+    assert chunk_sizes == [25, 3, 5, 25, 5]
+    assert sleeps == [app.Config.BATCH_BACKOFF_SECONDS]
+    assert table.scan()["Count"] == 61  # quotes, markers, stats
+
+
+@mock_aws
+def test_batch_post_requires_a_bounded_list():
+    _mk_table()
+    for body in ({}, {"quotes": []}, {"quotes": "Bruce"}, {"quotes": ["Bruce quote"] * 101}):
+        response = app.handler(
+            {"requestContext": {"http": {"method": "POST", "path": "/quotes/batch"}}, "body": json.dumps(body)},
+            None,
+        )
+        assert response["statusCode"] == 400
+
+
+def _get_quotes(query=None, headers=None):
+    event = {"requestContext": {"http": {"method": "GET", "path": "/quotes"}}}
+    if query:
+        event["queryStringParameters"] = query
+    if headers:
+        event["headers"] = headers
+    return app.handler(event, None)
+
+
+@mock_aws
+def test_list_quotes_pages_newest_first_across_shards():
+    table = _mk_table()
+    os.environ["QUOTE_SHARDS"] = "4"
+    quote_ids = app.UlidGenerator().batch(25)
+    for index, quote_id in enumerate(quote_ids):
+        partition_key = "QUOTE" if index < 3 else app._quote_partition_key(quote_id, 4)
+        table.put_item(
+            Item={"PK": partition_key, "SK": quote_id, "quote": f"Bruce {index}", "createdAt": "2026-05-05"}
+        )
+    table.put_item(Item={"PK": "QUOTEHASH#abc", "SK": "QUOTEHASH", "quoteId": quote_ids[0]})
+
+    seen = []
+    cursor = None
+    for expected_size in (10, 10, 5):
+        response = _get_quotes({"limit": "10", **({"cursor": cursor} if cursor else {})})
+        assert response["statusCode"] == 200
+        body = json.loads(response["body"])
+        assert len(body["quotes"]) == expected_size
+        seen += [quote["quoteId"] for quote in body["quotes"]]
+        cursor = body["nextCursor"]
+    assert cursor is None
+    assert seen == sorted(quote_ids, reverse=True)
+    assert body["quotes"][-1] == {
+        "quoteId": quote_ids[0],
+        "quote": "Bruce 0",
+        "createdAt": "2026-05-05",
+        "url": f"/quotes/{quote_ids[0]}/",
+    }
+
+
+@mock_aws
+def test_list_quotes_revalidates_with_etag_without_reading_the_table(monkeypatch):
+    _mk_table()
+    created = app.handler(
+        {
+            "requestContext": {"http": {"method": "POST", "path": "/quotes"}},
+            "body": json.dumps({"quote": "Bruce wrote this first"}),
+        },
+        None,
+    )
+    app.handler(
+        {
+            "requestContext": {"http": {"method": "POST", "path": "/quotes"}},
+            "body": json.dumps({"quote": "Bruce wrote this second"}),
+        },
+        None,
+    )
+    first = _get_quotes({"limit": "1"})
+    assert first["statusCode"] == 200
+    etag = first["headers"]["etag"]
+    assert etag.startswith('"latest.')
+    assert "max-age=5" in first["headers"]["cache-control"]
+    cursor = json.loads(first["body"])["nextCursor"]
+    second = _get_quotes({"limit": "1", "cursor": cursor})
+    assert json.loads(second["body"])["quotes"][0]["quoteId"] == json.loads(created["body"])["quoteId"]
+    assert "max-age=3600" in second["headers"]["cache-control"]
+
+    def no_reads(*args, **kwargs):
+        raise AssertionError("table was read")
+
+    monkeypatch.setattr(app, "_query_quote_page", no_reads)
+    assert _get_quotes({"limit": "1"}, {"If-None-Match": etag})["statusCode"] == 304
+    not_modified = _get_quotes({"limit": "1", "cursor": cursor}, {"if-none-match": second["headers"]["etag"]})
+    assert not_modified["statusCode"] == 304
+    assert not_modified["body"] == ""
+    monkeypatch.undo()
+
+    app.handler(
+        {
+            "requestContext": {"http": {"method": "POST", "path": "/quotes"}},
+            "body": json.dumps({"quote": "Bruce wrote this third"}),
+        },
+        None,
+    )
+    changed = _get_quotes({"limit": "1"}, {"if-none-match": etag})
+    assert changed["statusCode"] == 200
+    assert changed["headers"]["etag"] != etag
+
+    app._newest_quote_seen_at = 0.0  # cache expired: revalidation reads, but still answers 304
+    assert _get_quotes({"limit": "1"}, {"if-none-match": changed["headers"]["etag"]})["statusCode"] == 304
+
+
+@mock_aws
+def test_list_quotes_rejects_bad_parameters_and_caps_the_limit():
+    _mk_table()
+    assert _get_quotes({"limit": "lots"})["statusCode"] == 400
+    assert _get_quotes({"cursor": "not-a-cursor"})["statusCode"] == 400
+    assert _get_quotes({"cursor": app._encode_cursor("01ARZ3NDEKTSV4RRFFQ69G5FAU")})["statusCode"] == 400
+    response = _get_quotes({"limit": "5000"})
+    assert response["statusCode"] == 200
+    assert response["headers"]["etag"] == '"latest.empty.100"'
+    assert json.loads(response["body"]) == {"quotes": [], "nextCursor": None}
+
+
+@mock_aws
+def test_stats_item_tracks_count_newest_quotes_and_months():
+    table = _mk_table()
+    for index in range(4):
+        app.handler(
+            {
+                "requestContext": {"http": {"method": "POST", "path": "/quotes"}},
+                "body": json.dumps({"quote": f"Single Bruce quote {index}"}),
+            },
+            None,
+        )
+    app.handler(
+        {
+            "requestContext": {"http": {"method": "POST", "path": "/quotes/batch"}},
+            "body": json.dumps({"quotes": [f"Batched Bruce quote {index}" for index in range(8)]}),
+        },
+        None,
+    )
+    app.handler(
+        {
+            "requestContext": {"http": {"method": "POST", "path": "/quotes"}},
+            "body": json.dumps({"quote": "Single Bruce quote 0"}),
+        },
+        None,
+    )
+
+    response = app.handler({"requestContext": {"http": {"method": "GET", "path": "/quotes/stats"}}}, None)
+    assert response["statusCode"] == 200
+    stats = json.loads(response["body"])
+    assert stats["quoteCount"] == 12
+    month = datetime.now(timezone.utc).strftime("%Y-%m")
+    assert stats["months"] == {month: 12}
+    expected = [f"Batched Bruce quote {index}" for index in range(7, -1, -1)]
+    expected += ["Single Bruce quote 3", "Single Bruce quote 2"]
+    assert [quote["quote"] for quote in stats["recent"]] == expected
+    assert stats["recent"][0]["url"] == f"/quotes/{stats['recent'][0]['quoteId']}/"
+    assert "public" in response["headers"]["cache-control"]
+
+    item = table.get_item(Key=app.STATS_KEY)["Item"]
+    assert sorted(name for name in item if name.startswith("recent")) == [f"recent{slot}" for slot in range(10)]
+
+
+def test_quote_transaction_retries_conflicts_without_touching_stats(monkeypatch):
+    class Conflict(Exception):
+        def __init__(self, code):
+            self.response = {"CancellationReasons": [{"Code": "None"}, {"Code": "None"}, {"Code": code}]}
+
+    calls = []
+
+    def transact_write_items(TransactItems):
+        calls.append(TransactItems)
+        if len(calls) < 3:
+            raise Conflict("TransactionConflict")
+
+    client = Mock()
+    client.exceptions.TransactionCanceledException = Conflict
+    client.transact_write_items = transact_write_items
+    table = Mock()
+    table.name = "bruce-quotes"
+    table.meta.client = client
+    app._table = table
+    monkeypatch.setattr(app.time, "sleep", lambda seconds: None)
+
+    item = {"PK": "QUOTE", "SK": app._ulid(), "quote": "Bruce", "createdAt": "2026-05-05T00:00:00+00:00"}
+    assert app._put_unique_quote(item, app._quote_hash("Bruce")) is None
+    assert len(calls) == 3
+    assert [list(entry) for entry in calls[0]] == [["Put"], ["Put"]]
+
+
+@mock_aws
+def test_failed_stats_update_does_not_fail_the_submission(monkeypatch):
+    table = _mk_table()
+    real_update_item = app._get_table().update_item
+
+    def update_item(**kwargs):
+        if kwargs.get("Key") == app.STATS_KEY:
+            raise RuntimeError("throttled")
+        return real_update_item(**kwargs)
+
+    monkeypatch.setattr(app._get_table(), "update_item", update_item)
+    response = app.handler(
+        {
+            "requestContext": {"http": {"method": "POST", "path": "/quotes"}},
+            "body": json.dumps({"quote": "Stats can catch up later"}),
+        },
+        None,
+    )
+    assert response["statusCode"] == 201
+    quote_id = json.loads(response["body"])["quoteId"]
+    assert table.get_item(Key={"PK": "QUOTE", "SK": quote_id})["Item"]["quote"] == "Stats can catch up later"
+    assert "Item" not in table.get_item(Key=app.STATS_KEY)
+
+
+def _post_with_key(quote, key):
+    return app.handler(
+        {
+            "requestContext": {"http": {"method": "POST", "path": "/quotes"}},
+            "headers": {"idempotency-key": key},
+            "body": json.dumps({"quote": quote}),
+        },
+        None,
+    )
+
+
+@mock_aws
+def test_idempotency_key_replays_the_first_response():
+    table = _mk_table()
+    os.environ["PAGE_GENERATOR_FUNCTION_NAME"] = "bruce-page-generator"
+    lambda_client = Mock()
+    app._lambda_client = lambda_client
+
+    first = _post_with_key("Retry me, Bruce", "key-1")
+    replay = _post_with_key("Retry me, Bruce", "key-1")
+
+    assert first["statusCode"] == replay["statusCode"] == 201
+    assert replay["body"] == first["body"]
+    assert replay["headers"]["idempotent-replayed"] == "true"
+    assert "idempotent-replayed" not in first["headers"]
+    lambda_client.invoke.assert_called_once()
+    record = table.get_item(Key={"PK": "IDEMPOTENCY#key-1", "SK": "IDEMPOTENCY"})["Item"]
+    assert record["state"] == "done"
+    assert record["expiresAt"] > time.time() + app.Config.IDEMPOTENCY_TTL_SECONDS - 60
+
+    assert _post_with_key("A different quote", "key-1")["statusCode"] == 422
+    assert _post_with_key("Retry me, Bruce", "key with spaces")["statusCode"] == 400
+    rejected = _post_with_key("hey", "key-2")
+    assert rejected["statusCode"] == 400
+    assert _post_with_key("hey", "key-2")["headers"]["idempotent-replayed"] == "true"
+
+
+@mock_aws
+def test_idempotency_claim_is_released_when_the_handler_fails(monkeypatch):
+    table = _mk_table()
+    original = app._post_quote
+
+    def failing(event, ctx):
+        raise RuntimeError("DynamoDB is having a day")
+
+    monkeypatch.setattr(app, "_post_quote", failing)
+    with pytest.raises(RuntimeError):
+        _post_with_key("Try again later, Bruce", "key-3")
+    assert "Item" not in table.get_item(Key={"PK": "IDEMPOTENCY#key-3", "SK": "IDEMPOTENCY"})
+
+    monkeypatch.setattr(app, "_post_quote", original)
+    assert _post_with_key("Try again later, Bruce", "key-3")["statusCode"] == 201
+
+
+@mock_aws
+def test_idempotency_claim_left_by_a_killed_request_is_taken_over_once_stale():
+    table = _mk_table()
+    record_key = {"PK": "IDEMPOTENCY#key-5", "SK": "IDEMPOTENCY"}
+    fingerprint = app._sha256_hex(f"POST /quotes\n{json.dumps({'quote': 'Killed mid-request, Bruce'})}")
+    now = int(time.time())
+    # The request that claimed the key timed out before storing or releasing it.
+    table.put_item(
+        Item={
+            **record_key,
+            "state": "pending",
+            "fingerprint": fingerprint,
+            "pendingUntil": now + 5,
+            "expiresAt": now + app.Config.IDEMPOTENCY_TTL_SECONDS,
+        }
+    )
+    assert _post_with_key("Killed mid-request, Bruce", "key-5")["statusCode"] == 409
+
+    table.update_item(
+        Key=record_key,
+        UpdateExpression="SET pendingUntil = :past",
+        ExpressionAttributeValues={":past": now - 1},
+    )
+    retried = _post_with_key("Killed mid-request, Bruce", "key-5")
+
+    assert retried["statusCode"] == 201
+    record = table.get_item(Key=record_key)["Item"]
+    assert record["state"] == "done"
+    assert json.loads(record["response"])["body"] == retried["body"]
+
+
+@mock_aws
+def test_concurrent_requests_with_one_idempotency_key_write_once():
+    table = _mk_table()
+    os.environ["PAGE_GENERATOR_FUNCTION_NAME"] = "bruce-page-generator"
+    lambda_client = Mock()
+    app._lambda_client = lambda_client
+    app._get_table()  # build the resource before the threads race for it
+
+    barrier = threading.Barrier(8)
+    responses = []
+
+    def submit():
+        barrier.wait()
+        responses.append(_post_with_key("Bruce, twice at once", "key-4"))
+
+    threads = [threading.Thread(target=submit) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    statuses = sorted(response["statusCode"] for response in responses)
+    assert statuses.count(201) >= 1
+    assert set(statuses) <= {201, 409}
+    assert len({json.loads(response["body"])["quoteId"] for response in responses if response["statusCode"] == 201}) == 1
+    quotes = [item for item in table.scan()["Items"] if item["PK"] == "QUOTE"]
+    assert len(quotes) == 1
+    lambda_client.invoke.assert_called_once()
+
+    replay = _post_with_key("Bruce, twice at once", "key-4")
+    assert replay["statusCode"] == 201
+    assert json.loads(replay["body"])["quoteId"] == quotes[0]["SK"]
+
+
+def _emf_lines(output):
+    return [json.loads(line) for line in output.splitlines() if line.startswith('{"_aws"')]
+
+
+@mock_aws
+def test_emits_one_emf_line_with_phase_timings_per_request(capsys):
+    _mk_table()
+    os.environ["EMIT_METRICS"] = "true"
+    os.environ["METRICS_NAMESPACE"] = "BruceTest"
+    os.environ["PAGE_GENERATOR_FUNCTION_NAME"] = "bruce-page-generator"
+    app._lambda_client = Mock()
+    ctx = Mock(function_name="bruce-quotes-api")
+
+    event = {
+        "requestContext": {"http": {"method": "POST", "path": "/quotes"}},
+        "body": json.dumps({"quote": "Measure twice, Bruce"}),
+    }
+    assert app.handler(event, ctx)["statusCode"] == 201
+    (record,) = _emf_lines(capsys.readouterr().out)
+
+    (directive,) = record["_aws"]["CloudWatchMetrics"]
+    assert directive["Namespace"] == "BruceTest"
+    assert directive["Dimensions"] == [["FunctionName"]]
+    units = {metric["Name"]: metric["Unit"] for metric in directive["Metrics"]}
+    assert units == {
+        "validateMs": "Milliseconds",
+        "writeMs": "Milliseconds",
+        "invokeMs": "Milliseconds",
+        "requestMs": "Milliseconds",
+        "quotesCreated": "Count",
+        "status2xx": "Count",
+    }
+    assert isinstance(record["_aws"]["Timestamp"], int)
+    assert record["FunctionName"] == "bruce-quotes-api"
+    assert record["route"] == "POST /quotes"
+    assert record["quotesCreated"] == 1
+    assert record["requestMs"] >= record["writeMs"] >= 0
+
+    # Duplicates and 4xx responses are counted too.
+    assert app.handler(event, ctx)["statusCode"] == 409
+    (record,) = _emf_lines(capsys.readouterr().out)
+    assert record["duplicates"] == 1
+    assert record["status4xx"] == 1
+    assert "invokeMs" not in record
+
+
+@mock_aws
+def test_no_metrics_are_emitted_when_disabled(capsys):
+    _mk_table()
+    event = {
+        "requestContext": {"http": {"method": "POST", "path": "/quotes"}},
+        "body": json.dumps({"quote": "Nobody is watching, Bruce"}),
+    }
+    assert app.handler(event, None)["statusCode"] == 201
+    assert _emf_lines(capsys.readouterr().out) == []
+    assert app._metrics is app._NULL_METRICS
+
+
+def test_profile_flag_writes_stats_and_allocation_report(tmp_path):
+    os.environ["LOCAL_SITE_DIR"] = str(tmp_path)
+    event = {"requestContext": {"http": {"method": "OPTIONS", "path": "/quotes"}}, "profile": True}
+
+    assert app.handler(event, Mock(function_name="bruce-quotes-api", aws_request_id="req-1"))["statusCode"] == 204
+
+    (stats_path,) = (tmp_path / ".profiles" / "bruce-quotes-api").glob("*-req-1.pstats")
+    stats = pstats.Stats(str(stats_path))
+    assert any(function == "_route" for _, _, function in stats.stats)
+    report = stats_path.with_suffix(".txt").read_text(encoding="utf-8")
+    assert "cumulative" in report
+    assert "allocation sites" in report
+
+
+def test_handler_does_not_load_the_profiler_unless_asked():
+    probe = (
+        "import sys, app; "
+        "app.handler({'requestContext': {'http': {'method': 'OPTIONS', 'path': '/quotes'}}}, None); "
+        "print('cProfile' in sys.modules, 'tracemalloc' in sys.modules)"
+    )
+    completed = subprocess.run(
+        [sys.executable, "-c", probe],
+        cwd=os.path.dirname(os.path.dirname(__file__)),
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    assert completed.stdout.strip() == "False False"
+
+
 @mock_aws
 def test_reject_sqlish():
     _mk_table()
@@ -102,6 +673,69 @@ def test_reject_sqlish():
     assert "SQL-like" in json.loads(resp["body"])["error"]
 
 
+# The regex _looks_like_sql replaced; it is the oracle for accept/reject.
+LEGACY_SQLISH = re.compile(
+    r"""
+    (?:--|;|/\*|\*/|\#)
+    | \b(?:SELECT|INSERT|UPDATE|DELETE)\b .*? \bFROM\b
+    | \bUNION\s+SELECT\b
+    | \b(?:DROP|EXEC|EXECUTE|SLEEP|WAITFOR|XP_)\b
+    | \bOR\s+1\s*=\s*1\b
+    """,
+    re.X,
+)
+
+SQL_FRAGMENTS = [
+    "SELECT", "INSERT", "FROM", "UNION", "OR", "1", "=", "DROP", "EXECUTE", "XP_", "SLEEPY", "select",
+    " ", "  ", "\n", "\t", "\u00a0", "x", "_", "\u00e9", "2", "-", "/", "*", "!", "Bruce",
+]
+
+
+def _adversarial_inputs():
+    # Exactly MAX_INPUT_LENGTH characters each, aimed at backtracking and token edges.
+    patterns = [
+        "SELECT ", "SELECT\n", "UPDATE x ", "UNION ", "UNION\t", "OR 1 = ", "OR 1=1x ", "XP_x ",
+        "FROMSELECT ", "SELECT_FROM ", "\u00e9SELECT FROM\u00e9 ", "SELECT \nFROM ", "- / * ", "=1 ",
+        "OR\u00a01\u00a0=\u00a01 ", "DELETE" + " " * 40,
+    ]
+    inputs = [(pattern * 300)[:300] for pattern in patterns]
+    inputs += [
+        "SELECT " + "a" * 288 + " FROM",
+        "SELECT " + "a\n" * 144 + " FROM",
+        "UNION" + " " * 289 + "SELECT",
+        "OR" + " " * 148 + "1=" + " " * 147 + "1",
+        "OR" + " " * 147 + "1=" + " " * 147 + "12",
+        " " * 299 + "#",
+    ]
+    return inputs
+
+
+def test_sql_scan_matches_legacy_regex_on_adversarial_inputs():
+    for text in _adversarial_inputs():
+        assert len(text) == app.Config.MAX_INPUT_LENGTH
+        assert app._looks_like_sql(text) == bool(LEGACY_SQLISH.search(text)), repr(text)
+
+
+def test_sql_scan_matches_legacy_regex_on_random_inputs():
+    rng = random.Random(1234)
+    matched = 0
+    for _ in range(5000):
+        text = "".join(rng.choices(SQL_FRAGMENTS, k=rng.randint(1, 60)))[:300]
+        expected = bool(LEGACY_SQLISH.search(text))
+        matched += expected
+        assert app._looks_like_sql(text) == expected, repr(text)
+    assert 0 < matched < 5000
+
+
+def test_validate_quote_normalizes_then_checks():
+    assert app._validate_quote('  "UPDATE your FROM page"  ') == (
+        "UPDATE your FROM page",
+        "Input contains SQL-like content. There is no SQL here.",
+    )
+    assert app._validate_quote(" 'OR 1 = 12' ") == ("OR 1 = 12", None)
+    assert app._validate_quote(None)[1] == "Quote length must be between 5 and 300."
+
+
 @mock_aws
 def test_length_validation():
     _mk_table()
@@ -164,3 +798,86 @@ def test_cors_origin_override():
     response = app.handler(ev, None)
     assert response["statusCode"] == 204
     assert response["headers"]["access-control-allow-origin"] == "https://shitbrucesays.co.uk"
+
+
+def test_cheap_routes_do_not_import_boto3():
+    probe = (
+        "import sys, app; "
+        "app.handler({'requestContext': {'http': {'method': 'OPTIONS', 'path': '/quotes'}}}, None); "
+        "app.handler({'requestContext': {'http': {'method': 'GET', 'path': '/nope'}}}, None); "
+        "print('boto3' in sys.modules)"
+    )
+    completed = subprocess.run(
+        [sys.executable, "-c", probe],
+        cwd=os.path.dirname(os.path.dirname(__file__)),
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    assert completed.stdout.strip() == "False"
+
+
+@mock_aws
+def test_prewarm_builds_clients_only_when_init_is_ahead_of_traffic():
+    os.environ["AWS_LAMBDA_INITIALIZATION_TYPE"] = "on-demand"
+    app._prewarm_clients()
+    assert app._table is None
+
+    os.environ["AWS_LAMBDA_INITIALIZATION_TYPE"] = "provisioned-concurrency"
+    app._prewarm_clients()
+    assert app._table is not None
+    assert app._lambda_client is None
+
+    app._table = None
+    os.environ["PREWARM_CLIENTS"] = "false"
+    app._prewarm_clients()
+    assert app._table is None
+
+
+def _legacy_ulid(timestamp_ms, randomness):
+    value = (timestamp_ms << 80) | randomness
+    encoded = ""
+    for _ in range(26):
+        encoded = "0123456789ABCDEFGHJKMNPQRSTVWXYZ"[value & 0x1F] + encoded
+        value >>= 5
+    return encoded
+
+
+def test_ulid_encoding_matches_the_original_generator():
+    samples = [(0, 0), (2**48 - 1, 2**80 - 1), (1_746_403_200_000, 12345678901234567890)]
+    for timestamp_ms, randomness in samples:
+        ulid = app._encode_ulid(timestamp_ms, randomness)
+        assert ulid == _legacy_ulid(timestamp_ms, randomness)
+        assert app._ulid_timestamp_ms(ulid) == timestamp_ms
+
+
+def test_ulid_generator_is_monotonic_within_a_millisecond_and_across_clock_skew():
+    now = [1_746_403_200.0005]
+    generator = app.UlidGenerator(clock=lambda: now[0], random_bytes=lambda n: b"\x42" * n)
+
+    first = generator.new()
+    second = generator.new()
+    now[0] -= 5  # clock stepped backwards
+    third = generator.new()
+    now[0] += 10
+    fourth = generator.new()
+
+    assert first < second < third < fourth
+    assert app._ulid_timestamp_ms(third) == app._ulid_timestamp_ms(first) == 1_746_403_200_000
+    assert app._ulid_timestamp_ms(fourth) == 1_746_403_205_000
+
+
+def test_ulid_batch_is_sorted_unique_and_carries_into_the_next_millisecond():
+    generator = app.UlidGenerator(clock=lambda: 1_746_403_200.0, random_bytes=lambda n: b"\xff" * n)
+    ids = generator.batch(5)
+    assert ids == sorted(ids)
+    assert len(set(ids)) == 5
+    assert app._ulid_timestamp_ms(ids[-1]) == 1_746_403_200_001
+
+    generator = app.UlidGenerator()
+    ids = generator.batch(1000) + [generator.new()]
+    assert ids == sorted(ids)
+    assert len(set(ids)) == 1001
+
+    with pytest.raises(ValueError):
+        app._ulid_timestamp_ms("01ARZ3NDEKTSV4RRFFQ69G5FAU")
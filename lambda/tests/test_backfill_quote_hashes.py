@@ -0,0 +1,51 @@
+import sys
+from pathlib import Path
+
+import boto3
+from moto import mock_aws
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "tools"))
+import app  # noqa: E402
+import backfill_quote_hashes  # noqa: E402
+
+
+def _mk_table():
+    ddb = boto3.resource("dynamodb", region_name="us-east-2")
+    ddb.create_table(
+        TableName="bruce-quotes",
+        BillingMode="PAY_PER_REQUEST",
+        KeySchema=[
+            {"AttributeName": "PK", "KeyType": "HASH"},
+            {"AttributeName": "SK", "KeyType": "RANGE"},
+        ],
+        AttributeDefinitions=[
+            {"AttributeName": "PK", "AttributeType": "S"},
+            {"AttributeName": "SK", "AttributeType": "S"},
+        ],
+    )
+    return ddb.Table("bruce-quotes")
+
+
+@mock_aws
+def test_backfill_marks_the_oldest_copy_and_reports_duplicates():
+    table = _mk_table()
+    quotes = {
+        "01JAAAAAAAAAAAAAAAAAAAAAA1": "Cowabunga, Bruce!",
+        "01JAAAAAAAAAAAAAAAAAAAAAA2": "Bruce is always right",
+        "01JAAAAAAAAAAAAAAAAAAAAAA3": "cowabunga,  bruce!",
+    }
+    for quote_id, text in quotes.items():
+        partition_key = app._quote_partition_key(quote_id, 4)
+        table.put_item(Item={"PK": partition_key, "SK": quote_id, "quote": text, "createdAt": "2026-05-05"})
+
+    dry_run = backfill_quote_hashes.backfill_quote_hashes(table, shards=4, dry_run=True)
+    assert dry_run == {"scanned": 3, "written": 2, "duplicates": ["01JAAAAAAAAAAAAAAAAAAAAAA3"]}
+    assert table.scan()["Count"] == 3
+
+    result = backfill_quote_hashes.backfill_quote_hashes(table, shards=4)
+    assert result == {"scanned": 3, "written": 2, "duplicates": ["01JAAAAAAAAAAAAAAAAAAAAAA3"]}
+    marker = table.get_item(Key=app._quote_hash_key(app._quote_hash("Cowabunga, Bruce!")))["Item"]
+    assert marker["quoteId"] == "01JAAAAAAAAAAAAAAAAAAAAAA1"
+
+    again = backfill_quote_hashes.backfill_quote_hashes(table, shards=4)
+    assert again == {"scanned": 3, "written": 0, "duplicates": ["01JAAAAAAAAAAAAAAAAAAAAAA3"]}
@@ -0,0 +1,70 @@
+import json
+import os
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "tools"))
+import benchmark_publish  # noqa: E402
+import app  # noqa: E402
+
+
+def test_synthetic_corpus_is_deterministic_valid_and_oldest_first():
+    items = benchmark_publish.synthetic_items(500, seed=7)
+
+    assert items == benchmark_publish.synthetic_items(500, seed=7)
+    assert items != benchmark_publish.synthetic_items(500, seed=8)
+    ids = [item["SK"] for item in items]
+    assert ids == sorted(ids) and len(set(ids)) == len(ids)
+    assert all(app._ULID_PATTERN.fullmatch(quote_id) for quote_id in ids)
+    assert all(1 <= len(item["quote"]) <= app.Config.MAX_INPUT_LENGTH for item in items)
+    assert any("<b>" in item["quote"] for item in items)
+    assert items[0]["createdAt"][:4] == "2023" and items[-1]["createdAt"][:4] == "2025"
+
+
+def test_run_records_every_case_and_restores_the_environment(monkeypatch):
+    monkeypatch.setenv("LOCAL_SITE_DIR", "/keep/me")
+
+    results = benchmark_publish.run_benchmarks([40], measure_memory=True)
+
+    assert set(results["cases"]) == {
+        f"{name}@40"
+        for name in (
+            "fetch_all_quotes",
+            "render_homepage",
+            "render_quote_page",
+            "render_sitemaps",
+            "publish_site_full",
+            "publish_site_incremental",
+        )
+    }
+    for case in results["cases"].values():
+        assert case["quotes"] == 40
+        assert case["wallMs"] >= 0
+        assert case["peakBytes"] > 0
+        assert case["outputBytes"] > 0
+    cases = results["cases"]
+    assert cases["publish_site_full@40"]["outputBytes"] > cases["render_homepage@40"]["outputBytes"]
+    json.dumps(results)
+    assert os.environ["LOCAL_SITE_DIR"] == "/keep/me"
+
+
+def test_compare_flags_growth_past_the_threshold_only():
+    baseline = {
+        "cases": {
+            "render_homepage@1000": {"wallMs": 100.0, "peakBytes": 1_000_000},
+            "render_sitemaps@1000": {"wallMs": 2.0, "peakBytes": 1_000},
+        }
+    }
+    results = {
+        "cases": {
+            "render_homepage@1000": {"wallMs": 140.0, "peakBytes": 1_100_000},
+            "render_sitemaps@1000": {"wallMs": 4.0, "peakBytes": 2_000},
+            "publish_site_full@1000": {"wallMs": 900.0, "peakBytes": 1},
+        }
+    }
+
+    assert benchmark_publish.compare_results(results, baseline, 0.25) == [
+        "render_homepage@1000 wallMs 100.0 -> 140.0 (+40%)",
+        "render_sitemaps@1000 peakBytes 1000 -> 2000 (+100%)",
+    ]
+    assert benchmark_publish.compare_results(results, baseline, 1.0) == []
@@ -0,0 +1,34 @@
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "tools"))
+import check_cold_start  # noqa: E402
+
+SAMPLE = """\
+import time:       500 |        900 | site
+import time:       200 |        200 |     botocore.utils
+import time:       300 |       1000 |   boto3
+import time:       100 |        100 |   json
+import time:        50 |       1200 | page_generator
+import time:        40 |         40 | late_import
+"""
+
+
+def test_handler_imports_skips_startup_and_nested_modules():
+    imports = check_cold_start.parse_importtime(SAMPLE + "not an importtime line\n")
+
+    assert imports[0] == (" site", 900)
+    assert check_cold_start.handler_imports(imports, "page_generator") == [
+        ("boto3", 1000),
+        ("json", 100),
+        ("late_import", 40),
+    ]
+    assert check_cold_start.slowest_imports(imports, "page_generator", 1) == [("boto3", 1000)]
+
+
+def test_budgets_flag_slow_imports_and_forbidden_boto3():
+    scenario = {"import_budget_ms": 10, "request_budget_ms": 5, "forbid_boto3": True}
+    result = {"import_ms": 12.0, "request_ms": 1.0, "boto3_after_request": True, "status": 204}
+
+    assert check_cold_start.check_budgets(scenario, result, 1.0) == ["import 12.0 ms > 10 ms", "boto3 was imported"]
+    assert check_cold_start.check_budgets(scenario, result, 2.0) == ["boto3 was imported"]
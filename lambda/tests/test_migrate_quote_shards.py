@@ -0,0 +1,52 @@
+import os
+import sys
+from pathlib import Path
+
+import boto3
+from moto import mock_aws
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "tools"))
+import migrate_quote_shards  # noqa: E402
+import page_generator  # noqa: E402
+
+
+def _mk_table():
+    ddb = boto3.resource("dynamodb", region_name="us-east-2")
+    ddb.create_table(
+        TableName="bruce-quotes",
+        BillingMode="PAY_PER_REQUEST",
+        KeySchema=[
+            {"AttributeName": "PK", "KeyType": "HASH"},
+            {"AttributeName": "SK", "KeyType": "RANGE"},
+        ],
+        AttributeDefinitions=[
+            {"AttributeName": "PK", "AttributeType": "S"},
+            {"AttributeName": "SK", "AttributeType": "S"},
+        ],
+    )
+    return ddb.Table("bruce-quotes")
+
+
+@mock_aws
+def test_migration_moves_quotes_onto_their_shards_and_is_idempotent():
+    table = _mk_table()
+    quote_ids = [f"01JABCDEF{index:017d}" for index in range(30)]
+    for quote_id in quote_ids:
+        table.put_item(Item={"PK": "QUOTE", "SK": quote_id, "quote": "Bruce", "createdAt": "2026-05-05"})
+    table.put_item(Item={"PK": "PUBLISH", "SK": "STATE", "requested": 3})
+
+    assert migrate_quote_shards.migrate_quote_shards(table, 4, dry_run=True) == {"scanned": 30, "moved": 30}
+    assert table.scan()["Count"] == 31
+
+    assert migrate_quote_shards.migrate_quote_shards(table, 4) == {"scanned": 30, "moved": 30}
+    items = table.scan()["Items"]
+    assert len(items) == 31
+    for item in items:
+        if item["PK"] != "PUBLISH":
+            assert item["PK"] == page_generator.quote_partition_key(item["SK"], 4)
+            assert item["quote"] == "Bruce"
+            assert item[page_generator.MOVED_FROM_ATTRIBUTE] == "QUOTE"
+
+    assert migrate_quote_shards.migrate_quote_shards(table, 4, from_shards=4) == {"scanned": 30, "moved": 0}
+    assert migrate_quote_shards.migrate_quote_shards(table, 1, from_shards=4) == {"scanned": 30, "moved": 30}
+    assert {item["PK"] for item in table.scan()["Items"]} == {"QUOTE", "PUBLISH"}
@@ -1,8 +1,15 @@
+import gzip
+import json
 import os
+import pstats
+import re
 import sys
+import time
+from datetime import datetime, timedelta, timezone
 
 import boto3
 import pytest
+from boto3.dynamodb.types import TypeSerializer
 from moto import mock_aws
 
 # Ensure the module is importable
@@ -45,10 +52,22 @@ def env_vars():
     os.environ["API_BASE_URL"] = "https://api.shitbrucesays.co.uk"
     os.environ.pop("LOCAL_SITE_DIR", None)
     os.environ.pop("SITE_BASE_URL", None)
+    os.environ.pop("PRECOMPRESS", None)
+    os.environ.pop("PUBLISH_COORDINATION", None)
+    os.environ.pop("SNAPSHOT_REVALIDATE_SECONDS", None)
+    os.environ.pop("QUOTE_SHARDS", None)
+    os.environ.pop("FAST_QUERY_DECODE", None)
+    os.environ.pop("EMIT_METRICS", None)
+    os.environ.pop("METRICS_NAMESPACE", None)
+    os.environ.pop("PROFILE_HANDLER", None)
+    os.environ.pop("PROFILE_S3_URI", None)
+    os.environ["PUBLISH_COALESCE_SECONDS"] = "0"
     if hasattr(page_generator, "_s3_client"):
         page_generator._s3_client = None
     if hasattr(page_generator, "_dynamodb_resource"):
         page_generator._dynamodb_resource = None
+    if hasattr(page_generator, "_dynamodb_client"):
+        page_generator._dynamodb_client = None
     yield
 
 
@@ -84,9 +103,14 @@ def test_publish_site_generates_home_quote_pages_and_sitemap():
     assert "Back to all quotes" in quote_body
     assert 'rel="canonical" href="https://shitbrucesays.co.uk/quotes/01JABCDEF1234567890ABCDEF/"' in quote_body
 
-    sitemap = s3.get_object(Bucket=os.environ["BUCKET_NAME"], Key="sitemap.xml")
-    sitemap_body = sitemap["Body"].read().decode("utf-8")
-    assert "https://shitbrucesays.co.uk/quotes/01JABCDEF1234567890ABCDEF/" in sitemap_body
+    sitemap_index = s3.get_object(Bucket=os.environ["BUCKET_NAME"], Key="sitemap-index.xml")
+    sitemap_index_body = sitemap_index["Body"].read().decode("utf-8")
+    assert "<loc>https://shitbrucesays.co.uk/sitemaps/quotes-1.xml</loc>" in sitemap_index_body
+    assert "<loc>https://shitbrucesays.co.uk/sitemaps/pages.xml</loc>" in sitemap_index_body
+
+    shard = s3.get_object(Bucket=os.environ["BUCKET_NAME"], Key="sitemaps/quotes-1.xml")
+    assert "https://shitbrucesays.co.uk/quotes/01JABCDEF1234567890ABCDEF/" in shard["Body"].read().decode("utf-8")
+    assert shard["CacheControl"] == page_generator.SITEMAP_CACHE_CONTROL
 
 
 @mock_aws
@@ -102,7 +126,7 @@ def test_publish_site_handles_empty_database():
     homepage_body = homepage["Body"].read().decode("utf-8")
     assert "No quotes yet. Be the first to add one." in homepage_body
 
-    sitemap = s3.get_object(Bucket=os.environ["BUCKET_NAME"], Key="sitemap.xml")
+    sitemap = s3.get_object(Bucket=os.environ["BUCKET_NAME"], Key="sitemaps/pages.xml")
     sitemap_body = sitemap["Body"].read().decode("utf-8")
     assert "<loc>https://shitbrucesays.co.uk/</loc>" in sitemap_body
 
@@ -126,10 +150,1079 @@ def test_publish_site_can_write_to_local_directory(tmp_path):
     assert result["quoteCount"] == 1
     homepage = (tmp_path / "index.html").read_text(encoding="utf-8")
     quote_page = (tmp_path / "quotes" / "01JLOCAL1234567890ABCDEF0" / "index.html").read_text(encoding="utf-8")
-    sitemap = (tmp_path / "sitemap.xml").read_text(encoding="utf-8")
+    sitemap = (tmp_path / "sitemaps" / "quotes-1.xml").read_text(encoding="utf-8")
 
     assert "Local Bruce quote" in homepage
     assert 'meta name="api-base" content="https://api.shitbrucesays.co.uk"' in homepage
     assert 'href="http://localhost:8080/quotes/01JLOCAL1234567890ABCDEF0/"' in homepage
     assert "Back to all quotes" in quote_page
     assert "<loc>http://localhost:8080/quotes/01JLOCAL1234567890ABCDEF0/</loc>" in sitemap
+
+
+@mock_aws
+def test_incremental_publish_only_writes_the_changed_quote_page():
+    table = _create_table()
+    s3 = _create_bucket()
+    for sk, text in (
+        ("01JOLDQUOTE00000000000000", "An older Bruce quote"),
+        ("01JNEWQUOTE00000000000000", "A brand new Bruce quote"),
+    ):
+        table.put_item(
+            Item={"PK": "QUOTE", "SK": sk, "quote": text, "createdAt": "2026-05-05T12:00:00+00:00"}
+        )
+
+    response = page_generator.handler(
+        {"source": "quotes-api", "quoteId": "01JNEWQUOTE00000000000000"},
+        None,
+    )
+
+    assert response["statusCode"] == 200
+    body = json.loads(response["body"])
+    assert body["mode"] == "incremental"
+    assert body["quoteCount"] == 2
+    assert body["quotePagesWritten"] == 1
+
+    keys = {obj["Key"] for obj in s3.list_objects_v2(Bucket=os.environ["BUCKET_NAME"])["Contents"]}
+    assert keys == {
+        "index.html",
+        "sitemap.xml",
+        "sitemap-index.xml",
+        "sitemaps/pages.xml",
+        "sitemaps/quotes-1.xml",
+        "quotes/01JNEWQUOTE00000000000000/index.html",
+        page_generator.MANIFEST_KEY,
+        page_generator.manifest_group_key("quotes-01JN"),
+        page_generator.SNAPSHOT_KEY,
+    }
+
+    homepage = s3.get_object(Bucket=os.environ["BUCKET_NAME"], Key="index.html")["Body"].read().decode("utf-8")
+    assert "An older Bruce quote" in homepage
+    assert "A brand new Bruce quote" in homepage
+
+
+def _stream_event(*items, event_name="INSERT"):
+    serializer = TypeSerializer()
+    return {
+        "Records": [
+            {
+                "eventSource": "aws:dynamodb",
+                "eventName": event_name,
+                "dynamodb": {
+                    "Keys": {"PK": {"S": item["PK"]}, "SK": {"S": item["SK"]}},
+                    "NewImage": {name: serializer.serialize(value) for name, value in item.items()},
+                },
+            }
+            for item in items
+        ]
+    }
+
+
+@mock_aws
+def test_stream_records_publish_only_the_inserted_quotes():
+    table = _create_table()
+    s3 = _create_bucket()
+    old = {"PK": "QUOTE", "SK": "01JOLDQUOTE00000000000000", "quote": "An older quote", "createdAt": "2026-05-04"}
+    new = {"PK": "QUOTE#3", "SK": "01JNEWQUOTE00000000000000", "quote": "A streamed quote", "createdAt": "2026-05-05"}
+    table.put_item(Item=old)
+    table.put_item(Item=new)
+
+    event = _stream_event(
+        new,
+        {"PK": "QUOTEHASH#abc", "SK": "QUOTEHASH", "quoteId": new["SK"]},
+        {"PK": "IDEMPOTENCY#key", "SK": "IDEMPOTENCY", "state": "pending"},
+    )
+    event["Records"] += _stream_event(
+        {"PK": "STATS", "SK": "QUOTES", "quoteCount": 2, "recent0": {"quoteId": new["SK"], "quote": "x"}},
+        event_name="MODIFY",
+    )["Records"]
+    assert page_generator.changed_quotes_from_stream(event["Records"]) == [
+        {"SK": new["SK"], "quote": "A streamed quote", "createdAt": "2026-05-05"}
+    ]
+
+    os.environ["QUOTE_SHARDS"] = "4"
+    response = page_generator.handler(event, None)
+
+    assert response["statusCode"] == 200
+    body = json.loads(response["body"])
+    assert body["mode"] == "incremental"
+    assert body["quoteCount"] == 2
+    assert body["quotePagesWritten"] == 1
+    keys = {obj["Key"] for obj in s3.list_objects_v2(Bucket=os.environ["BUCKET_NAME"])["Contents"]}
+    assert f"quotes/{new['SK']}/index.html" in keys
+    assert f"quotes/{old['SK']}/index.html" not in keys
+
+
+@mock_aws
+def test_stream_batch_without_quote_changes_skips_publishing():
+    _create_table()
+    s3 = _create_bucket()
+    event = _stream_event({"PK": "QUOTEHASH#abc", "SK": "QUOTEHASH", "quoteId": "01JNEWQUOTE00000000000000"})
+    event["Records"] += _stream_event(
+        {"PK": "QUOTE", "SK": "01JNEWQUOTE00000000000000", "quote": "Deleted", "createdAt": "2026-05-05"},
+        event_name="REMOVE",
+    )["Records"]
+    # A shard migration's copy: same quote, new partition.
+    moved = {"PK": "QUOTE#1", "SK": "01JOLDQUOTE00000000000000", "quote": "Moved", "createdAt": "2026-05-04"}
+    event["Records"] += _stream_event({**moved, page_generator.MOVED_FROM_ATTRIBUTE: "QUOTE"})["Records"]
+
+    response = page_generator.handler(event, None)
+
+    assert response["statusCode"] == 200
+    assert json.loads(response["body"])["records"] == 3
+    assert "Contents" not in s3.list_objects_v2(Bucket=os.environ["BUCKET_NAME"])
+
+
+def test_edits_to_migrated_quotes_still_trigger_a_publish():
+    moved = {"PK": "QUOTE#1", "SK": "01JOLDQUOTE00000000000000", "quote": "Edited", "createdAt": "2026-05-04"}
+    moved[page_generator.MOVED_FROM_ATTRIBUTE] = "QUOTE"
+    changed = page_generator.changed_quotes_from_stream(_stream_event(moved, event_name="MODIFY")["Records"])
+    assert changed == [{"SK": "01JOLDQUOTE00000000000000", "quote": "Edited", "createdAt": "2026-05-04"}]
+
+
+@mock_aws
+def test_pending_ids_past_the_cap_fall_back_to_a_full_publish(monkeypatch):
+    table = _create_table()
+    monkeypatch.setattr(page_generator, "MAX_PENDING_IDS", 2)
+
+    assert page_generator.register_trigger([{"SK": "01JA"}, {"SK": "01JB"}]) == 1
+    assert page_generator.register_trigger([{"SK": "01JC"}]) == 2
+
+    state = _coordination_state(table)
+    assert state["pendingIds"] == {"01JA", "01JB"}
+    assert state["fullRequestedAt"] == 2
+    assert state["triggersReceived"] == 2
+
+
+def test_failed_stream_publish_raises_so_the_batch_is_retried(monkeypatch):
+    monkeypatch.setattr(page_generator, "publish_site", lambda changed: {"objectsFailed": 2})
+    event = _stream_event({"PK": "QUOTE", "SK": "01JNEWQUOTE00000000000000", "quote": "Bruce", "createdAt": "2026"})
+    with pytest.raises(RuntimeError, match="2 object"):
+        page_generator.handler(event, None)
+    response = page_generator.handler({"source": "quotes-api", "quoteId": "01JNEWQUOTE00000000000000"}, None)
+    assert response["statusCode"] == 500
+
+
+@mock_aws
+def test_handler_emits_one_emf_line_with_phases_and_counts(capsys):
+    table = _create_table()
+    s3 = _create_bucket()
+    for index in range(3):
+        _put_quote(table, f"01JMETRIC{index:017d}", f"Bruce said thing {index}")
+    os.environ["EMIT_METRICS"] = "true"
+    os.environ["PRECOMPRESS"] = "gzip"
+
+    response = page_generator.handler({"source": "terraform-apply"}, None)
+    assert response["statusCode"] == 200
+
+    records = [json.loads(line) for line in capsys.readouterr().out.splitlines() if line.startswith('{"_aws"')]
+    assert len(records) == 1
+    record = records[0]
+    (directive,) = record["_aws"]["CloudWatchMetrics"]
+    assert directive["Namespace"] == "ShitBruceSays"
+    assert directive["Dimensions"] == [["FunctionName"]]
+    units = {metric["Name"]: metric["Unit"] for metric in directive["Metrics"]}
+    for phase in ("invocationMs", "loadQuotesMs", "renderMs", "compressMs", "uploadMs", "flushMs"):
+        assert units[phase] == "Milliseconds"
+        assert record[phase] >= 0
+    assert units["bytesWritten"] == "Bytes"
+    assert units["objectPuts"] == "Count"
+    assert record["mode"] == "full"
+    assert record["quotesRead"] == 3
+    assert record["quotePagesWritten"] == 3
+    assert record["objectsFailed"] == 0
+
+    stored = s3.list_objects_v2(Bucket="bruce-quotes-site-test")["Contents"]
+    assert record["objectPuts"] == len(stored)
+    assert record["bytesWritten"] == sum(
+        item["Size"] for item in stored if not item["Key"].startswith(page_generator.PUBLISH_STATE_PREFIX)
+    )
+
+
+@mock_aws
+def test_handler_emits_nothing_when_metrics_are_disabled(capsys):
+    _create_table()
+    _create_bucket()
+
+    page_generator.handler({"source": "terraform-apply"}, None)
+
+    assert '"_aws"' not in capsys.readouterr().out
+    assert page_generator.get_metrics() is page_generator.NULL_METRICS
+
+
+@mock_aws
+def test_profiling_writes_next_to_the_local_site(tmp_path):
+    table = _create_table()
+    _put_quote(table, "01JPROFILE0000000000000000", "Profile me, Bruce")
+    os.environ["LOCAL_SITE_DIR"] = str(tmp_path)
+    os.environ["PROFILE_HANDLER"] = "true"
+
+    response = page_generator.handler({"source": "terraform-apply"}, None)
+
+    assert response["statusCode"] == 200
+    (stats_path,) = (tmp_path / page_generator.PROFILE_LOCAL_DIR).rglob("*.pstats")
+    stats = pstats.Stats(str(stats_path))
+    assert any(function == "publish_site" for _, _, function in stats.stats)
+    assert "allocation sites" in stats_path.with_suffix(".txt").read_text(encoding="utf-8")
+
+
+@mock_aws
+def test_profile_payload_flag_uploads_to_the_configured_prefix():
+    _create_table()
+    s3 = _create_bucket()
+    s3.create_bucket(Bucket="bruce-artifacts", CreateBucketConfiguration={"LocationConstraint": "us-east-2"})
+    os.environ["PROFILE_S3_URI"] = "s3://bruce-artifacts/profiles/"
+
+    page_generator.handler({"source": "terraform-apply"}, None)
+    assert "Contents" not in s3.list_objects_v2(Bucket="bruce-artifacts")
+
+    context = type("Context", (), {"function_name": "bruce-page-generator", "aws_request_id": "req-9"})()
+    page_generator.handler({"source": "terraform-apply", "profile": True}, context)
+    keys = sorted(item["Key"] for item in s3.list_objects_v2(Bucket="bruce-artifacts")["Contents"])
+    assert len(keys) == 2
+    assert keys[0].startswith("profiles/bruce-page-generator/") and keys[0].endswith("-req-9.pstats")
+    assert keys[1].endswith("-req-9.txt")
+    site_keys = [item["Key"] for item in s3.list_objects_v2(Bucket="bruce-quotes-site-test")["Contents"]]
+    assert not any("profile" in key for key in site_keys)
+
+
+def test_changed_quotes_from_batch_event():
+    event = {
+        "source": "quotes-api",
+        "quotes": [
+            {"quoteId": "01JNEWQUOTE00000000000001", "quote": "One", "createdAt": "2026-05-05T12:00:00+00:00"},
+            {"quoteId": "01JNEWQUOTE00000000000002"},
+            {"quote": "No id"},
+            "garbage",
+        ],
+    }
+    assert page_generator.changed_quotes_from_event(event) == [
+        {"SK": "01JNEWQUOTE00000000000001", "quote": "One", "createdAt": "2026-05-05T12:00:00+00:00"},
+        {"SK": "01JNEWQUOTE00000000000002"},
+    ]
+    assert page_generator.changed_quotes_from_event({"source": "quotes-api", "quotes": []}) is None
+    assert page_generator.changed_quotes_from_event({"source": "deploy"}) is None
+
+
+@mock_aws
+def test_incremental_publish_includes_quote_body_not_yet_visible_to_query():
+    _create_table()
+    s3 = _create_bucket()
+
+    result = page_generator.publish_site(
+        [
+            {
+                "SK": "01JFRESH00000000000000000",
+                "quote": "Fresh off the press",
+                "createdAt": "2026-05-05T12:00:00+00:00",
+            }
+        ]
+    )
+
+    assert result["quoteCount"] == 1
+    quote_page = s3.get_object(
+        Bucket=os.environ["BUCKET_NAME"],
+        Key="quotes/01JFRESH00000000000000000/index.html",
+    )
+    assert "Fresh off the press" in quote_page["Body"].read().decode("utf-8")
+
+
+def _put_quote(table, sk, text):
+    table.put_item(Item={"PK": "QUOTE", "SK": sk, "quote": text, "createdAt": "2026-05-05T12:00:00+00:00"})
+
+
+@mock_aws
+def test_incremental_publish_reads_only_quotes_after_the_snapshot_watermark():
+    table = _create_table()
+    _create_bucket()
+    _put_quote(table, "01HZZZZZZZ0000000000000001", "A quote from long ago")
+    _put_quote(table, "01JABCDEF10000000000000001", "The newest quote at deploy time")
+
+    first = page_generator.publish_site()
+    assert first["quoteSource"] == "query"
+    assert first["quotesRead"] == 2
+
+    # A key minted just before the watermark but committed after it is still
+    # inside the lookback window; the ancient quote is served from the snapshot.
+    _put_quote(table, "01JABCDEF00000000000000001", "A slow request")
+    _put_quote(table, "01JABCDEF20000000000000001", "A brand new quote")
+    second = page_generator.publish_site([{"SK": "01JABCDEF20000000000000001"}])
+
+    assert second["quoteSource"] == "snapshot"
+    assert second["quotesRead"] == 3
+    assert second["quoteCount"] == 4
+    snapshot = page_generator.load_snapshot()
+    assert [quote.id for quote in snapshot["quotes"]] == [
+        "01JABCDEF20000000000000001",
+        "01JABCDEF10000000000000001",
+        "01JABCDEF00000000000000001",
+        "01HZZZZZZZ0000000000000001",
+    ]
+
+
+@mock_aws
+def test_stale_snapshot_is_revalidated_against_the_table(monkeypatch):
+    table = _create_table()
+    _create_bucket()
+    _put_quote(table, "01HZZZZZZZ0000000000000001", "Deleted out of band")
+    _put_quote(table, "01JABCDEF10000000000000001", "A kept quote")
+    page_generator.publish_site()
+    table.delete_item(Key={"PK": "QUOTE", "SK": "01HZZZZZZZ0000000000000001"})
+
+    cached = page_generator.publish_site([{"SK": "01JABCDEF10000000000000001"}])
+    assert cached["quoteSource"] == "snapshot"
+    assert cached["quoteCount"] == 2
+
+    os.environ["SNAPSHOT_REVALIDATE_SECONDS"] = "0"
+    revalidated = page_generator.publish_site([{"SK": "01JABCDEF10000000000000001"}])
+    assert revalidated["quoteSource"] == "query"
+    assert revalidated["quoteCount"] == 1
+    assert [quote.id for quote in page_generator.load_snapshot()["quotes"]] == ["01JABCDEF10000000000000001"]
+
+
+def test_quote_precomputes_escaped_text_and_display_date():
+    quote = page_generator.Quote.from_item(
+        {"PK": "QUOTE", "SK": "01JABC", "quote": "Bruce & <co>", "createdAt": "2026-05-05T12:00:00+00:00"}
+    )
+
+    assert quote.escaped_text == "Bruce &amp; &lt;co&gt;"
+    assert quote.display_date == "May 05, 2026 at 12:00:00 UTC"
+    assert quote.lastmod == "2026-05-05"
+    assert not hasattr(quote, "__dict__")
+    with pytest.raises(AttributeError):
+        quote.text = "changed"
+
+
+def test_fast_decoder_falls_back_to_the_generic_deserializer():
+    fast = page_generator.decode_quote_item(
+        {"SK": {"S": "01JABC"}, "quote": {"S": "Bruce"}, "createdAt": {"S": "2026-05-05T12:00:00+00:00"}}
+    )
+    assert (fast.id, fast.text, fast.created_at) == ("01JABC", "Bruce", "2026-05-05T12:00:00+00:00")
+
+    odd = page_generator.decode_quote_item(
+        {"SK": {"S": "01JABD"}, "quote": {"N": "1337"}, "createdAt": {"S": "2026-05-05T12:00:00+00:00"}}
+    )
+    assert odd.text == "1337"
+
+
+@mock_aws
+def test_fast_and_resource_query_paths_return_the_same_quotes():
+    table = _create_table()
+    for index in range(5):
+        _put_quote(table, f"01JABCDEF1000000000000000{index}", f"Bruce & <friends> {index}")
+    table.put_item(
+        Item={"PK": "QUOTE", "SK": "01JABCDEF20000000000000000", "quote": 42, "createdAt": "2026-05-06T12:00:00+00:00"}
+    )
+
+    fast = page_generator.fetch_all_quotes()
+    os.environ["FAST_QUERY_DECODE"] = "false"
+    generic = page_generator.fetch_all_quotes()
+
+    assert fast == generic
+    assert fast[0].text == "42"
+    assert len(fast) == 6
+
+
+def test_ulid_time_floor_subtracts_milliseconds_from_the_timestamp():
+    assert page_generator.ulid_time_floor("0000000010ABCDEFGHJKMNPQRS", 1) == "000000000Z" + "0" * 16
+    assert page_generator.ulid_time_floor("0000000001ABCDEFGHJKMNPQRS", 5) == "0" * 26
+    assert page_generator.ulid_time_part(1_746_403_200_001) == "01JTEVW301"
+    with pytest.raises(ValueError):
+        page_generator.ulid_time_floor("not-a-ulid", 1)
+    with pytest.raises(ValueError):
+        page_generator.ulid_time_floor("01ARZ3NDEKTSV4RRFFQ69G5FAU", 1)
+
+
+def test_ulid_bounds_cover_a_date_range():
+    start = datetime(2026, 5, 5, tzinfo=timezone.utc)
+    end = datetime(2026, 5, 6, tzinfo=timezone.utc)
+    low, high = page_generator.ulid_bounds(start, end)
+    first = page_generator.ulid_time_part(1_777_939_200_000) + "0" * 16
+    last = page_generator.ulid_time_part(1_778_025_599_999) + "Z" * 16
+    after = page_generator.ulid_time_part(1_778_025_600_000) + "0" * 16
+
+    assert (low, high) == (first, last)
+    assert low < "01KQTTC9M0ABCDEFGHJKMNPQRS" < high < after
+    assert page_generator.ulid_datetime(high) == end - timedelta(milliseconds=1)
+    assert page_generator.ulid_timestamp_ms(low) == 1_777_939_200_000
+    assert page_generator.ulid_bounds(start)[1] == "7" + "Z" * 25
+    assert page_generator.ulid_bounds(datetime(1969, 1, 1, tzinfo=timezone.utc), start)[0] == "0" * 26
+
+
+@mock_aws
+def test_sharded_quotes_are_gathered_from_every_partition_in_ulid_order():
+    table = _create_table()
+    os.environ["QUOTE_SHARDS"] = "4"
+    quote_ids = [f"01JABCDEF{index:017d}" for index in range(12)]
+    for quote_id in quote_ids:
+        table.put_item(
+            Item={
+                "PK": page_generator.quote_partition_key(quote_id, 4),
+                "SK": quote_id,
+                "quote": f"Sharded quote {quote_id}",
+                "createdAt": "2026-05-05T12:00:00+00:00",
+            }
+        )
+    # Not yet migrated, plus a copy left behind mid-migration.
+    _put_quote(table, "01HZZZZZZZ0000000000000001", "A legacy quote")
+    _put_quote(table, quote_ids[5], f"Sharded quote {quote_ids[5]}")
+
+    assert {page_generator.quote_partition_key(quote_id, 4) for quote_id in quote_ids} == {
+        "QUOTE#0",
+        "QUOTE#1",
+        "QUOTE#2",
+        "QUOTE#3",
+    }
+    quotes = page_generator.fetch_all_quotes()
+    assert [quote.id for quote in quotes] == [*reversed(quote_ids), "01HZZZZZZZ0000000000000001"]
+
+    recent = page_generator.query_quotes(since=quote_ids[10])
+    assert [quote.id for quote in recent] == [quote_ids[11], quote_ids[10]]
+
+
+@mock_aws
+def test_publish_site_skips_objects_whose_content_is_unchanged():
+    table = _create_table()
+    s3 = _create_bucket()
+    table.put_item(
+        Item={
+            "PK": "QUOTE",
+            "SK": "01JABCDEF1234567890ABCDEF",
+            "quote": "Bruce said the thing",
+            "createdAt": "2026-05-05T12:00:00+00:00",
+        }
+    )
+
+    first = page_generator.publish_site()
+    assert first["objectsWritten"] == 6
+    assert first["objectsSkipped"] == 0
+
+    second = page_generator.publish_site()
+    assert second["objectsWritten"] == 0
+    assert second["objectsSkipped"] == 6
+
+    table.put_item(
+        Item={
+            "PK": "QUOTE",
+            "SK": "01JZZZZZZ1234567890ABCDEF",
+            "quote": "Bruce said another thing",
+            "createdAt": "2026-05-06T12:00:00+00:00",
+        }
+    )
+    third = page_generator.publish_site()
+    # Homepage, sitemaps and the new quote page change; the old quote page does not.
+    assert third["objectsWritten"] == 6
+    assert third["objectsSkipped"] == 1
+
+    manifest = _read_json(s3, page_generator.MANIFEST_KEY)
+    assert set(manifest["digests"]) == {
+        "index.html",
+        "sitemap.xml",
+        "sitemap-index.xml",
+        "sitemaps/pages.xml",
+        "sitemaps/quotes-1.xml",
+    }
+    assert manifest["groups"] == ["quotes-01JA", "quotes-01JZ"]
+    assert set(_read_json(s3, page_generator.manifest_group_key("quotes-01JZ"))["digests"]) == {
+        "quotes/01JZZZZZZ1234567890ABCDEF/index.html",
+    }
+
+
+def _read_json(s3, key):
+    return json.loads(s3.get_object(Bucket=os.environ["BUCKET_NAME"], Key=key)["Body"].read())
+
+
+@mock_aws
+def test_incremental_publish_reads_and_writes_only_the_manifest_groups_it_touches(monkeypatch):
+    table = _create_table()
+    s3 = _create_bucket()
+    for quote_id in ("01HAAAAAAA0000000000000000", "01HBBBBBBB0000000000000000", "01JAAAAAAA0000000000000000"):
+        _put_quote(table, quote_id, f"Quote {quote_id}")
+    page_generator.publish_site()
+    assert _read_json(s3, page_generator.MANIFEST_KEY)["groups"] == ["quotes-01HA", "quotes-01HB", "quotes-01JA"]
+
+    manifest_reads, manifest_writes = [], []
+    real_read, real_write = page_generator.read_object, page_generator.write_object
+
+    def is_manifest(key):
+        return key == page_generator.MANIFEST_KEY or key.startswith(page_generator.MANIFEST_GROUP_PREFIX)
+
+    def recording_read(key):
+        if is_manifest(key):
+            manifest_reads.append(key)
+        return real_read(key)
+
+    def recording_write(key, *args, **kwargs):
+        if is_manifest(key):
+            manifest_writes.append(key)
+        return real_write(key, *args, **kwargs)
+
+    monkeypatch.setattr(page_generator, "read_object", recording_read)
+    monkeypatch.setattr(page_generator, "write_object", recording_write)
+    _put_quote(table, "01JAAAAAAB0000000000000000", "The newest quote")
+    page_generator.publish_site([{"SK": "01JAAAAAAB0000000000000000"}])
+
+    touched = [page_generator.MANIFEST_KEY, page_generator.manifest_group_key("quotes-01JA")]
+    assert sorted(manifest_reads) == sorted(manifest_writes) == sorted(touched)
+    assert set(_read_json(s3, touched[1])["digests"]) == {
+        "quotes/01JAAAAAAA0000000000000000/index.html",
+        "quotes/01JAAAAAAB0000000000000000/index.html",
+    }
+
+    # A full run drops groups whose quotes are gone.
+    table.delete_item(Key={"PK": "QUOTE", "SK": "01HBBBBBBB0000000000000000"})
+    monkeypatch.setattr(page_generator, "read_object", real_read)
+    monkeypatch.setattr(page_generator, "write_object", real_write)
+    page_generator.publish_site()
+    assert _read_json(s3, page_generator.MANIFEST_KEY)["groups"] == ["quotes-01HA", "quotes-01JA"]
+    assert page_generator.load_manifest().get("quotes/01HBBBBBBB0000000000000000/index.html") is None
+
+
+@mock_aws
+def test_local_publish_rewrites_skipped_files_that_were_deleted(tmp_path):
+    table = _create_table()
+    table.put_item(
+        Item={
+            "PK": "QUOTE",
+            "SK": "01JLOCAL1234567890ABCDEF0",
+            "quote": "Local Bruce quote",
+            "createdAt": "2026-05-05T12:00:00+00:00",
+        }
+    )
+    os.environ["LOCAL_SITE_DIR"] = str(tmp_path)
+
+    page_generator.publish_site()
+    (tmp_path / "quotes" / "01JLOCAL1234567890ABCDEF0" / "index.html").unlink()
+    (tmp_path / "quotes" / "01JGONE00000000000000000").mkdir()
+
+    result = page_generator.publish_site()
+
+    assert result["objectsWritten"] == 1
+    assert result["objectsSkipped"] == 5
+    assert (tmp_path / "quotes" / "01JLOCAL1234567890ABCDEF0" / "index.html").exists()
+    assert not (tmp_path / "quotes" / "01JGONE00000000000000000").exists()
+    assert (tmp_path / page_generator.MANIFEST_KEY).exists()
+    assert page_generator.MANIFEST_KEY.startswith(page_generator.PUBLISH_STATE_PREFIX)
+    assert page_generator.SNAPSHOT_KEY.startswith(page_generator.PUBLISH_STATE_PREFIX)
+
+
+@mock_aws
+def test_concurrent_publish_reports_failed_keys_without_aborting(monkeypatch):
+    table = _create_table()
+    s3 = _create_bucket()
+    quote_ids = [f"01JBATCH{index:017d}" for index in range(20)]
+    for quote_id in quote_ids:
+        table.put_item(
+            Item={
+                "PK": "QUOTE",
+                "SK": quote_id,
+                "quote": f"Bruce quote {quote_id}",
+                "createdAt": "2026-05-05T12:00:00+00:00",
+            }
+        )
+    os.environ["PUBLISH_CONCURRENCY"] = "4"
+    broken_key = f"quotes/{quote_ids[3]}/index.html"
+    real_write_object = page_generator.write_object
+
+    def flaky_write_object(key, *args, **kwargs):
+        if key == broken_key:
+            raise RuntimeError("S3 said no")
+        return real_write_object(key, *args, **kwargs)
+
+    monkeypatch.setattr(page_generator, "write_object", flaky_write_object)
+    try:
+        response = page_generator.handler({"source": "terraform-apply"}, None)
+    finally:
+        os.environ.pop("PUBLISH_CONCURRENCY", None)
+
+    assert response["statusCode"] == 500
+    body = json.loads(response["body"])
+    assert body["failedKeys"] == [broken_key]
+    assert body["objectsWritten"] == 24
+
+    keys = {obj["Key"] for obj in s3.list_objects_v2(Bucket=os.environ["BUCKET_NAME"])["Contents"]}
+    assert broken_key not in keys
+    assert f"quotes/{quote_ids[4]}/index.html" in keys
+    manifest = page_generator.load_manifest()
+    assert manifest.get(broken_key) is None
+    assert manifest.get(f"quotes/{quote_ids[4]}/index.html") is not None
+
+
+@mock_aws
+def test_homepage_is_sharded_into_stable_archive_pages(tmp_path, monkeypatch):
+    table = _create_table()
+    monkeypatch.setattr(page_generator, "QUOTES_PER_PAGE", 2)
+    os.environ["LOCAL_SITE_DIR"] = str(tmp_path)
+    os.environ["SITE_BASE_URL"] = "http://localhost:8080"
+
+    def add_quote(index):
+        table.put_item(
+            Item={
+                "PK": "QUOTE",
+                "SK": f"01JPAGE{index:018d}",
+                "quote": f"Paged Bruce quote number {index}",
+                "createdAt": "2026-05-05T12:00:00+00:00",
+            }
+        )
+
+    for index in range(5):
+        add_quote(index)
+
+    # The newest full page stays on the homepage until a second one fills up.
+    result = page_generator.publish_site()
+    assert result["archivePageCount"] == 1
+    homepage = (tmp_path / "index.html").read_text(encoding="utf-8")
+    assert all(f"number {index}" in homepage for index in (4, 3, 2))
+    assert '<link rel="next" href="http://localhost:8080/page/1/">' in homepage
+
+    add_quote(5)
+    result = page_generator.publish_site()
+    assert result["archivePageCount"] == 2
+
+    homepage = (tmp_path / "index.html").read_text(encoding="utf-8")
+    assert "number 5" in homepage and "number 4" in homepage
+    assert "number 3" not in homepage
+    assert '<link rel="next" href="http://localhost:8080/page/2/">' in homepage
+    assert '"numberOfItems":6' in homepage
+    assert '"position":6' in homepage
+
+    page_one = (tmp_path / "page" / "1" / "index.html").read_text(encoding="utf-8")
+    page_two = (tmp_path / "page" / "2" / "index.html").read_text(encoding="utf-8")
+    assert "number 1" in page_one and "number 0" in page_one
+    assert "number 3" in page_two and "number 2" in page_two
+    assert '<link rel="prev" href="http://localhost:8080/page/2/">' in page_one
+    assert 'rel="next"' not in page_one
+    assert '<link rel="prev" href="http://localhost:8080/">' in page_two
+    assert '<link rel="next" href="http://localhost:8080/page/1/">' in page_two
+    assert '"position":4' in page_two and '"position":3' in page_two
+
+    add_quote(6)
+    result = page_generator.publish_site([{"SK": f"01JPAGE{6:018d}"}])
+
+    # Page 2 was already full and the link targets did not move.
+    assert result["archivePageCount"] == 2
+    assert (tmp_path / "page" / "1" / "index.html").read_text(encoding="utf-8") == page_one
+    assert (tmp_path / "page" / "2" / "index.html").read_text(encoding="utf-8") == page_two
+    # Homepage, the new quote page and its sitemap shard. Page 2, the pages
+    # sitemap and the sitemap index (same dates) are unchanged; page 1 is not
+    # even rendered.
+    assert result["objectsWritten"] == 3
+    assert result["objectsSkipped"] == 4
+
+
+def test_homepage_and_the_archive_page_it_links_share_no_quotes():
+    for total in (49, 50, 99, 100, 101, 149, 150, 151, 275):
+        quotes = [
+            page_generator.Quote.create(f"01JPAGE{index:018d}", f"Quote {index}", "2026-05-05T12:00:00+00:00")
+            for index in range(total - 1, -1, -1)
+        ]
+        site = page_generator.SiteTemplate("https://example.test", "")
+        homepage = site.render_homepage(quotes)
+        on_homepage = set(re.findall(r"/quotes/(01JPAGE\d+)/", homepage))
+        page_count = page_generator.archive_page_count(total)
+        assert 0 < len(on_homepage) < 2 * page_generator.QUOTES_PER_PAGE
+        if page_count == 0:
+            assert on_homepage == {quote.id for quote in quotes}
+            assert 'rel="next"' not in homepage
+            continue
+
+        assert f'<link rel="next" href="https://example.test/page/{page_count}/">' in homepage
+        linked = site.render_archive_page(
+            page_count, page_generator.archive_page_quotes(quotes, page_count), page_count
+        )
+        assert on_homepage.isdisjoint(re.findall(r"/quotes/(01JPAGE\d+)/", linked))
+        archived = [
+            quote.id
+            for page_number in range(1, page_count + 1)
+            for quote in page_generator.archive_page_quotes(quotes, page_number)
+        ]
+        assert len(on_homepage) + len(archived) == total
+        assert on_homepage.union(archived) == {quote.id for quote in quotes}
+
+
+@mock_aws
+def test_sitemap_is_split_into_shards_and_only_the_newest_is_rewritten(tmp_path, monkeypatch):
+    table = _create_table()
+    s3 = _create_bucket()
+    monkeypatch.setattr(page_generator, "SITEMAP_SHARD_SIZE", 2)
+
+    def add_quote(index):
+        table.put_item(
+            Item={
+                "PK": "QUOTE",
+                "SK": f"01JSHARD{index:017d}",
+                "quote": f"Sharded Bruce quote number {index}",
+                "createdAt": f"2026-05-0{index + 1}T12:00:00+00:00",
+            }
+        )
+
+    for index in range(3):
+        add_quote(index)
+    result = page_generator.publish_site()
+    assert result["sitemapShardCount"] == 2
+
+    bucket = os.environ["BUCKET_NAME"]
+    full_shard = s3.get_object(Bucket=bucket, Key="sitemaps/quotes-1.xml")
+    full_body = full_shard["Body"].read().decode("utf-8")
+    assert full_shard["CacheControl"] == page_generator.SITEMAP_SHARD_CACHE_CONTROL
+    assert "number 0" not in full_body  # URLs only, no quote text
+    assert "/quotes/01JSHARD00000000000000000/" in full_body
+    assert "/quotes/01JSHARD00000000000000001/" in full_body
+
+    newest_shard = s3.get_object(Bucket=bucket, Key="sitemaps/quotes-2.xml")
+    assert newest_shard["CacheControl"] == page_generator.SITEMAP_CACHE_CONTROL
+    assert "/quotes/01JSHARD00000000000000002/" in newest_shard["Body"].read().decode("utf-8")
+
+    index_body = s3.get_object(Bucket=bucket, Key="sitemap-index.xml")["Body"].read().decode("utf-8")
+    assert "sitemaps/quotes-1.xml</loc>\n        <lastmod>2026-05-02</lastmod>" in index_body
+    assert "sitemaps/quotes-2.xml</loc>\n        <lastmod>2026-05-03</lastmod>" in index_body
+
+    add_quote(3)
+    result = page_generator.publish_site([{"SK": f"01JSHARD{3:017d}"}])
+
+    manifest = json.loads(s3.get_object(Bucket=bucket, Key=page_generator.MANIFEST_KEY)["Body"].read())
+    assert result["sitemapShardCount"] == 2
+    assert s3.get_object(Bucket=bucket, Key="sitemaps/quotes-1.xml")["Body"].read().decode("utf-8") == full_body
+    assert "sitemaps/quotes-1.xml" in manifest["digests"]
+    newest_shard = s3.get_object(Bucket=bucket, Key="sitemaps/quotes-2.xml")
+    assert newest_shard["CacheControl"] == page_generator.SITEMAP_SHARD_CACHE_CONTROL
+    assert "/quotes/01JSHARD00000000000000003/" in newest_shard["Body"].read().decode("utf-8")
+
+
+@mock_aws
+def test_precompressed_variants_are_uploaded_with_content_encoding():
+    table = _create_table()
+    s3 = _create_bucket()
+    table.put_item(
+        Item={
+            "PK": "QUOTE",
+            "SK": "01JABCDEF1234567890ABCDEF",
+            "quote": "Bruce said the thing",
+            "createdAt": "2026-05-05T12:00:00+00:00",
+        }
+    )
+    os.environ["PRECOMPRESS"] = "gzip"
+
+    result = page_generator.publish_site()
+
+    bucket = os.environ["BUCKET_NAME"]
+    identity = s3.get_object(Bucket=bucket, Key="index.html")
+    encoded = s3.get_object(Bucket=bucket, Key="index.html.gz")
+    assert "ContentEncoding" not in identity
+    assert encoded["ContentEncoding"] == "gzip"
+    assert encoded["ContentType"] == page_generator.HTML_CONTENT_TYPE
+    assert encoded["CacheControl"] == page_generator.HTML_CACHE_CONTROL
+    assert gzip.decompress(encoded["Body"].read()) == identity["Body"].read()
+    assert s3.get_object(Bucket=bucket, Key="sitemap-index.xml.gz")["ContentEncoding"] == "gzip"
+
+    sizes = result["bytesWritten"]
+    assert set(sizes) == {"identity", "gzip"}
+    assert 0 < sizes["gzip"] < sizes["identity"]
+
+    # Turning compression on or off changes the digests, so pages are rewritten.
+    os.environ.pop("PRECOMPRESS")
+    assert page_generator.publish_site()["objectsSkipped"] == 0
+
+
+@mock_aws
+def test_local_precompression_writes_gz_and_br_siblings(tmp_path):
+    pytest.importorskip("brotli")
+    import brotli
+
+    _create_table()
+    os.environ["LOCAL_SITE_DIR"] = str(tmp_path)
+    os.environ["PRECOMPRESS"] = "gzip,br"
+
+    result = page_generator.publish_site()
+
+    homepage = (tmp_path / "index.html").read_bytes()
+    assert gzip.decompress((tmp_path / "index.html.gz").read_bytes()) == homepage
+    assert brotli.decompress((tmp_path / "index.html.br").read_bytes()) == homepage
+    assert set(result["bytesWritten"]) == {"identity", "gzip", "br"}
+
+
+@mock_aws
+def test_large_pages_are_streamed_through_spooled_uploads(monkeypatch):
+    table = _create_table()
+    s3 = _create_bucket()
+    monkeypatch.setattr(page_generator, "STREAM_BLOCK_BYTES", 64)
+    monkeypatch.setattr(page_generator, "SPOOL_MAX_BYTES", 256)
+    for index in range(5):
+        table.put_item(
+            Item={
+                "PK": "QUOTE",
+                "SK": f"01JABCDEF123456789000000{index}",
+                "quote": f"Bruce said thing number {index}",
+                "createdAt": f"2026-05-0{index + 1}T12:00:00+00:00",
+            }
+        )
+    os.environ["PRECOMPRESS"] = "gzip"
+
+    page_generator.publish_site()
+
+    quotes = page_generator.fetch_all_quotes()
+    bucket = os.environ["BUCKET_NAME"]
+    homepage = s3.get_object(Bucket=bucket, Key="index.html")
+    assert homepage["ContentType"] == page_generator.HTML_CONTENT_TYPE
+    assert homepage["Body"].read().decode("utf-8") == page_generator.render_homepage(quotes)
+    shard = s3.get_object(Bucket=bucket, Key="sitemaps/quotes-1.xml")["Body"].read()
+    assert shard.decode("utf-8") == page_generator.render_sitemap_shard(quotes)
+    encoded = s3.get_object(Bucket=bucket, Key="sitemaps/quotes-1.xml.gz")
+    assert encoded["ContentEncoding"] == "gzip"
+    assert gzip.decompress(encoded["Body"].read()) == shard
+
+    # Streamed bodies hash the same way, so an unchanged rerun skips them.
+    assert page_generator.publish_site()["objectsWritten"] == 0
+
+
+@mock_aws
+def test_local_publish_streams_large_pages_to_disk(tmp_path, monkeypatch):
+    table = _create_table()
+    os.environ["LOCAL_SITE_DIR"] = str(tmp_path)
+    monkeypatch.setattr(page_generator, "STREAM_BLOCK_BYTES", 64)
+    monkeypatch.setattr(page_generator, "SPOOL_MAX_BYTES", 256)
+    table.put_item(
+        Item={
+            "PK": "QUOTE",
+            "SK": "01JABCDEF1234567890ABCDEF",
+            "quote": "Bruce said the thing",
+            "createdAt": "2026-05-05T12:00:00+00:00",
+        }
+    )
+
+    page_generator.publish_site()
+
+    quotes = page_generator.fetch_all_quotes()
+    assert (tmp_path / "index.html").read_text(encoding="utf-8") == page_generator.render_homepage(quotes)
+    assert (tmp_path / "sitemaps" / "pages.xml").read_text(encoding="utf-8") == (
+        page_generator.render_pages_sitemap(quotes, 0)
+    )
+
+
+def _coordination_state(table):
+    return table.get_item(Key=page_generator.COORDINATION_KEY, ConsistentRead=True)["Item"]
+
+
+@mock_aws
+def test_coordinated_publish_records_trigger_and_generation():
+    table = _create_table()
+    s3 = _create_bucket()
+    table.put_item(
+        Item={
+            "PK": "QUOTE",
+            "SK": "01JABCDEF1234567890ABCDEF",
+            "quote": "Bruce said the thing",
+            "createdAt": "2026-05-05T12:00:00+00:00",
+        }
+    )
+    os.environ["PUBLISH_COORDINATION"] = "true"
+
+    response = page_generator.handler({"source": "quotes-api", "quoteId": "01JABCDEF1234567890ABCDEF"}, None)
+
+    assert response["statusCode"] == 200
+    body = json.loads(response["body"])
+    assert body["mode"] == "incremental"
+    assert body["generation"] == 1
+    state = _coordination_state(table)
+    assert state["built"] == state["requested"] == 1
+    assert state["triggersReceived"] == 1
+    assert "owner" not in state
+    assert "pendingIds" not in state
+    s3.head_object(Bucket=os.environ["BUCKET_NAME"], Key="quotes/01JABCDEF1234567890ABCDEF/index.html")
+
+
+def _lambda_context(remaining_ms, request_id):
+    return type(
+        "Context",
+        (),
+        {"aws_request_id": request_id, "get_remaining_time_in_millis": lambda self: remaining_ms},
+    )()
+
+
+@mock_aws
+def test_coordinated_publish_coalesces_once_the_holder_has_built_the_trigger(monkeypatch):
+    table = _create_table()
+    s3 = _create_bucket()
+    os.environ["PUBLISH_COORDINATION"] = "true"
+    assert page_generator.acquire_lease("other-run", time.time() + 60)
+    polls = []
+
+    def other_run_finishes(seconds):
+        polls.append(seconds)
+        # The holder publishes this trigger while we wait, without letting go yet.
+        table.update_item(
+            Key=page_generator.COORDINATION_KEY,
+            UpdateExpression="SET built = requested",
+        )
+
+    monkeypatch.setattr(page_generator.time, "sleep", other_run_finishes)
+
+    response = page_generator.handler({"source": "quotes-api", "quoteId": "01JABCDEF1234567890ABCDEF"}, None)
+
+    assert json.loads(response["body"])["mode"] == "coalesced"
+    assert len(polls) == 1
+    state = _coordination_state(table)
+    assert state["owner"] == "other-run"
+    assert state["triggersCoalesced"] == 1
+    assert "Contents" not in s3.list_objects_v2(Bucket=os.environ["BUCKET_NAME"])
+
+
+@mock_aws
+def test_coordinated_publish_fails_instead_of_coalescing_into_a_run_that_may_not_finish():
+    table = _create_table()
+    _create_bucket()
+    os.environ["PUBLISH_COORDINATION"] = "true"
+    assert page_generator.acquire_lease("other-run", time.time() + 600)
+
+    with pytest.raises(RuntimeError, match="still unpublished"):
+        page_generator.handler(
+            {"source": "quotes-api", "quoteId": "01JABCDEF1234567890ABCDEF"},
+            _lambda_context(5_000, "req-short"),
+        )
+
+    state = _coordination_state(table)
+    assert state["owner"] == "other-run"
+    assert "triggersCoalesced" not in state
+    assert state["pendingIds"] == {"01JABCDEF1234567890ABCDEF"}
+
+
+class _Killed(BaseException):
+    """Stands in for the Lambda runtime killing the process: no except/finally cleanup."""
+
+
+@mock_aws
+def test_coordinated_publish_takes_over_from_a_holder_that_died_mid_publish(monkeypatch):
+    table = _create_table()
+    s3 = _create_bucket()
+    os.environ["PUBLISH_COORDINATION"] = "true"
+    monkeypatch.setattr(page_generator, "COALESCED_POLL_SECONDS", 0.1)
+    _put_quote(table, "01JABCDEF10000000000000001", "Published by nobody")
+    _put_quote(table, "01JABCDEF10000000000000002", "Published by the retry")
+    real_publish = page_generator.publish_site
+
+    def killed_mid_publish(changed_quotes, **kwargs):
+        raise _Killed()
+
+    monkeypatch.setattr(page_generator, "publish_site", killed_mid_publish)
+    with pytest.raises(_Killed):
+        page_generator.handler(
+            {"source": "quotes-api", "quoteId": "01JABCDEF10000000000000001"},
+            _lambda_context(500, "req-dead"),
+        )
+    assert _coordination_state(table)["owner"] == "req-dead"
+
+    monkeypatch.setattr(page_generator, "publish_site", real_publish)
+    response = page_generator.handler(
+        {"source": "quotes-api", "quoteId": "01JABCDEF10000000000000002"},
+        _lambda_context(60_000, "req-retry"),
+    )
+
+    body = json.loads(response["body"])
+    assert body["mode"] == "incremental"
+    assert body["generation"] == 2
+    state = _coordination_state(table)
+    assert state["built"] == state["requested"] == 2
+    assert "owner" not in state
+    assert "pendingIds" not in state
+    for quote_id in ("01JABCDEF10000000000000001", "01JABCDEF10000000000000002"):
+        s3.head_object(Bucket=os.environ["BUCKET_NAME"], Key=f"quotes/{quote_id}/index.html")
+
+
+@mock_aws
+def test_coordinated_publish_gives_up_when_fenced(monkeypatch):
+    table = _create_table()
+    s3 = _create_bucket()
+    table.put_item(
+        Item={
+            "PK": "QUOTE",
+            "SK": "01JABCDEF1234567890ABCDEF",
+            "quote": "Bruce said the thing",
+            "createdAt": "2026-05-05T12:00:00+00:00",
+        }
+    )
+    os.environ["PUBLISH_COORDINATION"] = "true"
+    real_fetch = page_generator.fetch_all_quotes
+
+    def fetch_then_lose_lease(*args, **kwargs):
+        quotes = real_fetch(*args, **kwargs)
+        # A newer run publishes while this one is still rendering.
+        table.update_item(
+            Key=page_generator.COORDINATION_KEY,
+            UpdateExpression="SET #owner = :owner, built = :built",
+            ExpressionAttributeNames={"#owner": "owner"},
+            ExpressionAttributeValues={":owner": "newer-run", ":built": 2},
+        )
+        return quotes
+
+    monkeypatch.setattr(page_generator, "fetch_all_quotes", fetch_then_lose_lease)
+
+    response = page_generator.handler({"source": "terraform-apply"}, None)
+
+    body = json.loads(response["body"])
+    assert body["fenced"] is True
+    assert _coordination_state(table)["runsFenced"] == 1
+    keys = {obj["Key"] for obj in s3.list_objects_v2(Bucket=os.environ["BUCKET_NAME"])["Contents"]}
+    assert "quotes/01JABCDEF1234567890ABCDEF/index.html" in keys
+    assert "index.html" not in keys
+    assert "sitemap-index.xml" not in keys
+    # Archive pages and sitemap shards depend on the whole snapshot, and the
+    # manifest belongs to the run that won.
+    assert not any(key.startswith(("page/", "sitemaps/")) for key in keys)
+    assert page_generator.MANIFEST_KEY not in keys
+
+
+@mock_aws
+def test_coordinated_publish_runs_again_for_triggers_that_arrive_mid_run(monkeypatch):
+    table = _create_table()
+    _create_bucket()
+    os.environ["PUBLISH_COORDINATION"] = "true"
+    real_publish = page_generator.publish_site
+    passes = []
+
+    def publish_and_receive_trigger(changed_quotes, **kwargs):
+        passes.append(changed_quotes)
+        if len(passes) == 1:
+            table.put_item(
+                Item={
+                    "PK": "QUOTE",
+                    "SK": "01JLATE0000000000000000000",
+                    "quote": "A late Bruce quote",
+                    "createdAt": "2026-05-05T12:00:00+00:00",
+                }
+            )
+            page_generator.register_trigger([{"SK": "01JLATE0000000000000000000"}])
+        return real_publish(changed_quotes, **kwargs)
+
+    monkeypatch.setattr(page_generator, "publish_site", publish_and_receive_trigger)
+
+    response = page_generator.handler({"source": "terraform-apply"}, None)
+
+    assert json.loads(response["body"])["generation"] == 2
+    assert passes[0] is None
+    assert passes[1] == [{"SK": "01JLATE0000000000000000000"}]
+    state = _coordination_state(table)
+    assert state["built"] == 2
+    assert state["fullRequestedAt"] == 1
+    assert "owner" not in state
+
+
+@mock_aws
+def test_coordinated_publish_fails_when_triggers_outlast_the_pass_limit(monkeypatch):
+    table = _create_table()
+    _create_bucket()
+    os.environ["PUBLISH_COORDINATION"] = "true"
+    monkeypatch.setattr(page_generator, "MAX_PUBLISH_PASSES", 1)
+    real_publish = page_generator.publish_site
+
+    def publish_and_receive_trigger(changed_quotes, **kwargs):
+        page_generator.register_trigger([{"SK": "01JLATE0000000000000000000"}])
+        return real_publish(changed_quotes, **kwargs)
+
+    monkeypatch.setattr(page_generator, "publish_site", publish_and_receive_trigger)
+
+    with pytest.raises(RuntimeError, match="still pending"):
+        page_generator.handler({"source": "terraform-apply"}, None)
+
+    state = _coordination_state(table)
+    assert "owner" not in state
+    assert state["built"] < state["requested"]
+    assert state["pendingIds"] == {"01JLATE0000000000000000000"}
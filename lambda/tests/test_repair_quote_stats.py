@@ -0,0 +1,71 @@
+import json
+import os
+import sys
+from pathlib import Path
+
+import boto3
+from moto import mock_aws
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "tools"))
+import app  # noqa: E402
+import repair_quote_stats  # noqa: E402
+
+
+def _mk_table():
+    ddb = boto3.resource("dynamodb", region_name="us-east-2")
+    ddb.create_table(
+        TableName="bruce-quotes",
+        BillingMode="PAY_PER_REQUEST",
+        KeySchema=[
+            {"AttributeName": "PK", "KeyType": "HASH"},
+            {"AttributeName": "SK", "KeyType": "RANGE"},
+        ],
+        AttributeDefinitions=[
+            {"AttributeName": "PK", "AttributeType": "S"},
+            {"AttributeName": "SK", "AttributeType": "S"},
+        ],
+    )
+    return ddb.Table("bruce-quotes")
+
+
+@mock_aws
+def test_repair_matches_the_incrementally_maintained_item_and_fixes_drift():
+    os.environ["AWS_REGION"] = "us-east-2"
+    os.environ["TABLE_NAME"] = "bruce-quotes"
+    os.environ.pop("PAGE_GENERATOR_FUNCTION_NAME", None)
+    os.environ.pop("QUOTE_SHARDS", None)
+    app._table = None
+    table = _mk_table()
+    for index in range(3):
+        app.handler(
+            {
+                "requestContext": {"http": {"method": "POST", "path": "/quotes"}},
+                "body": json.dumps({"quote": f"Bruce said thing {index}"}),
+            },
+            None,
+        )
+    table.put_item(Item={"PK": "QUOTE", "SK": "01HAAAAAAAAAAAAAAAAAAAAAAA", "quote": "Legacy", "createdAt": "2024-01-02"})
+
+    result = repair_quote_stats.repair_quote_stats(table)
+    assert result["quoteCount"] == 4
+    assert result["months"]["2024-01"] == 1
+    assert result["changed"] is True
+    maintained = app._read_quote_stats()
+    assert maintained["quoteCount"] == 4
+    assert [quote["quote"] for quote in maintained["recent"]] == [
+        "Bruce said thing 2",
+        "Bruce said thing 1",
+        "Bruce said thing 0",
+        "Legacy",
+    ]
+
+    assert repair_quote_stats.repair_quote_stats(table)["changed"] is False
+    app.handler(
+        {
+            "requestContext": {"http": {"method": "POST", "path": "/quotes"}},
+            "body": json.dumps({"quote": "Bruce said one more"}),
+        },
+        None,
+    )
+    assert repair_quote_stats.repair_quote_stats(table, dry_run=True)["changed"] is False
+    app._table = None
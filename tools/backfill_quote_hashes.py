@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""Write the duplicate-detection markers for quotes stored before they existed.
+
+The API rejects a quote whose normalized text matches a "QUOTEHASH#..." marker.
+Quotes written before the markers were introduced have none, so run this once
+after deploying. Quotes are processed oldest first, so the earliest copy of a
+duplicated text keeps the marker. Later copies are reported but left in place.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+from pathlib import Path
+from typing import Any
+
+import boto3
+from botocore.exceptions import ClientError
+
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(REPO_ROOT / "lambda"))
+
+import app  # noqa: E402
+import page_generator  # noqa: E402
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Backfill duplicate-detection markers for existing quotes.")
+    parser.add_argument(
+        "--shards",
+        type=int,
+        default=1,
+        help="QUOTE_SHARDS value the quotes were written with (default: 1)",
+    )
+    parser.add_argument(
+        "--table-name",
+        default="bruce-quotes",
+        help="DynamoDB table name (default: bruce-quotes)",
+    )
+    parser.add_argument("--region", default="us-east-2", help="AWS region (default: us-east-2)")
+    parser.add_argument("--ddb-endpoint", default=None, help="Optional DynamoDB endpoint, e.g. DynamoDB Local")
+    parser.add_argument("--dry-run", action="store_true", help="Count missing markers without writing")
+    return parser.parse_args()
+
+
+def read_quotes(table: Any, shards: int) -> list[tuple[str, str]]:
+    quotes: dict[str, str] = {}
+    for partition_key in page_generator.quote_partition_keys(shards):
+        query_args: dict[str, Any] = {
+            "KeyConditionExpression": "PK = :pk",
+            "ExpressionAttributeValues": {":pk": partition_key},
+            "ProjectionExpression": "SK, #text",
+            "ExpressionAttributeNames": {"#text": "quote"},
+        }
+        while True:
+            response = table.query(**query_args)
+            for item in response.get("Items", []):
+                quotes[item["SK"]] = item["quote"]
+            if "LastEvaluatedKey" not in response:
+                break
+            query_args["ExclusiveStartKey"] = response["LastEvaluatedKey"]
+    return sorted(quotes.items())
+
+
+def backfill_quote_hashes(table: Any, shards: int = 1, dry_run: bool = False) -> dict[str, Any]:
+    written = 0
+    duplicates = []
+    claimed: set[str] = set()  # hashes marked (or, in a dry run, to be marked) by this run
+    quotes = read_quotes(table, shards)
+    for quote_id, text in quotes:
+        quote_hash = app._quote_hash(text)
+        key = app._quote_hash_key(quote_hash)
+        marker = None if quote_hash in claimed else table.get_item(Key=key).get("Item")
+        if quote_hash in claimed or (marker is not None and marker.get("quoteId") != quote_id):
+            duplicates.append(quote_id)
+            continue
+        claimed.add(quote_hash)
+        if marker is not None:
+            continue
+        if not dry_run:
+            try:
+                table.put_item(Item={**key, "quoteId": quote_id}, ConditionExpression="attribute_not_exists(PK)")
+            except ClientError as exc:
+                # The API (or a concurrent run) claimed the text in the meantime.
+                if exc.response["Error"]["Code"] != "ConditionalCheckFailedException":
+                    raise
+                duplicates.append(quote_id)
+                continue
+        written += 1
+    return {"scanned": len(quotes), "written": written, "duplicates": duplicates}
+
+
+def main() -> int:
+    args = parse_args()
+    dynamodb = boto3.resource("dynamodb", region_name=args.region, endpoint_url=args.ddb_endpoint)
+    result = backfill_quote_hashes(dynamodb.Table(args.table_name), shards=args.shards, dry_run=args.dry_run)
+    print(json.dumps({**result, "dryRun": args.dry_run}, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
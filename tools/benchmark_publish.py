@@ -0,0 +1,293 @@
+#!/usr/bin/env python3
+"""Benchmark the publish pipeline on synthetic corpora and flag regressions.
+
+Each corpus is a deterministic set of quotes, loaded into a moto DynamoDB
+table. The read case queries it through fetch_all_quotes(). The render cases
+work on the decoded quotes in memory. The publish cases write the site to a
+temporary local directory, as LOCAL_SITE_DIR does. Every case is timed on its
+own run. A second run under tracemalloc records its peak Python allocation,
+because tracing slows the code it measures.
+
+Results are written as JSON. Pass a previous results file as --baseline to
+compare against it; the exit status is 1 when a case got slower or used more
+memory than the threshold allows. Timings depend on the machine, so no
+reference results are committed: record a baseline on the machine you
+benchmark on (e.g. from main) and compare later runs there against it.
+"""
+
+from __future__ import annotations
+
+import argparse
+import gc
+import json
+import os
+import platform
+import random
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+from collections.abc import Callable
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any
+
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(REPO_ROOT / "lambda"))
+
+import app  # noqa: E402
+import page_generator  # noqa: E402
+
+DEFAULT_SIZES = [1_000, 10_000, 100_000]
+DEFAULT_THRESHOLD = 0.25
+# Wall-time changes smaller than this are noise, whatever the percentage.
+MIN_WALL_MS_DELTA = 5.0
+CORPUS_START = datetime(2023, 1, 1, tzinfo=timezone.utc)
+WORDS = (
+    "Bruce", "said", "the", "deploy", "is", "fine", "ship", "it", "on", "Friday", "who", "needs", "tests",
+    "cloud", "budget", "meeting", "again", "coffee", "YAML", "never", "always", "works", "my", "machine",
+)
+EXTRAS = (" & <b>markup</b>", ' "quoted"', " café", " 🚀", " it's")
+# LOCAL_SITE_DIR is set per publish run.
+ENVIRONMENT = {
+    "AWS_REGION": "us-east-2",
+    "DOMAIN": "shitbrucesays.co.uk",
+    "API_BASE_URL": "https://api.shitbrucesays.co.uk",
+    "BUCKET_NAME": "bruce-quotes-benchmark",
+}
+UNSET_ENVIRONMENT = ("SITE_BASE_URL", "QUOTE_SHARDS", "PRECOMPRESS", "EMIT_METRICS", "LOCAL_SITE_DIR")
+
+Case = tuple[Callable[[], Any], Callable[[Any], int]]  # (untimed setup, timed run returning output bytes)
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark the publish pipeline at several corpus sizes.")
+    parser.add_argument(
+        "--sizes",
+        type=int,
+        nargs="+",
+        default=DEFAULT_SIZES,
+        help="Corpus sizes in quotes (default: 1000 10000 100000)",
+    )
+    parser.add_argument("--cases", nargs="+", default=None, help="Only run these cases (default: all)")
+    parser.add_argument("--output", default=None, help="Write the results JSON here")
+    parser.add_argument("--baseline", default=None, help="Results JSON from an earlier run to compare against")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=DEFAULT_THRESHOLD,
+        help="Allowed growth in wall time or peak memory before a case is flagged (default: 0.25)",
+    )
+    parser.add_argument("--no-memory", action="store_true", help="Skip the tracemalloc runs")
+    parser.add_argument("--seed", type=int, default=1, help="Corpus random seed (default: 1)")
+    return parser.parse_args()
+
+
+def synthetic_items(count: int, seed: int = 1) -> list[dict[str, str]]:
+    # Quotes are spread evenly over the years since CORPUS_START so archive
+    # pages and sitemap shards have realistic dates. Lengths cover the API's
+    # 5-300 character range, and some quotes need escaping. Oldest first.
+    rng = random.Random(seed)
+    span_ms = int((datetime(2026, 1, 1, tzinfo=timezone.utc) - CORPUS_START).total_seconds() * 1000)
+    step_ms = max(1, span_ms // max(1, count))
+    items = []
+    for index in range(count):
+        timestamp_ms = int(CORPUS_START.timestamp() * 1000) + index * step_ms
+        text = " ".join(rng.choice(WORDS) for _ in range(rng.randint(2, 40)))
+        if index % 7 == 0:
+            text += rng.choice(EXTRAS)
+        created_at = CORPUS_START + timedelta(milliseconds=index * step_ms)
+        items.append(
+            {
+                "PK": page_generator.QUOTE_PARTITION,
+                "SK": app._encode_ulid(timestamp_ms, rng.getrandbits(80)),
+                "quote": text[: app.Config.MAX_INPUT_LENGTH],
+                "createdAt": created_at.isoformat(),
+            }
+        )
+    return items
+
+
+def load_table(table_name: str, items: list[dict[str, str]]) -> Any:
+    dynamodb = page_generator.get_dynamodb_resource()
+    table = dynamodb.create_table(
+        TableName=table_name,
+        BillingMode="PAY_PER_REQUEST",
+        KeySchema=[
+            {"AttributeName": "PK", "KeyType": "HASH"},
+            {"AttributeName": "SK", "KeyType": "RANGE"},
+        ],
+        AttributeDefinitions=[
+            {"AttributeName": "PK", "AttributeType": "S"},
+            {"AttributeName": "SK", "AttributeType": "S"},
+        ],
+    )
+    with table.batch_writer() as batch:
+        for item in items:
+            batch.put_item(Item=item)
+    return table
+
+
+def render_bytes(rendered: str) -> int:
+    return len(rendered.encode("utf-8"))
+
+
+def build_cases(table: Any, quotes: list[page_generator.Quote], work_dir: Path) -> dict[str, Case]:
+    def fresh_site_dir() -> None:
+        # Only one site is kept on disk; at 100k quotes each is ~100k files.
+        previous = os.environ.get("LOCAL_SITE_DIR")
+        if previous:
+            shutil.rmtree(previous, ignore_errors=True)
+        os.environ["LOCAL_SITE_DIR"] = tempfile.mkdtemp(dir=work_dir)
+
+    def fetch(_: Any) -> int:
+        return sum(len(quote.text.encode("utf-8")) for quote in page_generator.fetch_all_quotes())
+
+    def render_quote_pages(_: Any) -> int:
+        return sum(render_bytes(page_generator.render_quote_page(quote)) for quote in quotes)
+
+    def render_sitemaps(_: Any) -> int:
+        # There is no single sitemap; this covers the index, every shard and the pages sitemap.
+        page_count = page_generator.archive_page_count(len(quotes))
+        size = render_bytes(page_generator.render_sitemap_index(quotes))
+        size += render_bytes(page_generator.render_pages_sitemap(quotes, page_count))
+        for shard_number in range(1, page_generator.sitemap_shard_count(len(quotes)) + 1):
+            shard_quotes = page_generator.sitemap_shard_quotes(quotes, shard_number)
+            size += render_bytes(page_generator.render_sitemap_shard(shard_quotes))
+        return size
+
+    def publish_full(_: Any) -> int:
+        fresh_site_dir()
+        return sum(page_generator.publish_site()["bytesWritten"].values())
+
+    def prepare_incremental() -> dict[str, str]:
+        # A full publish first, untimed, so the run below finds its manifest and snapshot.
+        fresh_site_dir()
+        page_generator.publish_site()
+        item = {
+            "PK": page_generator.QUOTE_PARTITION,
+            "SK": app._ulid(),
+            "quote": "A new Bruce quote",
+            "createdAt": datetime.now(timezone.utc).isoformat(),
+        }
+        table.put_item(Item=item)
+        return item
+
+    def publish_incremental(item: dict[str, str]) -> int:
+        return sum(page_generator.publish_site([item])["bytesWritten"].values())
+
+    def no_setup() -> None:
+        return None
+
+    return {
+        "fetch_all_quotes": (no_setup, fetch),
+        "render_homepage": (no_setup, lambda _: render_bytes(page_generator.render_homepage(quotes))),
+        "render_quote_page": (no_setup, render_quote_pages),
+        "render_sitemaps": (no_setup, render_sitemaps),
+        "publish_site_full": (no_setup, publish_full),
+        "publish_site_incremental": (prepare_incremental, publish_incremental),
+    }
+
+
+def run_case(case: Case, measure_memory: bool) -> dict[str, Any]:
+    setup, run = case
+    state = setup()
+    gc.collect()
+    start = time.perf_counter()
+    output_bytes = run(state)
+    result: dict[str, Any] = {"wallMs": round((time.perf_counter() - start) * 1000, 1), "outputBytes": output_bytes}
+
+    if measure_memory:
+        state = setup()
+        gc.collect()
+        tracemalloc.start()
+        try:
+            run(state)
+            result["peakBytes"] = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+    return result
+
+
+def run_benchmarks(
+    sizes: list[int],
+    case_names: list[str] | None = None,
+    measure_memory: bool = True,
+    seed: int = 1,
+) -> dict[str, Any]:
+    from moto import mock_aws
+
+    saved = {name: os.environ.get(name) for name in (*ENVIRONMENT, *UNSET_ENVIRONMENT, "TABLE_NAME")}
+    os.environ.update(ENVIRONMENT)
+    for name in UNSET_ENVIRONMENT:
+        os.environ.pop(name, None)
+    cases: dict[str, dict[str, Any]] = {}
+    work_dir = Path(tempfile.mkdtemp(prefix="publish-benchmark-"))
+    try:
+        with mock_aws():
+            for size in sizes:
+                page_generator._dynamodb_resource = None
+                page_generator._dynamodb_client = None
+                os.environ["TABLE_NAME"] = f"bruce-quotes-benchmark-{size}"
+                items = synthetic_items(size, seed)
+                table = load_table(os.environ["TABLE_NAME"], items)
+                quotes = [page_generator.Quote.from_item(item) for item in reversed(items)]
+                for name, case in build_cases(table, quotes, work_dir).items():
+                    if case_names and name not in case_names:
+                        continue
+                    cases[f"{name}@{size}"] = {"case": name, "quotes": size, **run_case(case, measure_memory)}
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+        page_generator._dynamodb_resource = None
+        page_generator._dynamodb_client = None
+        for name, value in saved.items():
+            if value is None:
+                os.environ.pop(name, None)
+            else:
+                os.environ[name] = value
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "sizes": sizes,
+        "cases": cases,
+    }
+
+
+def compare_results(results: dict[str, Any], baseline: dict[str, Any], threshold: float) -> list[str]:
+    regressions = []
+    for key, current in results["cases"].items():
+        previous = baseline.get("cases", {}).get(key)
+        if previous is None:
+            continue
+        for metric in ("wallMs", "peakBytes"):
+            before, after = previous.get(metric), current.get(metric)
+            if not before or after is None or after <= before * (1 + threshold):
+                continue
+            if metric == "wallMs" and after - before < MIN_WALL_MS_DELTA:
+                continue
+            regressions.append(f"{key} {metric} {before} -> {after} (+{(after / before - 1) * 100:.0f}%)")
+    return regressions
+
+
+def main() -> int:
+    args = parse_args()
+    results = run_benchmarks(args.sizes, args.cases, measure_memory=not args.no_memory, seed=args.seed)
+    if args.baseline:
+        baseline = json.loads(Path(args.baseline).read_text(encoding="utf-8"))
+        results["baseline"] = args.baseline
+        results["regressions"] = compare_results(results, baseline, args.threshold)
+    if args.output:
+        Path(args.output).write_text(json.dumps(results, indent=2) + "\n", encoding="utf-8")
+
+    for key, case in results["cases"].items():
+        peak = f", peak {case['peakBytes'] / 1e6:.1f} MB" if "peakBytes" in case else ""
+        print(f"{key:34} {case['wallMs']:>10.1f} ms{peak}, output {case['outputBytes'] / 1e6:.2f} MB")
+    for regression in results.get("regressions", []):
+        print(f"REGRESSION {regression}")
+    return 1 if results.get("regressions") else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,250 @@
+#!/usr/bin/env python3
+"""Measure Lambda cold starts locally and fail when they exceed a budget.
+
+Each scenario runs in a fresh interpreter with ``-X importtime``. It records
+how long the handler module takes to import and how long its first request
+takes. AWS calls go to a loopback stub that answers every DynamoDB request
+with an empty response, so the timings cover boto3 import, client
+construction and request signing, but not the network.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any
+
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+LAMBDA_DIR = REPO_ROOT / "lambda"
+
+# Budgets in milliseconds, sized for a laptop with headroom; Lambda's init
+# phase is usually faster, its first request on a small function slower.
+SCENARIOS: list[dict[str, Any]] = [
+    {
+        "name": "api OPTIONS /quotes",
+        "module": "app",
+        "event": {"requestContext": {"http": {"method": "OPTIONS", "path": "/quotes"}}},
+        "import_budget_ms": 50,
+        "request_budget_ms": 10,
+        "forbid_boto3": True,
+    },
+    {
+        "name": "api GET /missing",
+        "module": "app",
+        "event": {"requestContext": {"http": {"method": "GET", "path": "/missing"}}},
+        "import_budget_ms": 50,
+        "request_budget_ms": 10,
+        "forbid_boto3": True,
+    },
+    {
+        "name": "api POST /quotes",
+        "module": "app",
+        "event": {
+            "requestContext": {"http": {"method": "POST", "path": "/quotes"}},
+            "body": json.dumps({"quote": "Cold starts are not my problem"}),
+        },
+        "import_budget_ms": 50,
+        "request_budget_ms": 1000,
+        "forbid_boto3": False,
+    },
+    {
+        "name": "page generator publish",
+        "module": "page_generator",
+        "event": {"source": "cold-start-check"},
+        "import_budget_ms": 1500,
+        "request_budget_ms": 1000,
+        "forbid_boto3": False,
+    },
+]
+
+PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import {module} as handler_module
+imported = time.perf_counter()
+boto3_after_import = "boto3" in sys.modules
+response = handler_module.handler(json.loads(sys.argv[1]), None)
+done = time.perf_counter()
+print(json.dumps({{
+    "import_ms": (imported - start) * 1000,
+    "request_ms": (done - imported) * 1000,
+    "status": response.get("statusCode"),
+    "boto3_after_import": boto3_after_import,
+    "boto3_after_request": "boto3" in sys.modules,
+}}))
+"""
+
+
+class StubDynamoDBHandler(BaseHTTPRequestHandler):
+    def do_POST(self) -> None:  # noqa: N802 - http.server naming
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        target = self.headers.get("X-Amz-Target", "")
+        body = {"Items": [], "Count": 0, "ScannedCount": 0} if target.endswith(".Query") else {}
+        payload = json.dumps(body).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-amz-json-1.0")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format: str, *args: Any) -> None:
+        pass
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Check Lambda import time and first-request latency budgets.")
+    parser.add_argument(
+        "--scale",
+        type=float,
+        default=1.0,
+        help="Multiply every budget, e.g. 2 on a slow CI runner (default: 1.0)",
+    )
+    parser.add_argument(
+        "--top",
+        type=int,
+        default=5,
+        help="Slowest handler imports to list per scenario (default: 5)",
+    )
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    return parser.parse_args()
+
+
+def parse_importtime(stderr: str) -> list[tuple[str, int]]:
+    # Lines look like "import time:  self [us] | cumulative | imported package".
+    imports = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        fields = line.removeprefix("import time:").split("|")
+        if len(fields) != 3 or not fields[1].strip().isdigit():
+            continue
+        imports.append((fields[2].rstrip(), int(fields[1])))
+    return imports
+
+
+def handler_imports(imports: list[tuple[str, int]], module: str) -> list[tuple[str, int]]:
+    # Children are printed before their importer, indented two spaces per level.
+    # Keep the handler module's direct imports plus anything imported after it,
+    # i.e. lazily while handling the request; interpreter startup is left out.
+    selected: list[tuple[str, int]] = []
+    children: list[tuple[str, int]] = []
+    seen_module = False
+    for name, micros in imports:
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        if depth == 1:
+            children.append((name.strip(), micros))
+        elif depth == 0:
+            if name.strip() == module and not seen_module:
+                selected.extend(children)
+                seen_module = True
+            elif seen_module:
+                selected.append((name.strip(), micros))
+            children = []
+    return selected
+
+
+def slowest_imports(imports: list[tuple[str, int]], module: str, count: int) -> list[tuple[str, int]]:
+    return sorted(handler_imports(imports, module), key=lambda entry: entry[1], reverse=True)[:count]
+
+
+def run_scenario(scenario: dict[str, Any], endpoint: str, site_dir: str) -> dict[str, Any]:
+    env = {
+        **os.environ,
+        "AWS_REGION": "us-east-2",
+        "AWS_ACCESS_KEY_ID": "cold-start",
+        "AWS_SECRET_ACCESS_KEY": "cold-start",
+        "AWS_LAMBDA_FUNCTION_NAME": f"cold-start-{scenario['module']}",
+        "AWS_LAMBDA_INITIALIZATION_TYPE": "on-demand",
+        "DYNAMODB_ENDPOINT": endpoint,
+        "TABLE_NAME": "bruce-quotes",
+        "BUCKET_NAME": "bruce-quotes-site",
+        "DOMAIN": "shitbrucesays.co.uk",
+        "API_BASE_URL": "https://api.shitbrucesays.co.uk",
+        "LOCAL_SITE_DIR": site_dir,
+    }
+    for name in ("PAGE_GENERATOR_FUNCTION_NAME", "PUBLISH_COORDINATION", "PREWARM_CLIENTS", "PROFILE_HANDLER"):
+        env.pop(name, None)
+
+    probe = PROBE.format(module=scenario["module"])
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", probe, json.dumps(scenario["event"])],
+        cwd=LAMBDA_DIR,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=False,
+    )
+    if completed.returncode != 0:
+        raise RuntimeError(f"{scenario['name']} failed:\n{completed.stderr[-2000:]}")
+    result: dict[str, Any] = json.loads(completed.stdout.strip().splitlines()[-1])
+    result["imports"] = parse_importtime(completed.stderr)
+    return result
+
+
+def check_budgets(scenario: dict[str, Any], result: dict[str, Any], scale: float) -> list[str]:
+    failures = []
+    if result["import_ms"] > scenario["import_budget_ms"] * scale:
+        failures.append(f"import {result['import_ms']:.1f} ms > {scenario['import_budget_ms'] * scale:.0f} ms")
+    if result["request_ms"] > scenario["request_budget_ms"] * scale:
+        failures.append(f"first request {result['request_ms']:.1f} ms > {scenario['request_budget_ms'] * scale:.0f} ms")
+    if scenario["forbid_boto3"] and result["boto3_after_request"]:
+        failures.append("boto3 was imported")
+    if result["status"] is None or result["status"] >= 500:
+        failures.append(f"handler returned status {result['status']}")
+    return failures
+
+
+def main() -> int:
+    args = parse_args()
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubDynamoDBHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    endpoint = f"http://127.0.0.1:{server.server_address[1]}"
+
+    report = []
+    try:
+        for scenario in SCENARIOS:
+            with tempfile.TemporaryDirectory() as site_dir:
+                result = run_scenario(scenario, endpoint, site_dir)
+            report.append(
+                {
+                    "name": scenario["name"],
+                    "importMs": round(result["import_ms"], 1),
+                    "firstRequestMs": round(result["request_ms"], 1),
+                    "boto3Imported": result["boto3_after_request"],
+                    "slowestImports": [
+                        {"module": name, "ms": round(micros / 1000, 1)}
+                        for name, micros in slowest_imports(result["imports"], scenario["module"], args.top)
+                    ],
+                    "failures": check_budgets(scenario, result, args.scale),
+                }
+            )
+    finally:
+        server.shutdown()
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        for entry in report:
+            status = "FAIL" if entry["failures"] else "ok"
+            boto3_state = "loaded" if entry["boto3Imported"] else "not loaded"
+            print(
+                f"{status:4} {entry['name']}: import {entry['importMs']} ms, "
+                f"first request {entry['firstRequestMs']} ms, boto3 {boto3_state}"
+            )
+            for failure in entry["failures"]:
+                print(f"     {failure}")
+            slowest = ", ".join(f"{item['module']} {item['ms']} ms" for item in entry["slowestImports"])
+            print(f"     slowest imports: {slowest}")
+    return 1 if any(entry["failures"] for entry in report) else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
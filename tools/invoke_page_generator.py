@@ -24,15 +24,23 @@ def parse_args() -> argparse.Namespace:
         default="us-east-2",
         help="AWS region for the Lambda client (default: us-east-2)",
     )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="Profile this publish; the Lambda writes the results under its PROFILE_S3_URI",
+    )
     return parser.parse_args()
 
 
-def invoke_page_generator(function_name: str, region: str) -> dict[str, Any]:
+def invoke_page_generator(function_name: str, region: str, profile: bool = False) -> dict[str, Any]:
     client = boto3.client("lambda", region_name=region)
+    event: dict[str, Any] = {"source": "terraform-apply"}
+    if profile:
+        event["profile"] = True
     response = client.invoke(
         FunctionName=function_name,
         InvocationType="RequestResponse",
-        Payload=json.dumps({"source": "terraform-apply"}).encode("utf-8"),
+        Payload=json.dumps(event).encode("utf-8"),
     )
 
     payload_bytes = response["Payload"].read()
@@ -60,7 +68,7 @@ def invoke_page_generator(function_name: str, region: str) -> dict[str, Any]:
 
 def main() -> int:
     args = parse_args()
-    payload = invoke_page_generator(function_name=args.function_name, region=args.region)
+    payload = invoke_page_generator(function_name=args.function_name, region=args.region, profile=args.profile)
     print(json.dumps(payload, indent=2))
     return 0
 
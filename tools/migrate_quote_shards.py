@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""Move quote items onto the partition keys for a new QUOTE_SHARDS setting.
+
+Run this after deploying the new QUOTE_SHARDS value to both Lambdas. The
+publisher always reads the unsharded "QUOTE" partition too, so the site stays
+complete while items move. When lowering the shard count, keep the publisher on
+the old, higher value until the migration has finished.
+
+Each copy is tagged with page_generator.MOVED_FROM_ATTRIBUTE. A move changes no
+page, so the stream event source mapping and the publisher both ignore its
+INSERT. Without the tag, migrating N quotes would trigger N publishes.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+from pathlib import Path
+from typing import Any
+
+import boto3
+
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(REPO_ROOT / "lambda"))
+
+import page_generator  # noqa: E402
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Rewrite quote items onto sharded partition keys.")
+    parser.add_argument("--shards", type=int, required=True, help="Target QUOTE_SHARDS value")
+    parser.add_argument(
+        "--from-shards",
+        type=int,
+        default=1,
+        help="QUOTE_SHARDS value the items were written with (default: 1)",
+    )
+    parser.add_argument(
+        "--table-name",
+        default="bruce-quotes",
+        help="DynamoDB table name (default: bruce-quotes)",
+    )
+    parser.add_argument("--region", default="us-east-2", help="AWS region (default: us-east-2)")
+    parser.add_argument("--ddb-endpoint", default=None, help="Optional DynamoDB endpoint, e.g. DynamoDB Local")
+    parser.add_argument("--dry-run", action="store_true", help="Count items that would move without writing")
+    return parser.parse_args()
+
+
+def migrate_quote_shards(table: Any, shards: int, from_shards: int = 1, dry_run: bool = False) -> dict[str, int]:
+    scanned = 0
+    moved = 0
+    for partition_key in page_generator.quote_partition_keys(from_shards):
+        query_args: dict[str, Any] = {
+            "KeyConditionExpression": "PK = :pk",
+            "ExpressionAttributeValues": {":pk": partition_key},
+        }
+        while True:
+            response = table.query(**query_args)
+            items = response.get("Items", [])
+            scanned += len(items)
+            moves = [
+                (item, page_generator.quote_partition_key(item["SK"], shards))
+                for item in items
+                if page_generator.quote_partition_key(item["SK"], shards) != item["PK"]
+            ]
+            moved += len(moves)
+            if moves and not dry_run:
+                # Copy before deleting; readers drop the brief duplicate by SK.
+                with table.batch_writer() as batch:
+                    for item, target in moves:
+                        batch.put_item(
+                            Item={**item, "PK": target, page_generator.MOVED_FROM_ATTRIBUTE: item["PK"]}
+                        )
+                with table.batch_writer() as batch:
+                    for item, _ in moves:
+                        batch.delete_item(Key={"PK": item["PK"], "SK": item["SK"]})
+            if "LastEvaluatedKey" not in response:
+                break
+            query_args["ExclusiveStartKey"] = response["LastEvaluatedKey"]
+    return {"scanned": scanned, "moved": moved}
+
+
+def main() -> int:
+    args = parse_args()
+    if not 1 <= args.shards <= page_generator.MAX_QUOTE_SHARDS:
+        print(f"--shards must be between 1 and {page_generator.MAX_QUOTE_SHARDS}", file=sys.stderr)
+        return 2
+    dynamodb = boto3.resource("dynamodb", region_name=args.region, endpoint_url=args.ddb_endpoint)
+    result = migrate_quote_shards(
+        dynamodb.Table(args.table_name),
+        shards=args.shards,
+        from_shards=args.from_shards,
+        dry_run=args.dry_run,
+    )
+    print(json.dumps({**result, "dryRun": args.dry_run}, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
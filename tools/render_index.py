@@ -53,6 +53,7 @@ def configure_environment(args: argparse.Namespace) -> None:
     os.environ["DOMAIN"] = args.site_url.removeprefix("https://").removeprefix("http://").rstrip("/")
     os.environ["LOCAL_SITE_DIR"] = args.output_dir
     page_generator._dynamodb_resource = None
+    page_generator._dynamodb_client = None
     page_generator._s3_client = None
 
 
@@ -62,8 +63,12 @@ def main() -> int:
     result = page_generator.publish_site()
     print(
         f"Rendered local static site into {args.output_dir} "
-        f"from {args.table_name} at {args.ddb_endpoint} ({result['quoteCount']} quotes)"
+        f"from {args.table_name} at {args.ddb_endpoint} ({result['quoteCount']} quotes, "
+        f"{result['objectsWritten']} written, {result['objectsSkipped']} unchanged)"
     )
+    if result["objectsFailed"]:
+        print(f"Failed to write: {', '.join(result['failedKeys'])}", file=sys.stderr)
+        return 1
     return 0
 
 
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""Recompute the quote aggregates item from the quotes in the table.
+
+The API keeps the "STATS"/"QUOTES" item up to date as quotes are written. Run
+this to create it for quotes written before it existed, or to repair it after
+quotes were edited or deleted outside the API or a batch update failed. It
+overwrites the item, so run it while submissions are quiet.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+from pathlib import Path
+from typing import Any
+
+import boto3
+
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(REPO_ROOT / "lambda"))
+
+import app  # noqa: E402
+import page_generator  # noqa: E402
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Recompute the quote aggregates item.")
+    parser.add_argument(
+        "--shards",
+        type=int,
+        default=1,
+        help="QUOTE_SHARDS value the quotes were written with (default: 1)",
+    )
+    parser.add_argument(
+        "--table-name",
+        default="bruce-quotes",
+        help="DynamoDB table name (default: bruce-quotes)",
+    )
+    parser.add_argument("--region", default="us-east-2", help="AWS region (default: us-east-2)")
+    parser.add_argument("--ddb-endpoint", default=None, help="Optional DynamoDB endpoint, e.g. DynamoDB Local")
+    parser.add_argument("--dry-run", action="store_true", help="Report whether the item is stale without writing")
+    return parser.parse_args()
+
+
+def read_quotes(table: Any, shards: int) -> list[dict[str, Any]]:
+    quotes: dict[str, dict[str, Any]] = {}
+    for partition_key in page_generator.quote_partition_keys(shards):
+        query_args: dict[str, Any] = {
+            "KeyConditionExpression": "PK = :pk",
+            "ExpressionAttributeValues": {":pk": partition_key},
+            "ProjectionExpression": "SK, #text, createdAt",
+            "ExpressionAttributeNames": {"#text": "quote"},
+        }
+        while True:
+            response = table.query(**query_args)
+            for item in response.get("Items", []):
+                quotes[item["SK"]] = item
+            if "LastEvaluatedKey" not in response:
+                break
+            query_args["ExclusiveStartKey"] = response["LastEvaluatedKey"]
+    return sorted(quotes.values(), key=lambda item: item["SK"], reverse=True)
+
+
+def quote_stats_item(quotes: list[dict[str, Any]]) -> dict[str, Any]:
+    # Same layout as app._stats_update() builds incrementally.
+    item: dict[str, Any] = {**app.STATS_KEY, "quoteCount": len(quotes)}
+    for slot in range(app.Config.STATS_RECENT_QUOTES):
+        quote = quotes[slot] if slot < len(quotes) else None
+        item[f"recent{slot}"] = (
+            {"quoteId": quote["SK"], "quote": quote["quote"], "createdAt": quote["createdAt"]} if quote else {}
+        )
+    for quote in quotes:
+        month = f"month#{quote['createdAt'][:7]}"
+        item[month] = item.get(month, 0) + 1
+    return item
+
+
+def repair_quote_stats(table: Any, shards: int = 1, dry_run: bool = False) -> dict[str, Any]:
+    expected = quote_stats_item(read_quotes(table, shards))
+    current = table.get_item(Key=app.STATS_KEY).get("Item")
+    changed = current != expected
+    if changed and not dry_run:
+        table.put_item(Item=expected)
+    months = {name.removeprefix("month#"): count for name, count in expected.items() if name.startswith("month#")}
+    return {"quoteCount": expected["quoteCount"], "months": dict(sorted(months.items())), "changed": changed}
+
+
+def main() -> int:
+    args = parse_args()
+    dynamodb = boto3.resource("dynamodb", region_name=args.region, endpoint_url=args.ddb_endpoint)
+    result = repair_quote_stats(dynamodb.Table(args.table_name), shards=args.shards, dry_run=args.dry_run)
+    print(json.dumps({**result, "dryRun": args.dry_run}, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
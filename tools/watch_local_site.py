@@ -7,7 +7,6 @@ import os
 import sys
 import time
 from pathlib import Path
-from typing import Any
 
 
 REPO_ROOT = Path(__file__).resolve().parents[1]
@@ -61,18 +60,12 @@ def configure_environment(args: argparse.Namespace) -> None:
     os.environ["DOMAIN"] = args.site_url.removeprefix("https://").removeprefix("http://").rstrip("/")
     os.environ["LOCAL_SITE_DIR"] = args.output_dir
     page_generator._dynamodb_resource = None
+    page_generator._dynamodb_client = None
     page_generator._s3_client = None
 
 
-def quote_fingerprint(quotes: list[dict[str, Any]]) -> tuple[tuple[str, str, str], ...]:
-    return tuple(
-        (
-            str(quote.get("SK", "")),
-            str(quote.get("createdAt", "")),
-            str(quote.get("quote", "")),
-        )
-        for quote in quotes
-    )
+def quote_fingerprint(quotes: list[page_generator.Quote]) -> tuple[tuple[str, str, str], ...]:
+    return tuple((quote.id, quote.created_at, quote.text) for quote in quotes)
 
 
 def main() -> int:
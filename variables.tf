@@ -39,6 +39,46 @@ variable "lambda_page_generator_s3_key" {
   default     = "lambda/page-generator.zip"
 }
 
+variable "quote_shards" {
+  description = "Number of DynamoDB partitions quotes are spread across (1 keeps the single QUOTE partition)"
+  type        = number
+  default     = 1
+
+  validation {
+    condition     = var.quote_shards >= 1 && var.quote_shards <= 64
+    error_message = "quote_shards must be between 1 and 64."
+  }
+}
+
+variable "publish_trigger" {
+  description = "How new quotes reach the page generator: \"stream\" (DynamoDB Streams) or \"invoke\" (async invoke from the API)"
+  type        = string
+  default     = "stream"
+
+  validation {
+    condition     = contains(["stream", "invoke"], var.publish_trigger)
+    error_message = "publish_trigger must be \"stream\" or \"invoke\"."
+  }
+}
+
+variable "emit_metrics" {
+  description = "Log per-phase timings and counts from both Lambdas as CloudWatch Embedded Metric Format lines"
+  type        = bool
+  default     = true
+}
+
+variable "profile_handlers" {
+  description = "Profile every invocation of both Lambdas with cProfile and tracemalloc, writing to the artifacts bucket under profiles/"
+  type        = bool
+  default     = false
+}
+
+variable "serve_precompressed" {
+  description = "Serve the publisher's .gz page and sitemap variants from CloudFront; enable only after a full publish has written them"
+  type        = bool
+  default     = false
+}
+
 variable "table_name" {
   description = "Name of the DynamoDB table"
   type        = string
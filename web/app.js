@@ -30,9 +30,11 @@ function getQuoteUrl(quoteId) {
 }
 
 async function createQuote(quote) {
+  // One key per submission: if the request is retried in transit, the API
+  // replays the first response instead of storing the quote twice.
   const response = await fetch(`${CONFIG.API_BASE}/quotes`, {
     method: "POST",
-    headers: { "Content-Type": "application/json" },
+    headers: { "Content-Type": "application/json", "Idempotency-Key": crypto.randomUUID() },
     body: JSON.stringify({ quote }),
   });
 